@@ -4,7 +4,7 @@ from selenium.common.exceptions import TimeoutException
 from POM.pages.pagina_localizacao_trabalhador import PaginaLocalizacaoTrabalhador
 from POM.page_objects.page_objects import PageElement
 from registrador_logs import instancia_log
-from POM.elementos.elementos_pagina_localizacao_trabalhador import LocalizacaoTrabalhadorNome
+from POM.elementos.elementos_pagina_localizacao_trabalhador import LocalizacaoTrabalhadorNome, ResultadoLocalizacao
 
 class FormularioChave(PageElement):
     """
@@ -42,11 +42,12 @@ class FormularioChave(PageElement):
         "a[href='javascript:retr_comunicar_movimentacao();']",
     )
 
-    def verificar_registro_anterior(self, nome_colaborador: str, lista_indice_data: list, driver, url_site_caixa, timeout: int) -> list:
+    def verificar_registro_anterior(self, nome_colaborador: str, resultado_localizacao: ResultadoLocalizacao, driver, url_site_caixa, timeout: int) -> list:
         """
         Verificar se já existe registro anterior no formulário da chave
 
         Args:
+            resultado_localizacao (ResultadoLocalizacao): resultado da localização do trabalhador, com os índices e seletores das ocorrências.
             timeout (int): O tempo máximo de espera para o elemento aparecer.
 
         Returns:
@@ -54,33 +55,29 @@ class FormularioChave(PageElement):
         """
         paginalocalizacao = PaginaLocalizacaoTrabalhador(driver, url_site_caixa)
         lista_registro_ja_existente = []
+        lista_indice_data = resultado_localizacao.indices_ocorrencias
         if lista_indice_data:
-            elementos_trabalhador = self.encontrar_ocorrencias_por_nome("rdoTrabalhador")
-            instancia_log.info(f"Elementos trabalhador: {elementos_trabalhador}")
             for indice in lista_indice_data:
                 try:
-                    seletor_trabalhador = (
-                        By.XPATH,
-                        f"{elementos_trabalhador[indice]}"
-                    )
+                    seletor_trabalhador = resultado_localizacao.seletores_trabalhador[indice]
                     # Selecionar o seletor do trabalhador na posição i
                     instancia_log.info(f"Selecionando trabalhador na posição {indice}")
                     self.clicar_botao(seletor_trabalhador, timeout)
                     # Clicar em continuar
-                    self.clicar_botao(self.botao_continuar1, timeout)
+                    self.clicar_botao(self.botao_continuar1, timeout, abre_pagina=True)
                     # Verificar se o registro anterior existe
                     self.aguarda_elemento_aparecer(
                         self.msg_registro_anterior, timeout
                     )
                     lista_registro_ja_existente.append(True) # Caso exista registro anterior adiciona True na lista
 
-                    self.clicar_botao(self.botao_retornar, timeout) # Clicar no botão de retornar
+                    self.clicar_botao(self.botao_retornar, timeout, abre_pagina=True) # Clicar no botão de retornar
                     # Preencher novamente os dados do trabalhador
                     paginalocalizacao.localizar_sem_verificar(nome_colaborador)
 
                 except TimeoutException:
                     lista_registro_ja_existente.append(False)
-                    self.clicar_botao(self.botao_retornar, timeout) # Clicar no botão de retornar
+                    self.clicar_botao(self.botao_retornar, timeout, abre_pagina=True) # Clicar no botão de retornar
         else:
             try:
                 self.aguarda_elemento_aparecer(self.msg_registro_anterior, timeout)
@@ -206,7 +203,7 @@ class FormularioChave(PageElement):
 
         # Clicar no botão de continuar novamente (SO ACONTECE EM AMBIENTE DE PRODUCAO, JAMAIS CLICAR EM CONTINUAR DURANTE TESTES)
         if ambiente_execucao == "PROD":
-            self.clicar_botao(self.botao_continuar, timeout)
+            self.clicar_botao(self.botao_continuar, timeout, abre_pagina=True)
 
     def gerar_imagem_chave(self, screenshot_path: Path) -> None:
         """
@@ -1,6 +1,5 @@
 from selenium.webdriver.common.by import By
 import time
-import pyautogui
 from selenium.common.exceptions import TimeoutException
 
 from POM.page_objects.page_objects import PageElement
@@ -41,6 +40,8 @@ class CertificadoDigital(PageElement):
         Ags:
             posicao_certificado (int): posicao do certificado que vai ser selecionado
         """
+        # O pyautogui só é necessário no login, por isso é importado apenas aqui
+        import pyautogui
 
         # Para o site da caixa é preciso selecionar 2 vezes o certificado
         qtd_selecoes_certificado = 2
@@ -65,24 +66,20 @@ class CertificadoDigital(PageElement):
 
     def verificacao_selecao_certificado(self, timeout: int) -> str:
         """
-        verifica se a página inicial logada apareceu.Caso não tenha aparecido identifica se erro foi mapeado anteriormente
+        verifica se a página inicial logada apareceu.Caso não tenha aparecido identifica se erro foi mapeado anteriormente.
+        A página logada e a tela de erro são aguardadas na mesma espera, e a primeira que aparecer define o retorno
         """
-        # verifica se a tela de página logada inicial apareceu
         try:
-            self.aguarda_elemento_aparecer(
-                self.texto_indicador_portal_acessado, timeout
+            condicao_atendida = self.aguarda_primeira_condicao(
+                {
+                    "portal_acessado": self.texto_indicador_portal_acessado,
+                    "certificado_diferente_conexao": self.erro_certificado_diferente_conexao,
+                },
+                timeout,
             )
-            certificado_selecionado = True
-            return "Certificado selecionado"
         except TimeoutException:
-            certificado_selecionado = False
-
-        # pagina logada inicial não apareceu > identificar se tela de erro foi mapeada
-        if not certificado_selecionado:
-            try:
-                self.aguarda_elemento_aparecer(
-                    self.erro_certificado_diferente_conexao, timeout
-                )
-                return "Erro previsto na etapa de seleção do certificado: certificado diferente da conexão "
-            except TimeoutException:
-                return "Erro não previsto na etapa de seleção do certificado"
+            return "Erro não previsto na etapa de seleção do certificado"
+
+        if condicao_atendida == "portal_acessado":
+            return "Certificado selecionado"
+        return "Erro previsto na etapa de seleção do certificado: certificado diferente da conexão "
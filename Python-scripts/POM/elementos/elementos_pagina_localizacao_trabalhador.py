@@ -1,29 +1,94 @@
 from selenium.webdriver.common.by import By
-from selenium.common.exceptions import TimeoutException, NoSuchElementException
+from selenium.common.exceptions import TimeoutException
 
 from POM.page_objects.page_objects import PageElement
-from datetime import datetime
 from registrador_logs import instancia_log
 
 
+# Coluna (a partir de 0) da data de admissão na linha de cada ocorrência da tabela de ocorrências do trabalhador
+COLUNA_DATA_ADMISSAO_OCORRENCIA = 3
+
+# Lê em uma única execução a tabela de ocorrências: xpath do botão de seleção, data de admissão e textos da linha de cada ocorrência.
+# A data é procurada a partir da linha do próprio botão (closest('tr')), na linha do botão e nas linhas seguintes até a linha do
+# próximo botão, então cada data fica sempre associada ao seu botão, sem depender da posição da ocorrência na tabela
+SCRIPT_CAPTURAR_TABELA_OCORRENCIAS = """
+if (!window.__xpathAbsoluto) {
+    return null;
+}
+var nome = arguments[0], coluna = arguments[1];
+var padraoData = /^\\d{2}\\/\\d{2}\\/\\d{4}$/;
+var botoes = Array.prototype.slice.call(document.getElementsByName(nome));
+return botoes.map(function (botao) {
+    var ocorrencia = {xpath: window.__xpathAbsoluto(botao), data_admissao: null, textos_linha: []};
+    var linhaBotao = botao.closest('tr');
+    for (var linha = linhaBotao; linha; linha = linha.nextElementSibling) {
+        if (linha !== linhaBotao && botoes.some(function (outro) { return linha.contains(outro); })) {
+            break;
+        }
+        var celula = linha.cells[coluna];
+        if (celula && padraoData.test(celula.innerText.trim())) {
+            ocorrencia.data_admissao = celula.innerText.trim();
+            ocorrencia.textos_linha = Array.prototype.map.call(linha.cells, function (c) {
+                return c.innerText.trim();
+            });
+            break;
+        }
+    }
+    return ocorrencia;
+});
+"""
+
+
+class ResultadoLocalizacao:
+    def __init__(
+        self,
+        retorno: str,
+        indices_ocorrencias: list = None,
+        seletores_trabalhador: list = None,
+        datas_admissao: list = None,
+    ) -> None:
+        """
+        Inicializa a classe ResultadoLocalizacao, que guarda o resultado da localização do trabalhador. O resultado é calculado uma
+        única vez por linha e reaproveitado pelos serviços SALDO, EXTRATO e CHAVE, sem consultar a página novamente
+
+        Args:
+            retorno (str): mensagem de retorno da localização ("Trabalhador localizado", "Não localizado"...)
+            indices_ocorrencias (list): indices das ocorrências do trabalhador com a data de admissão correta
+            seletores_trabalhador (list): seletores (By.XPATH) dos botões de seleção de todas as ocorrências do trabalhador
+            datas_admissao (list): datas de admissão lidas na página para as ocorrências verificadas
+        """
+        self.retorno = retorno
+        self.indices_ocorrencias = indices_ocorrencias or []
+        self.seletores_trabalhador = seletores_trabalhador or []
+        self.datas_admissao = datas_admissao or []
+
+    @property
+    def localizado(self) -> bool:
+        """
+        Indica se o trabalhador foi localizado
+        """
+        return self.retorno != "Não localizado"
+
+    def __repr__(self) -> str:
+        return (
+            f"ResultadoLocalizacao(retorno={self.retorno!r}, indices_ocorrencias={self.indices_ocorrencias}, "
+            f"datas_admissao={self.datas_admissao})"
+        )
+
+
 class LocalizacaoTrabalhadorNome(PageElement):
     """
     Classe que representa a o formulário para localização do trabalhador
     """
     lista_base_conta = (By.NAME, "sltRegiao")  
     campo_preenchimento_nome = (By.NAME, "txtNomeTrab") 
-    botao_continuar = (        
+    botao_continuar = (
         By.XPATH,
         "/html/body/form/table[2]/tbody/tr[3]/td[3]/p/table/tbody/tr[23]/td/a[1]/img",
     )
 
     seletor_trabalhador = (By.NAME, "rdoTrabalhador")
 
-    data_admissao_log = (  # Datas de admissao mostrada ao procurar pelo trabalhador
-        By.XPATH,
-        "/html/body/form/table[2]/tbody/tr[3]/td[3]/table[3]/tbody/tr[4]/td[4]"
-    )                                                                                                  
-
     indicador_trabalhador_localizado_saldo = (
         By.XPATH,
         "/html/body/form/table[2]/tbody/tr[2]/td[3]/table[3]/tbody/tr[2]/td/table[1]/tbody/tr[19]/td[2]",
@@ -58,83 +123,83 @@ class LocalizacaoTrabalhadorNome(PageElement):
         self.preencher_campo(self.campo_preenchimento_nome, nome_colaborador, timeout)
 
         # Confirmar solicitação de localização do trabalhador
-        self.clicar_botao(self.botao_continuar, timeout)
+        self.clicar_botao(self.botao_continuar, timeout, abre_pagina=True)
         instancia_log.info("Dados do trabalhador preenchidos")
 
 
-    def contar_ocorrencias_trabalhador(self) -> int:
+    def aguardar_resposta_localizacao(self, timeout: int) -> str:
         """
-        Verifica o número de ocorrências do trabalhador na página
+        Aguarda a resposta do site após o envio do nome: um alerta ou a página de resultado (ocorrências, trabalhador localizado ou
+        mensagem de erro), o que aparecer primeiro. Retorna o nome da condição atendida
+
+        Ags:
+            timeout (int): tempo máximo de espera pela resposta do site
         """
-        try:
-            elementos_trabalhador = self.procura_elementos(*self.seletor_trabalhador)
-            numero_ocorrencias = len(elementos_trabalhador)
-            return numero_ocorrencias
-        except NoSuchElementException:
-            return 0
-        
+        return self.aguarda_primeira_condicao(
+            {
+                "ocorrencias": self.seletor_trabalhador,
+                "trabalhador_localizado_saldo": self.indicador_trabalhador_localizado_saldo,
+                "trabalhador_localizado_chave": self.indicador_trabalhador_localizado_chave,
+                "nome_nao_localizado": self.msg_erro_nome_nao_localizado,
+                "inconsistencia_dados_caixa": self.msg_inconsistencia_dados_caixa,
+            },
+            timeout,
+            aguardar_alerta=True,
+        )
+
     def verificar_try_except(self, elemento_indicador_trabalhador_localizado, timeout: int):
         """
-        Verifica se o trabalhador foi localizado
+        Verifica se o trabalhador foi localizado. O indicador de sucesso e as mensagens de erro mapeadas são aguardados na mesma
+        espera, e o primeiro que aparecer define o retorno
         Ags :
             elemento_indicador_trabalhador_localizado (By): elemento que indica que o trabalhador foi localizado
             timeout (int): tempo de timout utilizado na interação com elementos da tela 
         """
         try:
-            self.aguarda_elemento_aparecer(elemento_indicador_trabalhador_localizado, timeout)
-            trabalhador_localizado = True
-            return "Trabalhador localizado"
+            condicao_atendida = self.aguarda_primeira_condicao(
+                {
+                    "trabalhador_localizado": elemento_indicador_trabalhador_localizado,
+                    "nome_nao_localizado": self.msg_erro_nome_nao_localizado,
+                    "inconsistencia_dados_caixa": self.msg_inconsistencia_dados_caixa,
+                },
+                timeout,
+            )
         except TimeoutException:
-            trabalhador_localizado = False
-
-        if not trabalhador_localizado:
-            msg_retorno = "Não localizado"
-            try:
-                # Verifica mensagem de erro de nome não localizado
-                if self.aguarda_elemento_aparecer(
-                    self.msg_erro_nome_nao_localizado, timeout
-                ):
-                    msg_retorno = "Erro previsto na etapa de localização do trabalhador: nome não localizado"
-
-                # Verifica mensagem de erro de inconsistência nos dados da caixa
-                elif self.aguarda_elemento_aparecer(
-                    self.msg_inconsistencia_dados_caixa, timeout
-                ):
-                    msg_retorno = "Erro previsto na etapa de localização do trabalhador: inconsistência nos dados da caixa"
-
-                return msg_retorno
-            except TimeoutException:
-                return "Erro não previsto na etapa de localização do trabalhador"
+            return "Erro não previsto na etapa de localização do trabalhador"
+
+        if condicao_atendida == "trabalhador_localizado":
+            return "Trabalhador localizado"
+
+        # As duas mensagens de erro ficam na mesma célula da página. O trabalhador segue como não localizado, para que o
+        # serviço registre o print da tela ou o saldo "Não localizado"
+        return "Não localizado"
             
 
-    def converter_data(self, data):
-        try:
-            # Tenta converter usando o formato 'YYYY-MM-DD HH:MM:SS'
-            data_objeto = datetime.strptime(data, r'%Y-%m-%d %H:%M:%S')
-        except ValueError:
-            try:
-                # Se falhar, tenta converter usando o formato 'DD/MM/ANO'
-                data_objeto = datetime.strptime(data, r'%d/%m/%Y')
-            except ValueError:
-                # Se ambos os formatos falharem, lança um erro
-                raise ValueError("Formato de data inválido")
-        
-        return data_objeto
-    
-
-    def verificar_trabalhador_localizado(self, data_admissao: str, servico: str, timeout: int) -> tuple: 
+    def capturar_tabela_ocorrencias(self) -> list[dict]:
+        """
+        Captura, em uma única consulta à página, a tabela de ocorrências do trabalhador. Retorna para cada ocorrência o xpath do botão
+        de seleção ("xpath"), a data de admissão ("data_admissao", lida a partir da linha do próprio botão) e os textos das células da
+        linha da data ("textos_linha")
+        """
+        return self.executar_script_consulta(
+            SCRIPT_CAPTURAR_TABELA_OCORRENCIAS,
+            self.seletor_trabalhador[1],
+            COLUNA_DATA_ADMISSAO_OCORRENCIA,
+        )
+
+    def verificar_trabalhador_localizado(self, data_admissao: str, servico: str, timeout: int) -> ResultadoLocalizacao:
         """
-        Verifica o número de ocorrências do trabalhador e se foi localizado
+        Verifica o número de ocorrências do trabalhador e se foi localizado. A tabela de ocorrências é lida em uma única consulta
+        e as datas de admissão são comparadas aqui, guardando no resultado os indices de todas as ocorrências com a data correta
+
+        Ags:
+            data_admissao (str): data de admissão já no formato da página (DD/MM/AAAA), preparada pelo `preparar_linhas`
         """
-        # Converte a data de admissao para o formato da página
-        data_objeto = self.converter_data(data_admissao)
-        data_admissao = data_objeto.strftime(r'%d/%m/%Y')
 
-        # Verificar o número de ocorrências do trabalhador para a data de admissão
-        numero_ocorrencias = self.contar_ocorrencias_trabalhador()
-        indices_datas_admissao = []  # Lista para armazenar os indices dos seletores das datas de admissão corretas
+        # Verificar as ocorrências do trabalhador
+        tabela_ocorrencias = self.capturar_tabela_ocorrencias()
         # Caso não tenha ocorrencia do seletor, significa que o passo a passo deve ser o mesmo de antes
-        if numero_ocorrencias == 0: 
+        if not tabela_ocorrencias: 
             if servico == "CHAVE":
                 elemento_indicador_trabalhador_localizado = (
                     self.indicador_trabalhador_localizado_chave
@@ -146,27 +211,28 @@ class LocalizacaoTrabalhadorNome(PageElement):
                 instancia_log.info(f"Elemento indicador trabalhador: {elemento_indicador_trabalhador_localizado}")
 
             ret = self.verificar_try_except(elemento_indicador_trabalhador_localizado, timeout)  # Verifica se o trabalhador foi localizado
-            return ret, indices_datas_admissao
-
-
-        elif numero_ocorrencias > 1:
-            # Se o serviço não for do tipo chave e houver mais de uma ocorrência, seleciona cada uma e executa a sequência específica
-            for i in range(numero_ocorrencias):  # Para cada ocorrência:
-                self.aguarda_elemento_aparecer(self.data_admissao_log, timeout)    # Aguarda a data de admissão aparecer
-                # Formata o XPath da data de admissao dinamicamente
-                xpath_formatado = "/html/body/form/table[2]/tbody/tr[3]/td[3]/table[3]/tbody/tr[{indice}]/td[4]".format(indice=4 + i * 3)
-                data_admissao_log = (By.XPATH, xpath_formatado)
-                
-                # Verifica se a data de admissão é a correta
-                data_admissao_texto = self.recuperar_texto_do_elemento(data_admissao_log).strip()   # Pega a data de admissão
-                if data_admissao_texto == data_admissao:   # Se a data de admissão for a correta
-                    indices_datas_admissao.append(i)  # Adiciona o índice da data de admissão correta
-                    # Caso a data de admissao seja a correta, o trabalhador foi localizado
-                    elemento_indicador_trabalhador_localizado = (
-                        data_admissao_log
-                    )
-                    self.verificar_try_except(elemento_indicador_trabalhador_localizado, timeout) # Verifica se o trabalhador foi localizado
-                else:
-                    return "Nenhuma ocorrência do trabalhador com a data de admissão correta na iteração", indices_datas_admissao
-            return "Ocorrencias do trabalhador nos indices: ", indices_datas_admissao
-        
+            return ResultadoLocalizacao(ret)
+
+        instancia_log.info(f"Tabela de ocorrências do trabalhador: {tabela_ocorrencias}")
+        seletores_trabalhador = [(By.XPATH, ocorrencia["xpath"]) for ocorrencia in tabela_ocorrencias]
+        datas_admissao = [ocorrencia["data_admissao"] for ocorrencia in tabela_ocorrencias]
+        # Indices de todas as ocorrências com a data de admissão correta
+        indices_datas_admissao = [
+            i for i, data_admissao_ocorrencia in enumerate(datas_admissao) if data_admissao_ocorrencia == data_admissao
+        ]
+
+        if not indices_datas_admissao:
+            # Como antes da leitura da tabela, a falta de ocorrência com a data correta não é erro da localização. Os serviços
+            # seguem sem ocorrências selecionadas
+            return ResultadoLocalizacao(
+                "Nenhuma ocorrência do trabalhador com a data de admissão correta",
+                indices_datas_admissao,
+                seletores_trabalhador,
+                datas_admissao,
+            )
+        return ResultadoLocalizacao(
+            "Ocorrencias do trabalhador nos indices: ",
+            indices_datas_admissao,
+            seletores_trabalhador,
+            datas_admissao,
+        )
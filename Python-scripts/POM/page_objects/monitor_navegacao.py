@@ -0,0 +1,144 @@
+import threading
+import time
+
+from registrador_logs import instancia_log
+
+
+# Tempo máximo de espera pela conexão com o DevTools na inicialização do monitor
+TIMEOUT_CONEXAO_DEVTOOLS = 10
+
+# Tempo máximo, contado a partir do clique, em que o início da navegação esperada é aguardado. Passado esse tempo sem o evento de
+# início de carregamento, o clique é considerado sem navegação
+TEMPO_INICIO_NAVEGACAO = 2
+
+
+class MonitorNavegacao:
+    def __init__(self, webdriver) -> None:
+        """
+        Inicializa a classe MonitorNavegacao, que acompanha pelos eventos do Chrome DevTools (CDP) quando a página principal começa
+        a carregar um novo documento e quando o documento fica pronto. As esperas do `UiObject` usam o monitor para aguardar o fim
+        da navegação sem consultar o navegador. Enquanto o monitor não estiver disponível as esperas seguem apenas por consulta
+
+        Args:
+            webdriver: webdriver do chrome que vai ser monitorado
+        """
+        self.webdriver = webdriver
+        self.disponivel = False
+        self.navegando = False
+        self.qtd_documentos_prontos = 0
+        self.qtd_documentos_antes_clique = None
+        self.momento_clique = None
+        self.condicao = threading.Condition()
+        self.conectado = threading.Event()
+        self.thread = None
+
+    @classmethod
+    def iniciar(cls, webdriver) -> "MonitorNavegacao":
+        """
+        Cria o monitor, começa a escutar os eventos em uma thread própria e aguarda a conexão com o DevTools. Retorna o monitor
+        mesmo que a conexão falhe, nesse caso com `disponivel` False
+
+        Args:
+            webdriver: webdriver do chrome que vai ser monitorado
+        """
+        monitor = cls(webdriver)
+        monitor.thread = threading.Thread(
+            target=monitor.executar, name="monitor_navegacao", daemon=True
+        )
+        monitor.thread.start()
+        monitor.conectado.wait(TIMEOUT_CONEXAO_DEVTOOLS)
+        instancia_log.info(f"Monitor de navegação por eventos disponível: {monitor.disponivel}")
+        return monitor
+
+    def executar(self) -> None:
+        """
+        Executa a escuta dos eventos até o navegador ser fechado. Qualquer falha desativa o monitor
+        """
+        import trio
+
+        try:
+            trio.run(self.escutar_eventos)
+        except Exception as e:
+            instancia_log.info(f"Monitor de navegação encerrado: {e}")
+        finally:
+            with self.condicao:
+                self.disponivel = False
+                self.navegando = False
+                self.condicao.notify_all()
+            self.conectado.set()
+
+    async def escutar_eventos(self) -> None:
+        """
+        Conecta no DevTools do navegador e atualiza o estado da navegação a cada evento do frame principal
+        """
+        async with self.webdriver.bidi_connection() as conexao:
+            devtools = conexao.devtools
+            sessao = conexao.session
+            await sessao.execute(devtools.page.enable())
+            arvore_frames = await sessao.execute(devtools.page.get_frame_tree())
+            id_frame_principal = arvore_frames.frame.id_
+
+            with self.condicao:
+                self.disponivel = True
+            self.conectado.set()
+
+            async for evento in sessao.listen(
+                devtools.page.FrameStartedLoading, devtools.page.DomContentEventFired
+            ):
+                with self.condicao:
+                    if isinstance(evento, devtools.page.FrameStartedLoading):
+                        if evento.frame_id == id_frame_principal:
+                            self.navegando = True
+                    else:
+                        self.navegando = False
+                        self.qtd_documentos_prontos += 1
+                    self.condicao.notify_all()
+
+    def esperar_navegacao(self) -> None:
+        """
+        Registra, antes de um clique que abre uma nova página, que uma navegação é esperada. O evento de início de carregamento
+        só chega depois do clique, então sem esse registro a espera seguinte ao clique não teria navegação em andamento para aguardar
+        """
+        with self.condicao:
+            self.qtd_documentos_antes_clique = self.qtd_documentos_prontos
+            self.momento_clique = time.monotonic()
+
+    def aguardar_fim_navegacao(self, timeout: float) -> bool:
+        """
+        Caso a página principal esteja carregando um novo documento, aguarda o evento de documento pronto. Quando uma navegação foi
+        esperada pelo `esperar_navegacao`, aguarda antes o início do carregamento (ou um documento pronto depois do clique) por até
+        `TEMPO_INICIO_NAVEGACAO`. Retorna True se não existe navegação em andamento ao final da espera
+
+        Args:
+            timeout (float): tempo máximo de espera
+        """
+        limite = time.monotonic() + timeout
+        with self.condicao:
+            if self.qtd_documentos_antes_clique is not None:
+                qtd_documentos_antes_clique = self.qtd_documentos_antes_clique
+                self.qtd_documentos_antes_clique = None
+                tempo_inicio = TEMPO_INICIO_NAVEGACAO - (time.monotonic() - self.momento_clique)
+                self.condicao.wait_for(
+                    lambda: not self.disponivel
+                    or self.navegando
+                    or self.qtd_documentos_prontos > qtd_documentos_antes_clique,
+                    max(min(tempo_inicio, timeout), 0),
+                )
+
+            return self.condicao.wait_for(
+                lambda: not (self.disponivel and self.navegando),
+                max(limite - time.monotonic(), 0),
+            )
+
+
+def recuperar_monitor_navegacao(webdriver):
+    """
+    Retorna o monitor de navegação associado ao webdriver, caso exista e esteja disponível
+
+    Args:
+        webdriver: webdriver da página
+    """
+    monitor = getattr(webdriver, "monitor_navegacao", None)
+    if monitor is None or not monitor.disponivel:
+        return None
+    return monitor
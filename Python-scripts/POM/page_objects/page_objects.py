@@ -1,3 +1,4 @@
+import copy
 from abc import ABC
 from selenium.webdriver.support.ui import Select, WebDriverWait
 from selenium.webdriver.support import expected_conditions as EC
@@ -5,7 +6,69 @@ from selenium.webdriver.remote.webelement import WebElement
 from selenium.webdriver.remote.webdriver import WebDriver
 from selenium.webdriver.common.alert import Alert
 from selenium.webdriver.common.by import By
+from selenium.common.exceptions import (
+    TimeoutException,
+    NoSuchElementException,
+    NoAlertPresentException,
+    StaleElementReferenceException,
+    UnexpectedAlertPresentException,
+)
 from pathlib import Path
+import time
+
+from POM.page_objects.monitor_navegacao import recuperar_monitor_navegacao
+from registrador_logs import instancia_log
+
+
+# Nome retornado pelo `aguarda_primeira_condicao` quando um alerta aparece antes dos elementos aguardados
+CONDICAO_ALERTA = "alerta"
+
+# Intervalo padrão (segundos) entre as consultas ao navegador durante as esperas. O padrão do WebDriverWait é 0.5
+INTERVALO_CONSULTA_PADRAO = 0.1
+
+# Tempo máximo de espera pelo carregamento completo da página antes do print da tela
+TIMEOUT_CARREGAMENTO_PRINT = 10
+
+# Registra na página (window) as funções usadas pelos scripts do `executar_script_consulta`. O registro vale até a página ser carregada novamente
+SCRIPT_REGISTRAR_CONSULTA_OCORRENCIAS = """
+window.__xpathAbsoluto = function (element) {
+    var comps = [];
+    var getPos = function (element) {
+        if (element.nodeType == Node.ATTRIBUTE_NODE) {
+            return null;
+        }
+        var position = 1;
+        for (var curNode = element.previousSibling; curNode; curNode = curNode.previousSibling) {
+            if (curNode.nodeName == element.nodeName) {
+                ++position;
+            }
+        }
+        return position;
+    };
+    if (element instanceof Document) {
+        return '/';
+    }
+    for (; element && !(element instanceof Document); element = element.nodeType == Node.ATTRIBUTE_NODE ? element.ownerElement : element.parentNode) {
+        var comp = comps[comps.length] = {};
+        switch (element.nodeType) {
+            case Node.TEXT_NODE: comp.name = 'text()'; break;
+            case Node.ATTRIBUTE_NODE: comp.name = '@' + element.nodeName; break;
+            case Node.PROCESSING_INSTRUCTION_NODE: comp.name = 'processing-instruction()'; break;
+            case Node.COMMENT_NODE: comp.name = 'comment()'; break;
+            case Node.ELEMENT_NODE: comp.name = element.nodeName; break;
+        }
+        comp.position = getPos(element);
+    }
+    var xpath = '';
+    for (var i = comps.length - 1; i >= 0; i--) {
+        xpath += '/' + comps[i].name.toLowerCase();
+        if (comps[i].position !== null) {
+            xpath += '[' + comps[i].position + ']';
+        }
+    }
+    return xpath;
+};
+"""
 
 
 class UiObject:
@@ -13,6 +76,16 @@ class UiObject:
     Classe com métodos genéricos para interagir com elementos UI
     """
 
+    # Intervalo (segundos) entre as consultas ao navegador durante as esperas. Pode ser alterado por classe ou por instância
+    intervalo_consulta = INTERVALO_CONSULTA_PADRAO
+
+    # Texto do alerta que abriu durante a consulta dos elementos do `aguarda_primeira_condicao` e foi fechado pelo chromedriver
+    texto_alerta_fechado = None
+
+    # Quantidade de comandos enviados ao navegador (consultas da espera + ação no elemento) pela última interação. Fica 0 quando o
+    # webdriver não conta os comandos (ver `ChromeContadorComandos` no auxiliar)
+    qtd_consultas_ultima_interacao = 0
+
     def procura_elemento(self, *locator: tuple[str]) -> WebElement:
         """
         Procurar elemento ui com base no localizador do elemento
@@ -25,82 +98,164 @@ class UiObject:
         """
         return self.webdriver.find_elements(*locator)
 
-    def encontrar_ocorrencias_por_nome(self, seletor):
-        """
-        Encontra todos os elementos com o mesmo nome e retorna uma lista com os seus xpaths
-        """
-        elementos = self.webdriver.find_elements(By.NAME, seletor)
-        xpaths = []
-        for elemento in elementos:
-            xpath = self.webdriver.execute_script("function absoluteXPath(element) { " +
-                                        "var comp, comps = [];" +
-                                        "var parent = null;" +
-                                        "var xpath = '';" +
-                                        "var getPos = function(element) {" +
-                                        "var position = 1, curNode;" +
-                                        "if (element.nodeType == Node.ATTRIBUTE_NODE) {" +
-                                        "return null;" +
-                                        "}" +
-                                        "for (curNode = element.previousSibling; curNode; curNode = curNode.previousSibling) {" +
-                                        "if (curNode.nodeName == element.nodeName) {" +
-                                        "++position;" +
-                                        "}" +
-                                        "}" +
-                                        "return position;" +
-                                        "};" +
-                                        "if (element instanceof Document) {" +
-                                        "return '/';" +
-                                        "}" +
-                                        "for (; element && !(element instanceof Document); element = element.nodeType == Node.ATTRIBUTE_NODE ? element.ownerElement : element.parentNode) {" +
-                                        "comp = comps[comps.length] = {};" +
-                                        "switch (element.nodeType) {" +
-                                        "case Node.TEXT_NODE:" +
-                                        "comp.name = 'text()';" +
-                                        "break;" +
-                                        "case Node.ATTRIBUTE_NODE:" +
-                                        "comp.name = '@' + element.nodeName;" +
-                                        "break;" +
-                                        "case Node.PROCESSING_INSTRUCTION_NODE:" +
-                                        "comp.name = 'processing-instruction()';" +
-                                        "break;" +
-                                        "case Node.COMMENT_NODE:" +
-                                        "comp.name = 'comment()';" +
-                                        "break;" +
-                                        "case Node.ELEMENT_NODE:" +
-                                        "comp.name = element.nodeName;" +
-                                        "break;" +
-                                        "}" +
-                                        "comp.position = getPos(element);" +
-                                        "}" +
-                                        "for (var i = comps.length - 1; i >= 0; i--) {" +
-                                        "comp = comps[i];" +
-                                        "xpath += '/' + comp.name.toLowerCase();" +
-                                        "if (comp.position !== null) {" +
-                                        "xpath += '[' + comp.position + ']';" +
-                                        "}" +
-                                        "}" +
-                                        "return xpath;" +
-                                        "} return absoluteXPath(arguments[0]);", elemento)
-            xpaths.append(xpath)
-        return xpaths
-
-
-    def aguarda_elemento_aparecer(self, locator: str, timeout: int = 30) -> None:
-        """
-        Aguarda o elemento aparecer no DOM
-        """
-        WebDriverWait(self.webdriver, timeout).until(
-            EC.presence_of_element_located(locator)
+    def executar_script_consulta(self, script: str, *argumentos):
+        """
+        Executa, em uma única chamada ao navegador, um script que usa as funções de consulta registradas na página. O script deve
+        retornar null quando as funções ainda não foram registradas, e nesse caso é executado novamente junto com o registro, que
+        acontece apenas na primeira consulta após cada carregamento
+
+        Args:
+            script (str): script de consulta
+            argumentos: argumentos passados para o script (arguments[0], arguments[1]...)
+        """
+        resultado = self.webdriver.execute_script(script, *argumentos)
+        if resultado is None:
+            # A página foi carregada novamente e ainda não tem as funções de consulta
+            resultado = self.webdriver.execute_script(
+                SCRIPT_REGISTRAR_CONSULTA_OCORRENCIAS + script, *argumentos
+            )
+        return resultado
+
+    def _qtd_comandos_navegador(self) -> int:
+        """
+        Retorna a quantidade de comandos enviados ao navegador desde a abertura do webdriver
+        """
+        return getattr(self.webdriver, "qtd_comandos", 0)
+
+    def _registrar_interacao(self, nome_interacao: str, qtd_comandos_inicio: int) -> None:
+        """
+        Guarda em `qtd_consultas_ultima_interacao` a quantidade de comandos enviados ao navegador pela interação e registra no log
+
+        Args:
+            nome_interacao (str): nome da interação
+            qtd_comandos_inicio (int): quantidade de comandos do webdriver no início da interação
+        """
+        self.qtd_consultas_ultima_interacao = self._qtd_comandos_navegador() - qtd_comandos_inicio
+        instancia_log.debug(
+            "%s em %s: %s comando(s) ao navegador",
+            nome_interacao, type(self).__name__, self.qtd_consultas_ultima_interacao,
+        )
+
+    def _aguardar(self, condicao, timeout: int, aguardar_navegacao: bool = True):
+        """
+        Aguarda a condição com o intervalo de consulta configurado e retorna o valor retornado pela condição.
+        Quando o webdriver tem um monitor de navegação disponível, uma navegação em andamento é aguardada pelo evento de documento
+        pronto antes da primeira consulta
+
+        Args:
+            condicao: expected condition (ou função que recebe o webdriver) que vai ser aguardada
+            timeout (int): tempo máximo de espera
+            aguardar_navegacao (bool): se False, não aguarda o fim da navegação (esperas por alerta, que bloqueia o carregamento)
+        """
+
+        monitor = recuperar_monitor_navegacao(self.webdriver) if aguardar_navegacao else None
+        if monitor is not None:
+            inicio = time.perf_counter()
+            monitor.aguardar_fim_navegacao(timeout)
+            timeout = max(timeout - (time.perf_counter() - inicio), 0)
+
+        return WebDriverWait(
+            self.webdriver, timeout, poll_frequency=self.intervalo_consulta
+        ).until(condicao)
+
+    def _aguardar_elemento(self, locator, timeout: int, verificacao=None) -> WebElement:
+        """
+        Aguarda o elemento ser encontrado pelo localizador e passar na verificação, e retorna o elemento. Quando o elemento não
+        é encontrado o tempo de espera e o localizador são registrados no log
+
+        Args:
+            locator: localizador do selenium (By, valor)
+            timeout (int): tempo máximo de espera
+            verificacao: função que recebe o elemento e indica se ele está pronto para a ação. None aceita qualquer elemento presente
+        """
+
+        def verificar_elemento(webdriver):
+            elementos = webdriver.find_elements(*locator)
+            if not elementos:
+                return False
+            try:
+                if verificacao is None or verificacao(elementos[0]):
+                    return elementos[0]
+            except StaleElementReferenceException:
+                pass
+            return False
+
+        inicio = time.perf_counter()
+        try:
+            return self._aguardar(verificar_elemento, timeout)
+        except TimeoutException:
+            instancia_log.info(
+                f"Elemento não encontrado em {type(self).__name__} após {time.perf_counter() - inicio:.2f}s: {locator}"
+            )
+            raise
+
+    def aguarda_elemento_aparecer(self, locator: str, timeout: int = 30) -> WebElement:
+        """
+        Aguarda o elemento aparecer no DOM e retorna o elemento
+        """
+        return self._aguardar_elemento(locator, timeout)
+
+    def aguarda_elemento_visivel(self, locator: str, timeout: int = 30) -> WebElement:
+        """
+        Aguarda o elemento ficar visível na tela e retorna o elemento
+        """
+        return self._aguardar_elemento(
+            locator, timeout, lambda elemento: elemento.is_displayed()
+        )
+
+    def aguarda_elemento_clicavel(self, locator: str, timeout: int = 30) -> WebElement:
+        """
+        Aguarda o elemento ficar visível e habilitado e retorna o elemento
+        """
+        return self._aguardar_elemento(
+            locator,
+            timeout,
+            lambda elemento: elemento.is_displayed() and elemento.is_enabled(),
+        )
+
+    def aguarda_primeira_condicao(
+        self, condicoes: dict, timeout: int = 30, aguardar_alerta: bool = False
+    ) -> str:
+        """
+        Aguarda, em uma única espera, o primeiro dos elementos informados aparecer no DOM e retorna o nome da condição atendida.
+        As condições são verificadas na ordem do dicionário a cada consulta. Caso nenhuma aconteça dentro do timeout levanta TimeoutException
+
+        Args:
+            condicoes (dict): nome da condição e locator do elemento que indica a condição, por exemplo {"localizado": locator}
+            timeout (int): tempo máximo de espera
+            aguardar_alerta (bool): se True, um alerta aberto também encerra a espera e é retornado como a condição "alerta"
+        """
+
+        def verificar_condicoes(webdriver):
+            if aguardar_alerta and EC.alert_is_present()(webdriver):
+                return CONDICAO_ALERTA
+            try:
+                for nome_condicao, locator in condicoes.items():
+                    if webdriver.find_elements(*locator):
+                        return nome_condicao
+            except UnexpectedAlertPresentException as e:
+                # O alerta abriu depois da verificação do alerta e antes da procura dos elementos
+                if not aguardar_alerta:
+                    raise
+                self.texto_alerta_fechado = e.alert_text
+                return CONDICAO_ALERTA
+            return False
+
+        self.texto_alerta_fechado = None
+        return self._aguardar(
+            verificar_condicoes, timeout, aguardar_navegacao=not aguardar_alerta
         )
 
     def aguarda_alerta_aparecer(self, timeout: int = 30) -> Alert:
         """
-        Aguarda o elemento aparecer no DOM
+        Aguarda o alerta aparecer e retorna o alerta. Retorna None caso o alerta não apareça dentro do timeout
         """
         try:
-            return WebDriverWait(self.webdriver, timeout).until(EC.alert_is_present())
-        except:
-            pass
+            return self._aguardar(
+                EC.alert_is_present(), timeout, aguardar_navegacao=False
+            )
+        except TimeoutException:
+            return None
 
     def aceitar_alerta(self) -> None:
         """
@@ -108,56 +263,106 @@ class UiObject:
         """
         self.webdriver.switch_to.alert.accept()
 
+    def aceitar_alerta_retornando_texto(self) -> str:
+        """
+        Faz o aceite do alerta e retorna o texto do alerta. Caso o chromedriver já tenha fechado o alerta durante o
+        `aguarda_primeira_condicao`, retorna o texto guardado no fechamento
+        """
+        try:
+            alerta = self.webdriver.switch_to.alert
+            texto_alerta = alerta.text
+            alerta.accept()
+            return texto_alerta
+        except NoAlertPresentException:
+            return self.texto_alerta_fechado or ""
+
     def seleciona_opcao_dropdown(
         self, locator: str, option_text: str, timeout: int = 30
     ) -> None:
         """
-        Aguarda o dropdown ficar disponivel e seleciona a opção visivel desejada
+        Aguarda o dropdown ficar visível e seleciona a opção visivel desejada
         """
-        self.aguarda_elemento_aparecer(locator, timeout)
-        Select(self.procura_elemento(*locator)).select_by_visible_text(option_text)
+        qtd_comandos_inicio = self._qtd_comandos_navegador()
+        lista = self.aguarda_elemento_visivel(locator, timeout)
+        Select(lista).select_by_visible_text(option_text)
+        self._registrar_interacao("seleciona_opcao_dropdown", qtd_comandos_inicio)
 
     def preencher_campo(
         self, locator: str, dado_para_preencher, timeout: str = 10
     ) -> None:
         """
-        Aguarda o campo de preenchimento ficar disponivel e preenche com a informação. O dado a ser preenchido por ser do time inteiro, string ou data.
+        Aguarda o campo de preenchimento ficar visível e preenche com a informação. O dado a ser preenchido por ser do time inteiro, string ou data.
         """
-        self.aguarda_elemento_aparecer(locator, timeout)
-        campo_de_preenhcimento = self.procura_elemento(*locator)
+        qtd_comandos_inicio = self._qtd_comandos_navegador()
+        campo_de_preenhcimento = self.aguarda_elemento_visivel(locator, timeout)
         campo_de_preenhcimento.clear()
         campo_de_preenhcimento.send_keys(dado_para_preencher)
+        self._registrar_interacao("preencher_campo", qtd_comandos_inicio)
 
-    def clicar_botao(self, locator: str, timeout: int = 10) -> None:
-        """
-        Aguarda o botão ficar disponível e realiza o clique
+    def clicar_botao(self, locator: str, timeout: int = 10, abre_pagina: bool = False) -> None:
         """
-        self.aguarda_elemento_aparecer(locator, timeout)
-        button = self.procura_elemento(*locator)
+        Aguarda o botão ficar visível e habilitado e realiza o clique
+
+        Args:
+            locator (str): localizador do botão
+            timeout (int): tempo máximo de espera pelo botão
+            abre_pagina (bool): indica que o clique carrega uma nova página. A navegação é registrada no monitor antes do clique,
+                para que a próxima espera aguarde o carregamento da nova página
+        """
+        qtd_comandos_inicio = self._qtd_comandos_navegador()
+        button = self.aguarda_elemento_clicavel(locator, timeout)
+        monitor = recuperar_monitor_navegacao(self.webdriver) if abre_pagina else None
+        if monitor is not None:
+            monitor.esperar_navegacao()
         button.click()
+        self._registrar_interacao("clicar_botao", qtd_comandos_inicio)
 
     def recuperar_texto_do_elemento(self, locator: str, timeout: int = 10) -> str:
         """
-        Aguarda o elemento ficar disponível e retorna o texto do elemento
+        Aguarda o elemento ficar visível e retorna o texto do elemento
         """
-        self.aguarda_elemento_aparecer(locator, timeout)
-        element = self.procura_elemento(*locator)
-        return element.text
+        qtd_comandos_inicio = self._qtd_comandos_navegador()
+        element = self.aguarda_elemento_visivel(locator, timeout)
+        texto = element.text
+        self._registrar_interacao("recuperar_texto_do_elemento", qtd_comandos_inicio)
+        return texto
 
     def tirar_print_tela(self, screenshot_path: Path) -> None:
-        """Tira o print da tela e salva localmente a imagem no caminho especificado"""
+        """
+        Tira o print da tela e salva localmente a imagem no caminho especificado. Antes do print aguarda o carregamento completo
+        da página (com o carregamento "eager" as imagens podem ainda não ter carregado) e depois volta a janela para o tamanho anterior
+        """
+        try:
+            WebDriverWait(
+                self.webdriver, TIMEOUT_CARREGAMENTO_PRINT, poll_frequency=self.intervalo_consulta
+            ).until(
+                lambda webdriver: webdriver.execute_script("return document.readyState") == "complete"
+            )
+        except TimeoutException:
+            pass
+        tamanho_janela = self.webdriver.get_window_size()
         self.webdriver.set_window_size(800, 8000)
         self.webdriver.save_screenshot(screenshot_path)
-        self.webdriver.maximize_window()
+        self.webdriver.set_window_size(tamanho_janela["width"], tamanho_janela["height"])
 
     def extrair_valor_do_elemento(self, locator: str, timeout: int = 10) -> str:
         """
-        Aguarda o elemento ficar disponível e retorna o valor do atributo 'value' do elemento
+        Aguarda o elemento aparecer no DOM com o atributo 'value' preenchido e retorna o valor. Caso o valor continue vazio até o
+        timeout, retorna o valor vazio do elemento
         """
-        self.aguarda_elemento_aparecer(locator, timeout)
-        element = self.procura_elemento(*locator)
-        return element.get_attribute("value")
-
+        qtd_comandos_inicio = self._qtd_comandos_navegador()
+        try:
+            element = self._aguardar_elemento(
+                locator, timeout, lambda elemento: bool(elemento.get_attribute("value"))
+            )
+        except TimeoutException:
+            elementos = self.procura_elementos(*locator)
+            if not elementos:
+                raise
+            element = elementos[0]
+        valor = element.get_attribute("value")
+        self._registrar_interacao("extrair_valor_do_elemento", qtd_comandos_inicio)
+        return valor
 
 class Page(ABC, UiObject):
     """
@@ -170,14 +375,15 @@ class Page(ABC, UiObject):
         """
         self.webdriver = webdriver
         self.url = url
-        self._atualizar_page_elements_com_webdriver()
 
     def open(self) -> None:
         """
-        Abre o browser numa url especifica e maximiza a tela
+        Abre o browser numa url especifica e maximiza a tela. Quando o navegador foi aberto com tamanho fixo de janela
+        (perfil de desempenho ou headless) a tela não é maximizada
         """
         self.webdriver.get(self.url)
-        self.webdriver.maximize_window()
+        if not getattr(self.webdriver, "tamanho_janela_fixo", False):
+            self.webdriver.maximize_window()
 
     def quit_driver(self) -> None:
         """
@@ -191,27 +397,40 @@ class Page(ABC, UiObject):
         """
         self.webdriver.close()
 
-    def _atualizar_page_elements_com_webdriver(self) -> None:
-        """
-        Atualiza os atributos webdriver de todas as instâncias de PageElement na classe com o webdriver da página
-
-        Este método é importante para garantir que todas as instâncias de PageElement tenham acesso ao webdriver da página,
-        permitindo interações com os elementos da página
-
-        """
-        for atributo in dir(self):
-            atributo_real = getattr(self, atributo)
-            if isinstance(atributo_real, PageElement):
-                atributo_real.webdriver = self.webdriver
-
 
 class PageElement(ABC, UiObject):
     """
-    Classe abstrata que representa um elemento em uma página
+    Classe abstrata que representa um elemento em uma página.
+
+    Os elementos são declarados como atributos de classe da página (ou de outro elemento) e funcionam como modelo: no primeiro acesso
+    por uma instância da página é criada uma cópia do elemento ligada ao webdriver dessa instância, guardada na própria instância.
+    Assim cada página usa apenas os elementos que acessa e páginas com webdrivers diferentes não compartilham estado
     """
 
+    # Nome do atributo em que o elemento foi declarado na classe (preenchido pelo `__set_name__`)
+    nome_atributo = None
+
     def __init__(self, webdriver: WebDriver = None) -> None:
         """
         Inicializa a classe PageElement
         """
         self.webdriver = webdriver
+        self.nome_atributo = None
+
+    def __set_name__(self, classe_dona, nome_atributo: str) -> None:
+        """
+        Guarda o nome do atributo em que o elemento foi declarado na classe
+        """
+        self.nome_atributo = nome_atributo
+
+    def __get__(self, instancia, classe_dona=None):
+        """
+        Retorna a cópia do elemento ligada ao webdriver da instância. A cópia fica no __dict__ da instância, então os próximos acessos
+        não passam por aqui. Acessado pela classe retorna o próprio modelo
+        """
+        if instancia is None or self.nome_atributo is None:
+            return self
+        elemento = copy.copy(self)
+        elemento.webdriver = instancia.webdriver
+        instancia.__dict__[self.nome_atributo] = elemento
+        return elemento
@@ -3,7 +3,7 @@ from pathlib import Path
 from POM.page_objects.page_objects import Page
 from POM.page_objects.page_objects import PageElement
 from POM.elementos.elementos_pagina_chave import FormularioChave
-from POM.elementos.elementos_pagina_localizacao_trabalhador import LocalizacaoTrabalhadorNome
+from POM.elementos.elementos_pagina_localizacao_trabalhador import LocalizacaoTrabalhadorNome, ResultadoLocalizacao
 from selenium.webdriver.common.by import By
 from selenium.common.exceptions import TimeoutException
 from auxiliar import gerar_pdf
@@ -16,14 +16,14 @@ class PaginaChave(Page, PageElement):
     chave = FormularioChave()
     localizar = LocalizacaoTrabalhadorNome()
 
-    def verificar_existencia_registro_anterior(self, nome_colaborador: str, data_admissao: str, lista_indice_data: list, retorno: str, driver, url_site_caixa) -> list:
+    def verificar_existencia_registro_anterior(self, nome_colaborador: str, resultado_localizacao: ResultadoLocalizacao, driver, url_site_caixa) -> list:
         """
         Verifica se já existe um registro anterior de geração de chave para cada ocorrencia do colaborador
         """
-        if retorno == "Não localizado":
+        if not resultado_localizacao.localizado:
             registro_anterior_existente = [False]
         else:   
-            registro_anterior_existente = self.chave.verificar_registro_anterior(nome_colaborador, data_admissao, lista_indice_data, driver, url_site_caixa ,timeout=5)
+            registro_anterior_existente = self.chave.verificar_registro_anterior(nome_colaborador, resultado_localizacao, driver, url_site_caixa ,timeout=5)
         return registro_anterior_existente
 
     def verificar_validade_registro_existente(
@@ -59,8 +59,7 @@ class PaginaChave(Page, PageElement):
             codigo_saque: str,
             ambiente_execucao: str,
             registro_anterior_existente: list,
-            lista_indice_data: list,
-            retorno: str,
+            resultado_localizacao: ResultadoLocalizacao,
         ) -> list:
             """
             Preenche formulário de geração da chave e quando obtem a chave tira print da tela e salva o pdf
@@ -72,7 +71,8 @@ class PaginaChave(Page, PageElement):
                 codigo_movimentacao (str): código que caracteriza tipo de desligamento
                 codigo_saque (str): código que caracteriza o tipo de desligamento
                 ambiente_execucao (str): ambiente de execução do script (dev, qa ou prod)
-                lista_indice_data (list): lista com os indices de data de cada colaborador
+                registro_anterior_existente (list): indica, para cada ocorrência localizada, se já existe registro anterior
+                resultado_localizacao (ResultadoLocalizacao): resultado da localização do trabalhador, com os índices e seletores das ocorrências
             """
             botao_continuar = (
                 By.XPATH,
@@ -85,7 +85,8 @@ class PaginaChave(Page, PageElement):
             try:
                 registro_existente_valido = False
                 caminhos_pdf = []
-                if retorno == "Não localizado":
+                lista_indice_data = resultado_localizacao.indices_ocorrencias
+                if not resultado_localizacao.localizado:
                     # Printar a tela de trabalhador não localizado - evita que o script pare de rodar
                     screenshot_name = f"04 - CHAVE FGTS - {nome_colaborador_original.upper()}.png"
                     screenshot_path = pasta_armazenamento / screenshot_name
@@ -93,33 +94,30 @@ class PaginaChave(Page, PageElement):
                     caminhos_pdf.append(gerar_pdf(screenshot_path))
                 else:    
                     if lista_indice_data:
-                        elementos_trabalhador = self.encontrar_ocorrencias_por_nome("rdoTrabalhador")
-                        for i in lista_indice_data:
+                        # O registro anterior é verificado na mesma ordem das ocorrências localizadas
+                        for posicao, i in enumerate(lista_indice_data):
                             try:
-                                seletor_trabalhador = (
-                                    By.XPATH,
-                                    f"{elementos_trabalhador[i]}"
-                                )
+                                seletor_trabalhador = resultado_localizacao.seletores_trabalhador[i]
                                 # Selecionar o seletor do trabalhador na posição i
                                 instancia_log.info(f"Selecionando trabalhador na posição {i}")
                                 self.clicar_botao(seletor_trabalhador)
                                 # Clicar em continuar
-                                self.clicar_botao(botao_continuar)
+                                self.clicar_botao(botao_continuar, abre_pagina=True)
 
-                                if registro_anterior_existente[i]:
+                                if registro_anterior_existente[posicao]:
                                     registro_existente_valido = self.verificar_validade_registro_existente(
                                         data_movimentacao, codigo_movimentacao, codigo_saque, timeout=10
                                     )
                                     instancia_log.info(
                                         f"Registro anterior válido: {registro_existente_valido}"
                                     )
-                                if registro_existente_valido or not registro_anterior_existente[i]:
+                                if registro_existente_valido or not registro_anterior_existente[posicao]:
                                     self.chave.preencher_formulario_chave(
                                         data_movimentacao,
                                         codigo_movimentacao,
                                         codigo_saque,
                                         ambiente_execucao,
-                                        registro_anterior_existente[i],
+                                        registro_anterior_existente[posicao],
                                         timeout=10,
                                     )
                                     screenshot_name = f"04 - CHAVE FGTS - {nome_colaborador_original.upper()} {i+1}.png"
@@ -128,7 +126,7 @@ class PaginaChave(Page, PageElement):
                                     caminhos_pdf.append(gerar_pdf(screenshot_path))
                                 
 
-                                self.clicar_botao(botao_retornar, timeout=5) # Clicar no botão de retornar
+                                self.clicar_botao(botao_retornar, timeout=5, abre_pagina=True) # Clicar no botão de retornar
                                 # Preencher formulário de chave novamente
                                 self.localizar.preencher_dados_trabalhador(nome_colaborador, timeout=5)
                                 
@@ -136,7 +134,7 @@ class PaginaChave(Page, PageElement):
 
                             except TimeoutException:
                                 registro_anterior_existente = False # Caso não exista registro anterior
-                                self.clicar_botao(botao_retornar, timeout=5)
+                                self.clicar_botao(botao_retornar, timeout=5, abre_pagina=True)
                     else:
                         registro_existente_valido = False
 
@@ -3,6 +3,7 @@ from pathlib import Path
 
 from POM.page_objects.page_objects import Page
 from POM.elementos.elementos_pagina_extrato_fgts import ExtratoFgts
+from POM.elementos.elementos_pagina_localizacao_trabalhador import ResultadoLocalizacao
 from auxiliar import gerar_pdf
 from registrador_logs import instancia_log
 
@@ -14,7 +15,7 @@ class PaginaExtratoFgts(Page):
     extrato_fgts = ExtratoFgts()
 
     def extrair_saldo(
-        self, df_output_saldo: pd.DataFrame, index_linha: int, lista_indice_data: list, retorno: str
+        self, df_output_saldo: pd.DataFrame, index_linha: int, resultado_localizacao: ResultadoLocalizacao
     ) -> pd.DataFrame:
         """
         Extrai saldo fgts e atualiza numa planilha de output do saldo
@@ -22,14 +23,15 @@ class PaginaExtratoFgts(Page):
         Ags:
             df_output_saldo (pd.DataFrame): dataframe no qual vai ser adicionado a informação de saldo extraida da tela
             index_linha (int): index da linha do dataframe na qual vai ser adicionada a informação de saldo extraida da tela
+            resultado_localizacao (ResultadoLocalizacao): resultado da localização do trabalhador
         """
         try:
             # Recupera saldo
             coluna_saldo_base = "SALDO"
-            if retorno == "Não localizado":
+            if not resultado_localizacao.localizado:
                 saldo = ["Não localizado"]
             else:
-                saldo = self.extrato_fgts.recuperar_informacao_saldo(lista_indice_data, timeout=5)
+                saldo = self.extrato_fgts.recuperar_informacao_saldo(resultado_localizacao, timeout=5)
                 instancia_log.info(f"Saldo recuperado: {saldo}")
 
             # Adiciona os saldos às colunas correspondentes
@@ -45,7 +47,7 @@ class PaginaExtratoFgts(Page):
             raise Exception(msg_erro)
 
     def gerar_extrato_fgts(
-        self, pasta_armazenamento: Path, nome_colaborador: str, nome_colaborador_original: str, lista_indice_data: list
+        self, pasta_armazenamento: Path, nome_colaborador: str, nome_colaborador_original: str, resultado_localizacao: ResultadoLocalizacao
     ) -> list:
         """
         Tira print da tela do extrato e salva o pdf
@@ -53,11 +55,12 @@ class PaginaExtratoFgts(Page):
         Ags:
             pasta_armazenamento (Path): pasta onde vai ser armazenado o arquivo png com o print da dela e também o arquivo pdf que vai ser gerado a partir da imagem
             nome_colaborador (str): nome do colocaborados para o qual o extrato está sendo gerado
+            resultado_localizacao (ResultadoLocalizacao): resultado da localização do trabalhador
         """
         try:
            return self.extrato_fgts.gerar_imagem_extrato_fgts(
                screenshot_path=pasta_armazenamento,
-               lista_indice_data=lista_indice_data,
+               resultado_localizacao=resultado_localizacao,
                pasta_armazenamento=pasta_armazenamento,
                nome_colaborador=nome_colaborador,
                nome_colaborador_original=nome_colaborador_original,
@@ -1,7 +1,22 @@
+import contextlib
+
+from selenium.common.exceptions import WebDriverException
+
 from POM.page_objects.page_objects import Page
 from POM.elementos.elementos_pagina_inicial import Empregador, CertificadoDigital
 from registrador_logs import instancia_log
 
+
+# Tempo máximo de espera pelo portal logado quando o certificado é selecionado automaticamente pelo navegador
+TIMEOUT_ACESSO_PORTAL = 30
+
+# Tempo máximo de espera pelo portal logado na restauração de uma sessão guardada
+TIMEOUT_RESTAURACAO_SESSAO = 10
+
+# Campos dos cookies do DevTools (Network.getAllCookies) aceitos na restauração (Network.setCookies)
+CAMPOS_COOKIE_RESTAURADOS = ["name", "value", "domain", "path", "secure", "httpOnly", "sameSite", "expires"]
+
+
 class PaginaInicial(Page):
     """
     Classe que representa a página inicial do site
@@ -10,24 +25,61 @@ class PaginaInicial(Page):
     empregador = Empregador()
     certificado_digital = CertificadoDigital()
 
-    def acessar_site(self, posicao_certificado: int) -> None:
+    def acessar_site(
+        self,
+        posicao_certificado: int,
+        selecao_automatica_certificado: bool = False,
+        trava_selecao_certificado=None,
+    ) -> None:
         """
         Acessa site da caixa e seleciona o certificado digital
 
         Ags:
-            parametros (dict): dicionário de parâmetros que vão ser utilizado na execução em subprocess
-
+            posicao_certificado (int): posição do certificado que vai ser selecionado pelo teclado
+            selecao_automatica_certificado (bool): indica que o navegador já foi aberto selecionando o certificado da empresa sozinho.
+                Nesse caso nenhuma tecla é enviada e apenas o acesso ao portal é aguardado
+            trava_selecao_certificado: trava compartilhada entre navegadores. Cobre apenas o clique no botão empregador, que abre a
+                janela do certificado, e as teclas da seleção, a abertura do site acontece fora da trava
         """
+        trava_selecao_certificado = trava_selecao_certificado or contextlib.nullcontext()
 
         try:
             self.open()
+        except:
+            etapa = "abertura do site e seleção do botão empregador"
+            msg_erro = f"Erro não previsto na etapa de: {etapa}"
+            raise Exception(msg_erro)
+
+        with trava_selecao_certificado:
+            self.selecionar_certificado_empregador(posicao_certificado, selecao_automatica_certificado)
+
+    def selecionar_certificado_empregador(self, posicao_certificado: int, selecao_automatica_certificado: bool) -> None:
+        """
+        Seleciona o botão empregador e o certificado digital
+
+        Ags:
+            posicao_certificado (int): posição do certificado que vai ser selecionado pelo teclado
+            selecao_automatica_certificado (bool): indica que o certificado é selecionado sozinho pelo navegador
+        """
+        try:
             self.empregador.selecionar_empregador(timeout=10)
             
         except:
             etapa = "abertura do site e seleção do botão empregador"
             msg_erro = f"Erro não previsto na etapa de: {etapa}"
             raise Exception(msg_erro)
-        
+
+        if selecao_automatica_certificado:
+            retorno_verificacao_certificado = (
+                self.certificado_digital.verificacao_selecao_certificado(
+                    timeout=TIMEOUT_ACESSO_PORTAL
+                )
+            )
+            instancia_log.info(f"Seleção automática do certificado: {retorno_verificacao_certificado}")
+            if "Erro" in retorno_verificacao_certificado:
+                raise Exception(retorno_verificacao_certificado)
+            return
+
         try:
             self.certificado_digital.selecionar_certificado(int(posicao_certificado))
         except:
@@ -37,9 +89,41 @@ class PaginaInicial(Page):
             if "Erro" in retorno_verificacao_certificado:
                 raise Exception(retorno_verificacao_certificado)
 
+    def capturar_sessao(self) -> tuple[list[dict], str]:
+        """
+        Retorna os cookies de todos os domínios do navegador, lidos pelo DevTools, e a url do portal logado
+        """
+        cookies = self.webdriver.execute_cdp_cmd("Network.getAllCookies", {})["cookies"]
+        return cookies, self.webdriver.current_url
 
+    def restaurar_sessao(self, cookies: list[dict], url_portal: str) -> bool:
+        """
+        Restaura no navegador os cookies de uma sessão guardada e abre o portal logado. Retorna True se o portal apareceu, ou seja,
+        se a sessão ainda é válida no site
 
+        Ags:
+            cookies (list[dict]): cookies da sessão, no formato do DevTools
+            url_portal (str): url do portal logado
+        """
+        cookies_restaurados = []
+        for cookie in cookies:
+            cookie_restaurado = {
+                campo: cookie[campo] for campo in CAMPOS_COOKIE_RESTAURADOS if campo in cookie
+            }
+            # Cookies de sessão não têm data de expiração
+            if cookie.get("session") or cookie_restaurado.get("expires", -1) < 0:
+                cookie_restaurado.pop("expires", None)
+            cookies_restaurados.append(cookie_restaurado)
 
+        try:
+            self.webdriver.execute_cdp_cmd("Network.setCookies", {"cookies": cookies_restaurados})
+            self.webdriver.get(url_portal)
+        except WebDriverException as e:
+            instancia_log.info(f"Não foi possível restaurar a sessão guardada: {e}")
+            return False
 
-
-
+        retorno_verificacao_sessao = self.certificado_digital.verificacao_selecao_certificado(
+            timeout=TIMEOUT_RESTAURACAO_SESSAO
+        )
+        instancia_log.info(f"Restauração da sessão guardada: {retorno_verificacao_sessao}")
+        return "Erro" not in retorno_verificacao_sessao
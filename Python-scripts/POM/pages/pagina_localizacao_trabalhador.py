@@ -1,50 +1,68 @@
-from selenium.common.exceptions import UnexpectedAlertPresentException
+from selenium.common.exceptions import TimeoutException
 
-from POM.page_objects.page_objects import Page
+from POM.page_objects.page_objects import Page, CONDICAO_ALERTA
 from POM.elementos.elementos_pagina_localizacao_trabalhador import (
     LocalizacaoTrabalhadorNome,
+    ResultadoLocalizacao,
 )
 from registrador_logs import instancia_log
 
+
+# Tempo máximo de espera pela resposta do site (alerta ou página de resultado) após o envio do nome
+TIMEOUT_RESPOSTA_LOCALIZACAO = 10
+
+
 class PaginaLocalizacaoTrabalhador(Page):
     """
     Página em que acontece a localização do trabalhador
     """
     localizacao_trabalhador = LocalizacaoTrabalhadorNome()
 
-    def localizar_trabalhador(self, nome_colaborador: str, data_admissao: str, servico: str) -> None:
+    def enviar_dados_trabalhador(self, nome_colaborador: str) -> None:
         """
-        Localiza o trabalhador com base no NOME
+        Preenche o formulário de localização e aguarda a resposta do site. Caso o site responda com um alerta, o alerta é aceito
+        e é levantado um erro previsto com a mensagem do alerta
 
         Ags:
             nome_colaborador (str): nome do trabalhador que vai ser utilizado para preencher o formulário de localização
-            data_admissao (str): data de admissão para verificação em caso de mais de uma ocorrência
         """
+        self.localizacao_trabalhador.preencher_dados_trabalhador(nome_colaborador, timeout=5)
         try:
-            self.localizacao_trabalhador.preencher_dados_trabalhador(nome_colaborador, timeout=5)
-            alerta = self.aguarda_alerta_aparecer(timeout=5)
-
-            if alerta:
-                msg_alerta = alerta.text
-                raise UnexpectedAlertPresentException(
-                    f"Erro previsto na etapa de localização do trabalhador: {alerta.text}"
-                )
-
-            retorno_trabalhador_localizado = (
-                self.localizacao_trabalhador.verificar_trabalhador_localizado(
-                    data_admissao, servico, timeout=5
-                )
+            resposta = self.localizacao_trabalhador.aguardar_resposta_localizacao(
+                TIMEOUT_RESPOSTA_LOCALIZACAO
             )
-            instancia_log.info("Retorno trabalhador localizado: %s", retorno_trabalhador_localizado)
-            if "Erro" in retorno_trabalhador_localizado:
-                raise Exception(retorno_trabalhador_localizado)
+        except TimeoutException:
+            # Nenhuma resposta conhecida apareceu, a verificação da localização identifica o erro
+            instancia_log.info("Resposta da localização do trabalhador não identificada")
+            return
 
-        except UnexpectedAlertPresentException:
-            self.localizacao_trabalhador.aceitar_alerta()
+        if resposta == CONDICAO_ALERTA:
+            msg_alerta = self.localizacao_trabalhador.aceitar_alerta_retornando_texto()
             raise Exception(
                 f"Erro previsto na etapa de localização do trabalhador:{msg_alerta}"
             )
-    
+
+    def localizar_trabalhador(self, nome_colaborador: str, data_admissao: str, servico: str) -> ResultadoLocalizacao:
+        """
+        Localiza o trabalhador com base no NOME e retorna o resultado da localização, que é reaproveitado pelo serviço executado
+
+        Ags:
+            nome_colaborador (str): nome do trabalhador que vai ser utilizado para preencher o formulário de localização
+            data_admissao (str): data de admissão para verificação em caso de mais de uma ocorrência
+            servico (str): serviço que vai ser executado
+        """
+        self.enviar_dados_trabalhador(nome_colaborador)
+
+        resultado_localizacao = (
+            self.localizacao_trabalhador.verificar_trabalhador_localizado(
+                data_admissao, servico, timeout=5
+            )
+        )
+        instancia_log.info("Retorno trabalhador localizado: %s", resultado_localizacao)
+        if "Erro" in resultado_localizacao.retorno:
+            raise Exception(resultado_localizacao.retorno)
+        return resultado_localizacao
+
     def localizar_sem_verificar(self, nome_colaborador: str) -> None:
         """
         Localiza o trabalhador com base no NOME
@@ -52,18 +70,4 @@ class PaginaLocalizacaoTrabalhador(Page):
         Ags:
             nome_colaborador (str): nome do trabalhador que vai ser utilizado para preencher o formulário de localização
         """
-        try:
-            self.localizacao_trabalhador.preencher_dados_trabalhador(nome_colaborador, timeout=5)
-            alerta = self.aguarda_alerta_aparecer(timeout=5)
-
-            if alerta:
-                msg_alerta = alerta.text
-                raise UnexpectedAlertPresentException(
-                    f"Erro previsto na etapa de localização do trabalhador: {alerta.text}"
-                )
-            
-        except UnexpectedAlertPresentException:
-            self.localizacao_trabalhador.aceitar_alerta()
-            raise Exception(
-                f"Erro previsto na etapa de localização do trabalhador:{msg_alerta}"
-            )
\ No newline at end of file
+        self.enviar_dados_trabalhador(nome_colaborador)
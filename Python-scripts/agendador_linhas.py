@@ -0,0 +1,62 @@
+import collections
+import pandas as pd
+
+
+# Linhas com o mesmo certificado/empresa são processadas em sequência, para que o login seja feito apenas uma vez
+COLUNAS_AGRUPAMENTO = ["POSICAO DO CERTIFICADO", "EMPRESA"]
+
+
+def agrupar_linhas_por_empresa(dados_para_processar: pd.DataFrame) -> list[list]:
+    """
+    Retorna os indices das linhas agrupados por certificado/empresa, na ordem em que cada grupo aparece pela primeira vez
+
+    Args:
+        dados_para_processar (pd.DataFrame): linhas que vão ser processadas
+    """
+    return [
+        list(grupo.index)
+        for _, grupo in dados_para_processar.groupby(
+            COLUNAS_AGRUPAMENTO, sort=False, dropna=False
+        )
+    ]
+
+
+class AgendadorLinhas:
+    def __init__(self, dados_para_processar: pd.DataFrame) -> None:
+        """
+        Inicializa a classe AgendadorLinhas, que define a ordem de processamento das linhas para minimizar os logins no site:
+        as linhas de uma empresa são processadas juntas e o reprocessamento de uma linha vai para o final das linhas da empresa
+
+        Args:
+            dados_para_processar (pd.DataFrame): linhas que vão ser processadas
+        """
+        self.lotes_empresas = collections.deque(
+            collections.deque((index, 0) for index in indices_empresa)
+            for indices_empresa in agrupar_linhas_por_empresa(dados_para_processar)
+        )
+
+    def __iter__(self):
+        """
+        Retorna as linhas a serem processadas como tuplas (index, contador_retry), empresa por empresa
+        """
+        while self.lotes_empresas:
+            lote_empresa = self.lotes_empresas[0]
+            while lote_empresa:
+                yield lote_empresa.popleft()
+            self.lotes_empresas.popleft()
+
+    def reagendar(self, index, contador_retry: int) -> None:
+        """
+        Coloca a linha no final das linhas da empresa que está sendo processada, para que seja processada novamente sem um novo login
+
+        Args:
+            index: index da linha que vai ser reprocessada
+            contador_retry (int): quantidade de tentativas que já falharam para essa linha
+        """
+        self.lotes_empresas[0].append((index, contador_retry))
+
+    def qtd_linhas_pendentes(self) -> int:
+        """
+        Retorna a quantidade de processamentos que ainda estão agendados
+        """
+        return sum(len(lote_empresa) for lote_empresa in self.lotes_empresas)
@@ -1,25 +1,79 @@
-from fpdf import FPDF
 from pathlib import Path
+from urllib.parse import urlparse
 from selenium import webdriver
 from selenium.webdriver.chrome.service import Service as ChromeService
 from selenium.webdriver.chrome.options import Options
-from webdriver_manager.chrome import ChromeDriverManager
 from selenium.common.exceptions import WebDriverException
-from googleapiclient.discovery import build
-from google.oauth2 import service_account
-from googleapiclient.http import MediaFileUpload
-from googleapiclient.errors import HttpError
 import hashlib
+import json
+import os
+import re
+import threading
 import pandas as pd
 import datetime
 import traceback
-from openpyxl import Workbook
 
 from registrador_logs import instancia_log
 
 
 ESCOPO_DRIVE = ["https://www.googleapis.com/auth/drive"]
 
+# Perfis do navegador aceitos no parâmetro "perfil_navegador"
+PERFIL_NAVEGADOR_PADRAO = "PADRAO"
+PERFIL_NAVEGADOR_DESEMPENHO = "DESEMPENHO"
+
+# Modos de seleção do certificado aceitos no parâmetro "modo_selecao_certificado". No modo TECLADO o certificado é escolhido na
+# janela do chrome pelo pyautogui. No modo POLITICA o chrome seleciona sozinho o certificado da empresa (auto_select_certificate)
+MODO_SELECAO_CERTIFICADO_TECLADO = "TECLADO"
+MODO_SELECAO_CERTIFICADO_POLITICA = "POLITICA"
+
+# Recursos bloqueados no perfil de desempenho, por serviço. EXTRATO e CHAVE geram o print da tela como evidência,
+# então mantêm imagens e fontes para que o print fique igual ao site
+RECURSOS_BLOQUEADOS_POR_SERVICO = {
+    "SALDO": ["imagens", "fontes", "analytics"],
+    "EXTRATO": ["analytics"],
+    "CHAVE": ["analytics"],
+}
+
+# Padrões de URL bloqueados pelo DevTools para cada tipo de recurso (as imagens são bloqueadas pelas preferências do chrome)
+PADROES_URL_RECURSOS = {
+    "fontes": ["*.woff", "*.woff2", "*.ttf", "*.otf", "*.eot"],
+    "analytics": [
+        "*google-analytics.com*",
+        "*googletagmanager.com*",
+        "*doubleclick.net*",
+        "*hotjar.com*",
+    ],
+}
+
+# Tamanho fixo da janela no perfil de desempenho e no modo headless. O `tirar_print_tela` altera o tamanho apenas durante o print
+TAMANHO_JANELA_FIXO = "1366,768"
+
+# Argumentos do chrome que desativam as conexões em segundo plano
+ARGUMENTOS_SEM_REDE_SEGUNDO_PLANO = [
+    "--disable-background-networking",
+    "--disable-component-update",
+    "--disable-default-apps",
+    "--disable-sync",
+    "--metrics-recording-only",
+    "--no-first-run",
+]
+
+# Pasta onde o webdriver_manager guarda os chromedrivers baixados, usada no modo offline
+PASTA_CACHE_WEBDRIVER_MANAGER = Path(os.environ.get("WDM_CACHE_DIR", Path.home() / ".wdm")) / "drivers" / "chromedriver"
+
+# Caminho do chromedriver resolvido no processo, reaproveitado em todas as instancias do driver
+caminho_chromedriver_resolvido = None
+
+# Garante que apenas uma thread resolve o chromedriver (o pool de navegadores abre os navegadores reserva em threads)
+trava_chromedriver = threading.Lock()
+
+# Pasta de versão (ex.: 126.0.6478.126) no caminho do chromedriver dentro do cache do webdriver_manager
+PADRAO_VERSAO_CHROMEDRIVER_CACHE = re.compile(r"^\d+(\.\d+)+$")
+
+# As dependências usadas apenas por algumas etapas (fpdf, webdriver_manager, clientes do google e openpyxl)
+# são importadas dentro das funções, para não pesarem na inicialização de todos os serviços
+
 
 def gerar_pdf(caminho_imagem: Path) -> str:
     """
@@ -28,6 +82,8 @@ def gerar_pdf(caminho_imagem: Path) -> str:
     Args:
         caminho_imagem (Path): caminho da imagem no formato png que vai ser utilizada para montar o pdf
     """
+    from fpdf import FPDF
+
     if not caminho_imagem.exists():
         raise FileNotFoundError(
             f"Erro não previsto na etapa de geração do pdf: a imagem não foi encontrada no caminho sugerido: {caminho_imagem}"
@@ -42,11 +98,95 @@ def gerar_pdf(caminho_imagem: Path) -> str:
     return str(caminho_pdf)
 
 
-def instanciar_drive() -> webdriver:
+def montar_perfil_navegador(parametros: dict) -> dict:
+    """
+    Monta as opções do navegador usadas pelo `instanciar_drive` a partir dos parâmetros da execução. No perfil de desempenho
+    o carregamento é "eager", a rede em segundo plano é desativada, a janela tem tamanho fixo e os recursos configurados para o
+    serviço são bloqueados
+
+    Args:
+        parametros (dict): dicionário de parâmetros recebido pelo `executar_acao`. Usa "perfil_navegador" (PADRAO ou DESEMPENHO),
+            "navegador_headless" (bool), "recursos_bloqueados" (dict com a lista de recursos bloqueados por serviço),
+            "caminho_chromedriver" (caminho local fixo do chromedriver), "chromedriver_offline" (bool), "modo_selecao_certificado"
+            (TECLADO ou POLITICA) e "padrao_url_certificado" (padrão das URLs em que o certificado é selecionado automaticamente)
+    """
+    servico = parametros["servico"]
+    headless = bool(parametros.get("navegador_headless", False))
+    opcoes_chromedriver = {
+        "caminho_chromedriver": parametros.get("caminho_chromedriver"),
+        "chromedriver_offline": bool(parametros.get("chromedriver_offline", False)),
+    }
+
+    selecao_por_politica = (
+        parametros.get("modo_selecao_certificado", MODO_SELECAO_CERTIFICADO_TECLADO)
+        == MODO_SELECAO_CERTIFICADO_POLITICA
+    )
+    if selecao_por_politica:
+        opcoes_chromedriver["padrao_url_certificado"] = parametros.get(
+            "padrao_url_certificado"
+        ) or montar_padrao_url_certificado(parametros["url_site_caixa"])
+    elif headless:
+        # Sem janela o pyautogui não consegue selecionar o certificado
+        instancia_log.info(
+            "Navegador headless disponível apenas no modo POLITICA de seleção do certificado, o navegador vai ser aberto com janela"
+        )
+        headless = False
+
+    if parametros.get("perfil_navegador", PERFIL_NAVEGADOR_PADRAO) != PERFIL_NAVEGADOR_DESEMPENHO:
+        return {"headless": headless, **opcoes_chromedriver}
+
+    recursos_bloqueados = parametros.get("recursos_bloqueados", {}).get(
+        servico, RECURSOS_BLOQUEADOS_POR_SERVICO.get(servico, [])
+    )
+    return {
+        "headless": headless,
+        "recursos_bloqueados": recursos_bloqueados,
+        "estrategia_carregamento": "eager",
+        "tamanho_janela": TAMANHO_JANELA_FIXO,
+        "desativar_rede_segundo_plano": True,
+        **opcoes_chromedriver,
+    }
+
+
+class ChromeContadorComandos(webdriver.Chrome):
+    """
+    Webdriver do chrome que conta os comandos enviados ao chromedriver. Toda consulta ou ação (find_elements, is_displayed, click,
+    execute_script...) passa pelo `execute`, então `qtd_comandos` é a quantidade real de idas e voltas ao navegador
+    """
+
+    qtd_comandos = 0
+
+    def execute(self, driver_command: str, params: dict = None) -> dict:
+        self.qtd_comandos += 1
+        return super().execute(driver_command, params)
+
+
+def instanciar_drive(
+    headless: bool = False,
+    recursos_bloqueados: list = None,
+    estrategia_carregamento: str = "normal",
+    tamanho_janela: str = None,
+    desativar_rede_segundo_plano: bool = False,
+    caminho_chromedriver: str = None,
+    chromedriver_offline: bool = False,
+    padrao_url_certificado: str = None,
+    nome_certificado: str = None,
+) -> webdriver:
     """
     Cria instancia do webdriver para se comunicar com o browser
 
+    Args:
+        headless (bool): abre o navegador sem janela visível
+        recursos_bloqueados (list): tipos de recurso que não são baixados ("imagens", "fontes", "analytics")
+        estrategia_carregamento (str): page load strategy do selenium ("normal" ou "eager")
+        tamanho_janela (str): tamanho fixo da janela no formato "largura,altura"
+        desativar_rede_segundo_plano (bool): desativa as conexões do chrome em segundo plano (atualizações, sincronização, métricas)
+        caminho_chromedriver (str): caminho local fixo do chromedriver. Quando informado o chromedriver não é procurado
+        chromedriver_offline (bool): usa o chromedriver já baixado no cache do webdriver_manager, sem acessar a rede
+        padrao_url_certificado (str): padrão de URL (content settings do chrome) em que o certificado é selecionado automaticamente
+        nome_certificado (str): nome (CN do titular) do certificado selecionado automaticamente. None mantém a janela de seleção
     """
+    recursos_bloqueados = recursos_bloqueados or []
 
     # Configura as opçoes de abertura do drive
     chrome_options = Options()
@@ -58,20 +198,54 @@ def instanciar_drive() -> webdriver:
     chrome_options.add_argument("--no-sandbox")
     # chrome_options.add_argument("--incognito")
     chrome_options.add_argument("--ignore-certificate-errors")
+    chrome_options.page_load_strategy = estrategia_carregamento
+
+    if headless:
+        chrome_options.add_argument("--headless=new")
+        # Sem janela o tamanho padrão é pequeno demais para a página da caixa
+        tamanho_janela = tamanho_janela or TAMANHO_JANELA_FIXO
+    if tamanho_janela:
+        chrome_options.add_argument(f"--window-size={tamanho_janela}")
+    if desativar_rede_segundo_plano:
+        for argumento in ARGUMENTOS_SEM_REDE_SEGUNDO_PLANO:
+            chrome_options.add_argument(argumento)
+    preferencias = {}
+    if "imagens" in recursos_bloqueados:
+        preferencias["profile.managed_default_content_settings.images"] = 2
+    if nome_certificado:
+        # Equivalente, no perfil do navegador, à política AutoSelectCertificateForUrls
+        preferencias["profile.content_settings.exceptions.auto_select_certificate"] = {
+            f"{padrao_url_certificado},*": {
+                "setting": {"filters": [{"SUBJECT": {"CN": nome_certificado}}]}
+            }
+        }
+    if preferencias:
+        chrome_options.add_experimental_option("prefs", preferencias)
+    padroes_url_bloqueados = [
+        padrao
+        for recurso in recursos_bloqueados
+        for padrao in PADROES_URL_RECURSOS.get(recurso, [])
+    ]
 
     tentativas = 0
     max_tentativas = 3
 
+    # O chromedriver é resolvido uma única vez por processo, os reinícios do navegador reaproveitam o caminho
+    service = ChromeService(
+        resolver_caminho_chromedriver(caminho_chromedriver, chromedriver_offline)
+    )
+
     while tentativas < max_tentativas:
         try:
             # Cria instancia do driver
-            service = ChromeService(
-                ChromeDriverManager().install()
-            )
-            
-            driver = webdriver.Chrome(service=service, options=chrome_options)
+            driver = ChromeContadorComandos(service=service, options=chrome_options)
 
             instancia_log.info(f"O driver foi instanciado na tentativa: {tentativas}")
+            # Com tamanho fixo a janela não é maximizada na abertura das páginas
+            driver.tamanho_janela_fixo = bool(tamanho_janela)
+
+            if padroes_url_bloqueados:
+                bloquear_urls(driver, padroes_url_bloqueados)
 
             return driver
         
@@ -79,7 +253,129 @@ def instanciar_drive() -> webdriver:
             tentativas +=1
             msg_erro = f"Tentativa {tentativas}/{max_tentativas}  de instanciar o drive falhou: {traceback.format_exc()}"
             instancia_log.error(msg_erro)
-    raise
+    raise Exception(
+        f"Erro não previsto na instanciação do driver: {max_tentativas} tentativas falharam"
+    )
+
+
+def montar_padrao_url_certificado(url_site: str) -> str:
+    """
+    Monta o padrão de URL, no formato dos content settings do chrome, que cobre o domínio do site e os subdomínios
+
+    Args:
+        url_site (str): url do site que pede o certificado
+    """
+    url = urlparse(url_site)
+    return f"{url.scheme or 'https'}://[*.]{url.hostname}"
+
+
+def versao_principal_chrome_instalado() -> int:
+    """
+    Retorna a versão principal (major) do chrome instalado, lida pelo webdriver_manager sem acessar a rede. Retorna None caso a
+    versão não seja encontrada
+    """
+    try:
+        from webdriver_manager.core.os_manager import ChromeType, OperationSystemManager
+
+        versao = OperationSystemManager().get_browser_version_from_os(ChromeType.GOOGLE)
+        return int(versao.split(".")[0]) if versao else None
+    except Exception as e:
+        instancia_log.info(f"Não foi possível ler a versão do chrome instalado: {e}")
+        return None
+
+
+def versao_chromedriver_cache(caminho_executavel: Path) -> tuple:
+    """
+    Retorna a versão do chromedriver do cache do webdriver_manager, lida da pasta de versão do caminho. Retorna tupla vazia caso o
+    caminho não tenha a pasta de versão
+
+    Args:
+        caminho_executavel (Path): caminho do chromedriver dentro do cache
+    """
+    for parte in reversed(caminho_executavel.parts):
+        if PADRAO_VERSAO_CHROMEDRIVER_CACHE.match(parte):
+            return tuple(int(numero) for numero in parte.split("."))
+    return ()
+
+
+def selecionar_chromedriver_cache() -> str:
+    """
+    Retorna o chromedriver do cache do webdriver_manager compatível com o chrome instalado: o mais recente com a mesma versão
+    principal do chrome. Caso a versão do chrome não seja encontrada, usa o chromedriver de versão mais recente do cache
+    """
+    nome_executavel = "chromedriver.exe" if os.name == "nt" else "chromedriver"
+    executaveis_cache = list(PASTA_CACHE_WEBDRIVER_MANAGER.glob(f"**/{nome_executavel}"))
+    if not executaveis_cache:
+        raise FileNotFoundError(
+            f"Erro não previsto na instanciação do driver: nenhum chromedriver no cache {PASTA_CACHE_WEBDRIVER_MANAGER} para o modo offline"
+        )
+
+    versao_chrome = versao_principal_chrome_instalado()
+    if versao_chrome is None:
+        instancia_log.info("Versão do chrome não encontrada, usando o chromedriver mais recente do cache")
+        candidatos = executaveis_cache
+    else:
+        candidatos = [
+            caminho for caminho in executaveis_cache if versao_chromedriver_cache(caminho)[:1] == (versao_chrome,)
+        ]
+        if not candidatos:
+            versoes_cache = sorted({".".join(map(str, versao_chromedriver_cache(caminho))) for caminho in executaveis_cache})
+            raise FileNotFoundError(
+                f"Erro não previsto na instanciação do driver: nenhum chromedriver da versão {versao_chrome} do chrome no cache "
+                f"{PASTA_CACHE_WEBDRIVER_MANAGER} para o modo offline (versões no cache: {versoes_cache})"
+            )
+    return str(max(candidatos, key=versao_chromedriver_cache))
+
+
+def resolver_caminho_chromedriver(
+    caminho_chromedriver: str = None, chromedriver_offline: bool = False
+) -> str:
+    """
+    Retorna o caminho do chromedriver, resolvido apenas na primeira chamada do processo. O caminho fixo informado nos parâmetros
+    tem prioridade. No modo offline é usado o chromedriver do cache do webdriver_manager com a mesma versão principal do chrome
+    instalado, sem acessar a rede
+
+    Args:
+        caminho_chromedriver (str): caminho local fixo do chromedriver
+        chromedriver_offline (bool): não acessa a rede para verificar a versão do chromedriver
+    """
+    global caminho_chromedriver_resolvido
+
+    if caminho_chromedriver:
+        if not Path(caminho_chromedriver).exists():
+            raise FileNotFoundError(
+                f"Erro não previsto na instanciação do driver: chromedriver não encontrado no caminho {caminho_chromedriver}"
+            )
+        return str(caminho_chromedriver)
+
+    with trava_chromedriver:
+        if caminho_chromedriver_resolvido is not None:
+            return caminho_chromedriver_resolvido
+
+        if chromedriver_offline:
+            caminho_chromedriver_resolvido = selecionar_chromedriver_cache()
+        else:
+            from webdriver_manager.chrome import ChromeDriverManager
+
+            caminho_chromedriver_resolvido = ChromeDriverManager().install()
+
+        instancia_log.info(f"Chromedriver resolvido: {caminho_chromedriver_resolvido}")
+        return caminho_chromedriver_resolvido
+
+
+def bloquear_urls(driver: webdriver, padroes_url: list) -> None:
+    """
+    Bloqueia pelo DevTools as requisições cujas URLs seguem os padrões informados. Caso o bloqueio falhe o navegador segue sem bloqueio
+
+    Args:
+        driver (webdriver): instancia do webdriver do chrome
+        padroes_url (list): padrões de URL bloqueados (aceitam *)
+    """
+    try:
+        driver.execute_cdp_cmd("Network.enable", {})
+        driver.execute_cdp_cmd("Network.setBlockedURLs", {"urls": padroes_url})
+    except WebDriverException as e:
+        instancia_log.error(f"Não foi possível bloquear os recursos do navegador: {e}")
 
 
 def gerar_chave_md5(caminho_arquivo: Path) -> str:
@@ -104,6 +400,49 @@ def gerar_chave_md5(caminho_arquivo: Path) -> str:
     return chave_md5
 
 
+def acrescentar_linha_json(caminho_arquivo: Path, registro: dict) -> None:
+    """
+    Acrescenta o registro no final do arquivo como uma linha JSON e só retorna depois que a linha foi gravada no disco
+
+    Args:
+        caminho_arquivo (Path): caminho local do arquivo NDJSON
+        registro (dict): registro que vai ser gravado, os valores que não são serializáveis em JSON são gravados como texto
+    """
+    acrescentar_linhas_json(caminho_arquivo, [registro])
+
+
+def acrescentar_linhas_json(caminho_arquivo: Path, registros: list[dict]) -> None:
+    """
+    Acrescenta os registros no final do arquivo, um por linha, com uma única gravação no disco
+
+    Args:
+        caminho_arquivo (Path): caminho local do arquivo NDJSON
+        registros (list[dict]): registros que vão ser gravados, os valores que não são serializáveis em JSON são gravados como texto
+    """
+    with open(caminho_arquivo, "a", encoding="utf-8") as arquivo:
+        for registro in registros:
+            arquivo.write(json.dumps(registro, ensure_ascii=False, default=str) + "\n")
+        arquivo.flush()
+        os.fsync(arquivo.fileno())
+
+
+def ler_linhas_json(caminho_arquivo: Path) -> list[dict]:
+    """
+    Lê os registros de um arquivo NDJSON. Linhas incompletas (execução interrompida durante a escrita) são ignoradas
+
+    Args:
+        caminho_arquivo (Path): caminho local do arquivo NDJSON
+    """
+    registros = []
+    with open(caminho_arquivo, encoding="utf-8") as arquivo:
+        for linha in arquivo:
+            try:
+                registros.append(json.loads(linha))
+            except ValueError:
+                instancia_log.info(f"Linha incompleta ignorada no arquivo {caminho_arquivo}")
+    return registros
+
+
 def upload_arquivo_drive(
     caminho_arquivo_a_ser_inserido: str,
     caminho_service_account: str,
@@ -119,6 +458,11 @@ def upload_arquivo_drive(
         id_pasta (str): id da pasta do google drive na qual o arquivo vai ser adicionado
         email_usuario (str): email do usuário em nome do qual vai ser feito o upload do arquivo
     """
+    from googleapiclient.discovery import build
+    from google.oauth2 import service_account
+    from googleapiclient.http import MediaFileUpload
+    from googleapiclient.errors import HttpError
+
     try:
         # Transformar caminho do formato str para Path
         caminho_arquivo_path = Path(caminho_arquivo_a_ser_inserido)
@@ -194,6 +538,8 @@ def escrever_no_excel(
         nome_arquivo_excel (str): nome do arquivo excel que vai ser criado
         pasta_armazenamento (Path): pasta onde o arquivo excel criado vai ser adicionado
     """
+    from openpyxl import Workbook
+
     try:
         if dataframe_para_ser_escrito.empty:
             instancia_log.error("Dataframe para ser escrito está vazio")
@@ -267,10 +613,8 @@ def incluir_info_certificado(
             dados_para_processar, dados_certificado, on="EMPRESA", how="left"
         )
 
-        # Remove colunas que não vão ser necessárias
-        dados_combinados = dados_combinados.drop(
-            ["CAMINHO DO CERTIFICADO", "NOME DO CERTIFICADO"], axis=1
-        )
+        # Remove colunas que não vão ser necessárias. O NOME DO CERTIFICADO é usado na seleção do certificado pelo modo POLITICA
+        dados_combinados = dados_combinados.drop(["CAMINHO DO CERTIFICADO"], axis=1)
 
         # Ordena os certificados para manter as mesmas empresas juntas
         dados_combinados = dados_combinados.sort_values(
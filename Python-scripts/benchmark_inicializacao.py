@@ -0,0 +1,165 @@
+import argparse
+import subprocess
+import sys
+from pathlib import Path
+
+
+# Recupera a pasta em que o script está sendo executado
+DIRETORIO_SCRIPT = Path(__file__).resolve().parent
+
+# Módulo principal, importado no início de toda execução
+MODULO_PRINCIPAL = "executar_acao_site_caixa"
+
+# Dependências carregadas sob demanda ao longo da execução de cada serviço
+MODULOS_SOB_DEMANDA_POR_SERVICO = {
+    "SALDO": [
+        "webdriver_manager.chrome",
+        "pyautogui",
+        "openpyxl",
+        "googleapiclient.discovery",
+        "google.oauth2.service_account",
+        "googleapiclient.http",
+    ],
+    "EXTRATO": [
+        "webdriver_manager.chrome",
+        "pyautogui",
+        "fpdf",
+        "openpyxl",
+        "googleapiclient.discovery",
+        "google.oauth2.service_account",
+        "googleapiclient.http",
+    ],
+    "CHAVE": [
+        "webdriver_manager.chrome",
+        "pyautogui",
+        "fpdf",
+        "openpyxl",
+        "googleapiclient.discovery",
+        "google.oauth2.service_account",
+        "googleapiclient.http",
+    ],
+}
+
+# Orçamento, em milissegundos, para a importação do módulo principal (custo pago antes de qualquer ação no site)
+ORCAMENTO_INICIALIZACAO_MS = 1500
+
+
+def medir_importacao(modulos_sob_demanda: list[str]) -> tuple[float, dict, list]:
+    """
+    Importa o módulo principal e depois os módulos sob demanda em um interpretador novo, usando `python -X importtime`.
+    Retorna o tempo de importação do módulo principal (ms), o tempo acumulado de cada módulo de primeiro nível (ms)
+    e a lista de módulos sob demanda que não puderam ser importados
+
+    Args:
+        modulos_sob_demanda (list[str]): módulos importados depois do módulo principal
+    """
+    codigo = (
+        "import importlib, sys\n"
+        "sys.stderr.write('-- inicio da inicializacao --\\n')\n"
+        f"import {MODULO_PRINCIPAL}\n"
+        "sys.stderr.write('-- fim da inicializacao --\\n')\n"
+        f"for modulo in {modulos_sob_demanda!r}:\n"
+        "    try:\n"
+        "        importlib.import_module(modulo)\n"
+        "    except Exception:\n"
+        "        print(modulo)\n"
+    )
+    resultado = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", codigo],
+        cwd=DIRETORIO_SCRIPT,
+        capture_output=True,
+        text=True,
+    )
+    if resultado.returncode != 0:
+        raise Exception(
+            f"Erro ao importar o módulo {MODULO_PRINCIPAL}: {resultado.stderr.strip().splitlines()[-1]}"
+        )
+
+    tempo_inicializacao_ms = 0.0
+    tempos_modulos_ms = {}
+    inicializacao_iniciada = False
+    inicializacao_finalizada = False
+    for linha in resultado.stderr.splitlines():
+        if linha.startswith("-- inicio da inicializacao --"):
+            inicializacao_iniciada = True
+            continue
+        if linha.startswith("-- fim da inicializacao --"):
+            inicializacao_finalizada = True
+            continue
+        # Os módulos carregados pelo próprio interpretador antes do código medido são ignorados
+        if not inicializacao_iniciada:
+            continue
+        if not linha.startswith("import time:") or "|" not in linha:
+            continue
+
+        # Formato: "import time: self [us] | cumulative | imported package"
+        _, acumulado, nome_modulo = linha.split("|")
+        if nome_modulo.startswith("  ") or not acumulado.strip().isdigit():
+            # Apenas os módulos de primeiro nível entram na soma, os demais já estão no acumulado deles
+            continue
+
+        acumulado_ms = int(acumulado) / 1000
+        tempos_modulos_ms[nome_modulo.strip()] = acumulado_ms
+        if not inicializacao_finalizada:
+            tempo_inicializacao_ms += acumulado_ms
+
+    modulos_indisponiveis = resultado.stdout.split()
+    return tempo_inicializacao_ms, tempos_modulos_ms, modulos_indisponiveis
+
+
+def main() -> int:
+    """
+    Mede o custo de inicialização do `executar_acao` por serviço e falha caso o orçamento seja ultrapassado
+    """
+    parser = argparse.ArgumentParser(
+        description="Mede o tempo de importação do executar_acao_site_caixa por serviço"
+    )
+    parser.add_argument(
+        "--servico",
+        choices=list(MODULOS_SOB_DEMANDA_POR_SERVICO),
+        action="append",
+        help="serviço a ser medido (por padrão todos)",
+    )
+    parser.add_argument(
+        "--orcamento-ms",
+        type=float,
+        default=ORCAMENTO_INICIALIZACAO_MS,
+        help="tempo máximo de importação do módulo principal em milissegundos",
+    )
+    parser.add_argument(
+        "--qtd-modulos",
+        type=int,
+        default=10,
+        help="quantidade de módulos mais lentos exibidos por serviço",
+    )
+    argumentos = parser.parse_args()
+
+    orcamento_ultrapassado = False
+    for servico in argumentos.servico or MODULOS_SOB_DEMANDA_POR_SERVICO:
+        tempo_inicializacao_ms, tempos_modulos_ms, modulos_indisponiveis = (
+            medir_importacao(MODULOS_SOB_DEMANDA_POR_SERVICO[servico])
+        )
+        tempo_total_ms = sum(tempos_modulos_ms.values())
+
+        print(f"=== {servico} ===")
+        print(f"Inicialização ({MODULO_PRINCIPAL}): {tempo_inicializacao_ms:.1f} ms")
+        print(f"Inicialização + módulos sob demanda: {tempo_total_ms:.1f} ms")
+        modulos_mais_lentos = sorted(
+            tempos_modulos_ms.items(), key=lambda item: item[1], reverse=True
+        )
+        for nome_modulo, tempo_ms in modulos_mais_lentos[: argumentos.qtd_modulos]:
+            print(f"    {tempo_ms:9.1f} ms  {nome_modulo}")
+        if modulos_indisponiveis:
+            print(f"Módulos não importados: {', '.join(modulos_indisponiveis)}")
+
+        if tempo_inicializacao_ms > argumentos.orcamento_ms:
+            orcamento_ultrapassado = True
+            print(
+                f"Orçamento de {argumentos.orcamento_ms:.0f} ms ultrapassado na inicialização do serviço {servico}"
+            )
+
+    return 1 if orcamento_ultrapassado else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,114 @@
+import contextlib
+import json
+import sys
+import time
+
+
+# Chave que identifica uma linha do stdout como evento do canal
+CHAVE_EVENTO = "evento"
+
+# Fila para onde os eventos são enviados nos processos de navegadores paralelos. Quando é None os eventos vão para o stdout
+fila_eventos = None
+
+# Funções chamadas com cada evento escrito por este processo (inclusive os eventos repassados dos navegadores paralelos)
+ouvintes_eventos = []
+
+
+def direcionar_eventos_para_fila(fila) -> None:
+    """
+    Faz com que os eventos deste processo sejam enviados para a fila, que é lida pelo processo principal
+
+    Args:
+        fila: fila compartilhada com o processo principal
+    """
+    global fila_eventos
+    fila_eventos = fila
+
+
+def registrar_ouvinte_eventos(ouvinte) -> None:
+    """
+    Registra uma função que vai ser chamada com cada evento escrito por este processo
+
+    Args:
+        ouvinte: função que recebe o evento (dict)
+    """
+    ouvintes_eventos.append(ouvinte)
+
+
+def remover_ouvinte_eventos(ouvinte) -> None:
+    """
+    Remove uma função registrada pelo `registrar_ouvinte_eventos`
+
+    Args:
+        ouvinte: função registrada anteriormente
+    """
+    if ouvinte in ouvintes_eventos:
+        ouvintes_eventos.remove(ouvinte)
+
+
+def escrever_evento(evento: dict) -> None:
+    """
+    Repassa o evento para os ouvintes registrados e escreve o evento no stdout como uma linha JSON
+
+    Args:
+        evento (dict): evento completo, já com o tipo e o momento
+    """
+    for ouvinte in ouvintes_eventos:
+        ouvinte(evento)
+    sys.stdout.write(json.dumps(evento, default=str) + "\n")
+    sys.stdout.flush()
+
+
+def emitir_evento(tipo_evento: str, **dados) -> None:
+    """
+    Emite um evento como uma linha JSON no stdout, para que o processo pai acompanhe a execução enquanto ela acontece
+
+    Args:
+        tipo_evento (str): tipo do evento (linha_iniciada, linha_finalizada, etapa, resumo)
+        dados: informações do evento, que precisam ser serializáveis em JSON
+    """
+    evento = {CHAVE_EVENTO: tipo_evento, "momento": time.time(), **dados}
+    if fila_eventos is not None:
+        fila_eventos.put(evento)
+        return
+    escrever_evento(evento)
+
+
+@contextlib.contextmanager
+def medir_etapa(nome_etapa: str, **dados):
+    """
+    Mede o tempo gasto no bloco e emite um evento de etapa com a duração em segundos
+
+    Args:
+        nome_etapa (str): nome da etapa que está sendo medida
+        dados: informações adicionais do evento, por exemplo o index da linha
+    """
+    inicio = time.perf_counter()
+    try:
+        yield
+    finally:
+        emitir_evento(
+            "etapa",
+            etapa=nome_etapa,
+            duracao=round(time.perf_counter() - inicio, 3),
+            **dados,
+        )
+
+
+def interpretar_linha(linha: str) -> dict | None:
+    """
+    Retorna o evento contido na linha do stdout, ou None caso a linha não seja um evento do canal
+
+    Args:
+        linha (str): linha lida do stdout do processo filho
+    """
+    linha = linha.strip()
+    if not linha.startswith("{"):
+        return None
+    try:
+        evento = json.loads(linha)
+    except ValueError:
+        return None
+    if not isinstance(evento, dict) or CHAVE_EVENTO not in evento:
+        return None
+    return evento
@@ -0,0 +1,154 @@
+import hashlib
+import json
+import re
+import time
+import pandas as pd
+from pathlib import Path
+
+from registrador_logs import instancia_log
+from auxiliar import acrescentar_linha_json, ler_linhas_json
+
+
+# Colunas do input que identificam uma linha entre execuções
+COLUNAS_CHAVE_LINHA = [
+    "EMPRESA",
+    "NOME",
+    "CPF",
+    "PIS",
+    "DATA DE ADMISSAO",
+    "CODIGO EXECUCAO",
+]
+
+# Status que não precisam ser processados novamente quando a execução é retomada
+STATUS_FINALIZADOS = ["SUCESSO", "ERRO PREVISTO"]
+
+# Formato da observação retornada pelo `upload_arquivo_drive`
+PADRAO_UPLOAD_DRIVE = re.compile(
+    r"Arquivo output:(?P<link>\S+) \| Chave para validação: (?P<md5>[0-9a-f]+)"
+)
+
+
+def gerar_chaves_linhas(dados_para_processar: pd.DataFrame) -> pd.Series:
+    """
+    Gera as chaves que identificam as linhas entre execuções, a partir da posição da linha no input e dos dados do colaborador
+
+    Args:
+        dados_para_processar (pd.DataFrame): linhas do input (o index é a posição da linha no arquivo de input)
+    """
+    colunas_chave = [
+        coluna for coluna in COLUNAS_CHAVE_LINHA if coluna in dados_para_processar.columns
+    ]
+    valores_chave = dados_para_processar[colunas_chave].astype(str).apply(
+        lambda coluna: coluna.str.strip()
+    )
+    return pd.Series(
+        [
+            hashlib.md5(json.dumps([str(index), *valores]).encode("utf-8")).hexdigest()
+            for index, valores in zip(
+                valores_chave.index, valores_chave.itertuples(index=False, name=None)
+            )
+        ],
+        index=dados_para_processar.index,
+        dtype=object,
+    )
+
+
+class DiarioExecucao:
+    def __init__(self, caminho_diario: Path) -> None:
+        """
+        Inicializa a classe DiarioExecucao, que grava o resultado de cada linha em um arquivo NDJSON (apenas acrescentando registros),
+        para que uma nova execução do mesmo input possa ser retomada sem reprocessar as linhas já finalizadas
+
+        Args:
+            caminho_diario (Path): caminho local do arquivo do diário
+        """
+        self.caminho_diario = Path(caminho_diario)
+
+    def para_processo(self, sufixo: str) -> "DiarioExecucao":
+        """
+        Retorna o diário usado por um processo de navegador paralelo, gravado em um arquivo próprio ao lado do diário principal
+
+        Args:
+            sufixo (str): sufixo incluído no nome do arquivo, por exemplo o pid do processo
+        """
+        return DiarioExecucao(
+            self.caminho_diario.with_name(
+                f"{self.caminho_diario.stem}{sufixo}{self.caminho_diario.suffix}"
+            )
+        )
+
+    def registrar(
+        self,
+        chave_linha: str,
+        index,
+        servico: str,
+        status: str,
+        observacao: str,
+        dados_saldo: dict = None,
+    ) -> None:
+        """
+        Grava o resultado do processamento da linha no diário
+
+        Args:
+            chave_linha (str): chave da linha gerada pelo `gerar_chaves_linhas`
+            index: index da linha processada
+            servico (str): serviço executado
+            status (str): status do processamento
+            observacao (str): observação do processamento
+            dados_saldo (dict): colunas de saldo extraídas para a linha (apenas no serviço SALDO)
+        """
+        resultado_upload = PADRAO_UPLOAD_DRIVE.search(str(observacao or ""))
+        acrescentar_linha_json(
+            self.caminho_diario,
+            {
+                "chave_linha": chave_linha,
+                "index": int(index),
+                "servico": servico,
+                "status": status,
+                "observacao": observacao,
+                "link_drive": resultado_upload["link"] if resultado_upload else None,
+                "chave_md5": resultado_upload["md5"] if resultado_upload else None,
+                "dados_saldo": dados_saldo,
+                "momento": time.time(),
+            },
+        )
+
+    def carregar(self, servico: str) -> dict:
+        """
+        Lê o diário principal e os diários dos navegadores paralelos e retorna o último registro de cada linha para o serviço
+
+        Args:
+            servico (str): serviço que vai ser executado
+        """
+        registros = []
+        padrao_arquivos = f"{self.caminho_diario.stem}*{self.caminho_diario.suffix}"
+        for caminho_arquivo in self.caminho_diario.parent.glob(padrao_arquivos):
+            registros.extend(ler_linhas_json(caminho_arquivo))
+
+        ultimo_registro_linha = {}
+        for registro in sorted(registros, key=lambda registro: registro.get("momento", 0)):
+            if registro.get("servico") == servico:
+                ultimo_registro_linha[registro["chave_linha"]] = registro
+        return ultimo_registro_linha
+
+    def recuperar_linhas_finalizadas(
+        self, dados_para_processar: pd.DataFrame, servico: str
+    ) -> dict:
+        """
+        Retorna os registros do diário das linhas que já foram finalizadas (sucesso ou erro previsto), indexados pelo index da linha
+
+        Args:
+            dados_para_processar (pd.DataFrame): dados de input da execução atual
+            servico (str): serviço que vai ser executado
+        """
+        ultimo_registro_linha = self.carregar(servico)
+        instancia_log.info(
+            f"Diário da execução lido: {len(ultimo_registro_linha)} linha(s) registradas para o serviço {servico}"
+        )
+
+        linhas_finalizadas = {}
+        for index, chave_linha in gerar_chaves_linhas(dados_para_processar).items():
+            registro = ultimo_registro_linha.get(chave_linha)
+            if registro is not None and registro["status"] in STATUS_FINALIZADOS:
+                linhas_finalizadas[index] = registro
+        return linhas_finalizadas
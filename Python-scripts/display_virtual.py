@@ -0,0 +1,95 @@
+import atexit
+import os
+import select
+import shutil
+import subprocess
+import sys
+
+from registrador_logs import instancia_log
+
+
+# Resolução da tela virtual de cada navegador
+RESOLUCAO_DISPLAY_VIRTUAL = "1920x1080x24"
+
+# Tempo máximo de espera pelo Xvfb informar o número do display
+TIMEOUT_INICIO_DISPLAY = 10
+
+
+class DisplayVirtual:
+    def __init__(self, processo: subprocess.Popen, numero_display: int) -> None:
+        """
+        Inicializa a classe DisplayVirtual, que representa uma tela X virtual (Xvfb) exclusiva do processo. O chrome e o pyautogui do
+        processo usam essa tela, então a seleção do certificado pelo teclado não disputa o teclado com os outros navegadores
+
+        Args:
+            processo (subprocess.Popen): processo do Xvfb
+            numero_display (int): número do display criado pelo Xvfb
+        """
+        self.processo = processo
+        self.numero_display = numero_display
+
+    @classmethod
+    def iniciar(cls) -> "DisplayVirtual":
+        """
+        Inicia um Xvfb em um display livre e aponta a variável DISPLAY do processo para ele. Precisa ser chamado antes da abertura
+        do chrome e da importação do pyautogui, que se conecta ao display na importação. Retorna None caso o isolamento não esteja
+        disponível (fora do linux, sem Xvfb instalado ou falha na inicialização)
+        """
+        if not sys.platform.startswith("linux"):
+            instancia_log.info("Display virtual disponível apenas no linux")
+            return None
+        caminho_xvfb = shutil.which("Xvfb")
+        if caminho_xvfb is None:
+            instancia_log.info("Xvfb não encontrado, o display virtual não vai ser usado")
+            return None
+
+        # O Xvfb escolhe um display livre e escreve o número no descritor informado em -displayfd
+        leitura, escrita = os.pipe()
+        try:
+            processo = subprocess.Popen(
+                [
+                    caminho_xvfb,
+                    "-displayfd", str(escrita),
+                    "-screen", "0", RESOLUCAO_DISPLAY_VIRTUAL,
+                    "-nolisten", "tcp",
+                ],
+                pass_fds=(escrita,),
+                stdout=subprocess.DEVNULL,
+                stderr=subprocess.DEVNULL,
+            )
+        except OSError as e:
+            os.close(leitura)
+            os.close(escrita)
+            instancia_log.error(f"Não foi possível iniciar o Xvfb: {e}")
+            return None
+        os.close(escrita)
+
+        try:
+            prontos, _, _ = select.select([leitura], [], [], TIMEOUT_INICIO_DISPLAY)
+            numero_display = os.read(leitura, 16).decode().strip() if prontos else ""
+        finally:
+            os.close(leitura)
+        if not numero_display.isdigit():
+            instancia_log.error("O Xvfb não informou o número do display, o display virtual não vai ser usado")
+            processo.kill()
+            processo.wait()
+            return None
+
+        os.environ["DISPLAY"] = f":{numero_display}"
+        display_virtual = cls(processo, int(numero_display))
+        atexit.register(display_virtual.encerrar)
+        instancia_log.info(f"Display virtual :{numero_display} iniciado")
+        return display_virtual
+
+    def encerrar(self) -> None:
+        """
+        Encerra o Xvfb
+        """
+        if self.processo.poll() is not None:
+            return
+        self.processo.terminate()
+        try:
+            self.processo.wait(timeout=5)
+        except subprocess.TimeoutExpired:
+            self.processo.kill()
+            self.processo.wait()
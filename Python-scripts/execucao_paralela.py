@@ -0,0 +1,241 @@
+import collections
+import multiprocessing
+import os
+import queue
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+
+import pandas as pd
+
+from agendador_linhas import agrupar_linhas_por_empresa
+from canal_eventos import CHAVE_EVENTO, direcionar_eventos_para_fila, escrever_evento
+from diario_execucao import DiarioExecucao
+from display_virtual import DisplayVirtual
+from processador_linhas import ProcessadorLinhas, STATUS_PROCESSADOS
+from registrador_logs import ConfiguradorLog, instancia_log
+
+
+# Recupera a pasta em que o script está sendo executado
+SCRIPT_DIRECTORY = Path(__file__).resolve().parent
+
+# Trava de login recebida na inicialização de cada processo de navegador. Fica None quando o processo tem display virtual próprio
+trava_login_processo = None
+
+# Display virtual (Xvfb) exclusivo do processo de navegador, quando o isolamento está ativo
+display_virtual_processo = None
+
+
+def distribuir_linhas(dados_validos: pd.DataFrame, qtd_navegadores: int) -> list[list]:
+    """
+    Agrupa as linhas por certificado/empresa e distribui os grupos entre os navegadores. Os maiores grupos são distribuídos
+    primeiro, sempre para o navegador com menos linhas. Dentro de cada navegador a ordem original das linhas é mantida
+
+    Args:
+        dados_validos (pd.DataFrame): linhas com certificado valido, ordenadas pela posição do certificado
+        qtd_navegadores (int): quantidade máxima de navegadores
+    """
+    # Linhas do mesmo certificado/empresa ficam sempre no mesmo navegador, para que o login seja feito apenas uma vez
+    grupos = agrupar_linhas_por_empresa(dados_validos)
+    grupos.sort(key=len, reverse=True)
+
+    lotes = [[] for _ in range(min(qtd_navegadores, len(grupos)))]
+    for grupo in grupos:
+        min(lotes, key=len).extend(grupo)
+
+    posicao_linha = {index: posicao for posicao, index in enumerate(dados_validos.index)}
+    return [sorted(lote, key=posicao_linha.get) for lote in lotes]
+
+
+def inicializar_processo_navegador(fila_eventos, trava_login, isolar_display: bool = False) -> None:
+    """
+    Configura o processo de um navegador paralelo: log próprio, eventos enviados para o processo principal, display virtual e
+    trava de login
+
+    Args:
+        fila_eventos: fila lida pelo processo principal para repassar os eventos
+        trava_login: trava que garante que apenas um navegador faça a seleção do certificado por vez
+        isolar_display (bool): abre o navegador do processo em um display virtual próprio. Com o display isolado o teclado do
+            pyautogui não é compartilhado e a trava de login deixa de ser usada. Caso o isolamento não esteja disponível a trava é mantida
+    """
+    global trava_login_processo, display_virtual_processo
+
+    direcionar_eventos_para_fila(fila_eventos)
+
+    arquivo_log = ConfiguradorLog(SCRIPT_DIRECTORY)
+    arquivo_log.configurar_arquivo_log(sufixo=f"_navegador_{os.getpid()}")
+    arquivo_log.incluir_info_execucao()
+
+    if isolar_display:
+        display_virtual_processo = DisplayVirtual.iniciar()
+    trava_login_processo = trava_login if display_virtual_processo is None else None
+
+
+def processar_lote(
+    parametros: dict,
+    pasta_armazenamento_output: Path,
+    dados_lote: pd.DataFrame,
+    df_output_saldo_lote: pd.DataFrame,
+    diario_execucao: DiarioExecucao,
+) -> tuple[pd.DataFrame, pd.DataFrame, dict]:
+    """
+    Processa as linhas de um lote com um navegador próprio e retorna os dataframes atualizados e os contadores de sessão
+
+    Args:
+        parametros (dict): dicionário de parâmetros recebido pelo `executar_acao`
+        pasta_armazenamento_output (Path): pasta onde os arquivos gerados pelo serviço são armazenados
+        dados_lote (pd.DataFrame): linhas do lote
+        df_output_saldo_lote (pd.DataFrame): linhas do lote no dataframe de output do serviço SALDO
+        diario_execucao (DiarioExecucao): diário da execução, cada navegador grava em um arquivo próprio
+    """
+    processador_linhas = ProcessadorLinhas(
+        parametros,
+        pasta_armazenamento_output,
+        trava_login_processo,
+        diario_execucao.para_processo(f"_navegador_{os.getpid()}"),
+    )
+    processador_linhas.processar(dados_lote, df_output_saldo_lote)
+    return (
+        dados_lote,
+        processador_linhas.df_output_saldo,
+        processador_linhas.contadores_sessao(),
+    )
+
+
+def aplicar_linha_finalizada(
+    evento: dict, dados_para_processar: pd.DataFrame, df_output_saldo: pd.DataFrame
+) -> None:
+    """
+    Atualiza nos dataframes do processo principal o status, a observação e o saldo de uma linha finalizada por um navegador
+    paralelo. Assim o resultado das linhas já finalizadas é mantido mesmo que o navegador encerre com erro antes do fim do lote
+
+    Args:
+        evento (dict): evento linha_finalizada recebido do navegador paralelo
+        dados_para_processar (pd.DataFrame): dados de input, onde as colunas STATUS e OBSERVAÇÃO vão ser atualizadas
+        df_output_saldo (pd.DataFrame): dataframe de output do serviço SALDO (None para os demais serviços)
+    """
+    index = evento["index"]
+    dados_para_processar.at[index, "STATUS"] = evento["status"]
+    dados_para_processar.at[index, "OBSERVAÇÃO"] = evento["observacao"]
+    if df_output_saldo is not None and evento.get("dados_saldo"):
+        for coluna, valor in evento["dados_saldo"].items():
+            if coluna not in df_output_saldo.columns:
+                df_output_saldo[coluna] = None
+            df_output_saldo.at[index, coluna] = valor
+
+
+def repassar_eventos(
+    fila_eventos,
+    dados_para_processar: pd.DataFrame,
+    df_output_saldo: pd.DataFrame,
+    timeout: float = 0,
+) -> None:
+    """
+    Escreve no stdout os eventos recebidos dos navegadores paralelos e aplica nos dataframes o resultado das linhas finalizadas
+
+    Args:
+        fila_eventos: fila com os eventos dos navegadores paralelos
+        dados_para_processar (pd.DataFrame): dados de input, onde as colunas STATUS e OBSERVAÇÃO vão ser atualizadas
+        df_output_saldo (pd.DataFrame): dataframe de output do serviço SALDO (None para os demais serviços)
+        timeout (float): tempo máximo de espera pelo primeiro evento
+    """
+    try:
+        evento = fila_eventos.get(timeout=timeout) if timeout else fila_eventos.get_nowait()
+        while True:
+            if evento.get(CHAVE_EVENTO) == "linha_finalizada":
+                aplicar_linha_finalizada(evento, dados_para_processar, df_output_saldo)
+            escrever_evento(evento)
+            evento = fila_eventos.get_nowait()
+    except queue.Empty:
+        pass
+
+
+def executar_em_paralelo(
+    parametros: dict,
+    pasta_armazenamento_output: Path,
+    dados_para_processar: pd.DataFrame,
+    df_output_saldo: pd.DataFrame,
+    indices_linhas_validas: pd.Index,
+    qtd_navegadores: int,
+    diario_execucao: DiarioExecucao,
+) -> dict:
+    """
+    Processa as linhas válidas com vários navegadores, cada um em um processo próprio, e junta o resultado nos dataframes recebidos.
+    Retorna a soma dos contadores de sessão (logins e reinícios) de todos os navegadores
+
+    Args:
+        parametros (dict): dicionário de parâmetros recebido pelo `executar_acao`
+        pasta_armazenamento_output (Path): pasta onde os arquivos gerados pelo serviço são armazenados
+        dados_para_processar (pd.DataFrame): dados de input, onde as colunas STATUS e OBSERVAÇÃO vão ser atualizadas
+        df_output_saldo (pd.DataFrame): dataframe de output do serviço SALDO (None para os demais serviços)
+        indices_linhas_validas (pd.Index): indices das linhas com certificado valido
+        qtd_navegadores (int): quantidade máxima de navegadores em paralelo
+        diario_execucao (DiarioExecucao): diário onde o resultado de cada linha é gravado
+    """
+    lotes = distribuir_linhas(
+        dados_para_processar.loc[indices_linhas_validas], qtd_navegadores
+    )
+    contadores_sessao = collections.Counter()
+    if not lotes:
+        return dict(contadores_sessao)
+    instancia_log.info(f"Linhas distribuídas em {len(lotes)} navegador(es): {[len(lote) for lote in lotes]}")
+
+    contexto = multiprocessing.get_context("spawn")
+    fila_eventos = contexto.Queue()
+    trava_login = contexto.Lock()
+
+    with ProcessPoolExecutor(
+        max_workers=len(lotes),
+        mp_context=contexto,
+        initializer=inicializar_processo_navegador,
+        initargs=(fila_eventos, trava_login, bool(parametros.get("isolar_display", False))),
+    ) as executor:
+        futuros = {
+            executor.submit(
+                processar_lote,
+                parametros,
+                pasta_armazenamento_output,
+                dados_para_processar.loc[lote].copy(),
+                df_output_saldo.loc[lote].copy() if df_output_saldo is not None else None,
+                diario_execucao,
+            ): lote
+            for lote in lotes
+        }
+
+        while not all(futuro.done() for futuro in futuros):
+            repassar_eventos(fila_eventos, dados_para_processar, df_output_saldo, timeout=0.5)
+
+    # Eventos que chegaram depois da finalização dos processos
+    repassar_eventos(fila_eventos, dados_para_processar, df_output_saldo)
+
+    for futuro, lote in futuros.items():
+        try:
+            dados_lote, df_output_saldo_lote, contadores_sessao_lote = futuro.result()
+        except Exception as e:
+            instancia_log.error(f"Navegador paralelo encerrado com erro: {e}")
+            # As linhas finalizadas pelo navegador antes do erro já receberam o status pelos eventos e são mantidas
+            condicao_linhas_nao_processadas = ~dados_para_processar.loc[
+                lote, "STATUS"
+            ].isin(STATUS_PROCESSADOS)
+            linhas_nao_processadas = condicao_linhas_nao_processadas[
+                condicao_linhas_nao_processadas
+            ].index
+            dados_para_processar.loc[linhas_nao_processadas, "STATUS"] = (
+                "LINHA NÃO PROCESSADA"
+            )
+            dados_para_processar.loc[linhas_nao_processadas, "OBSERVAÇÃO"] = (
+                f"Linha não foi processada, pois o navegador paralelo encerrou com erro, fazer uma nova solicitação: {e}"
+            )
+            continue
+
+        contadores_sessao.update(contadores_sessao_lote)
+        dados_para_processar.loc[lote, ["STATUS", "OBSERVAÇÃO"]] = dados_lote[
+            ["STATUS", "OBSERVAÇÃO"]
+        ]
+
+        if df_output_saldo is not None:
+            # O serviço SALDO pode criar colunas novas (SALDO 2, SALDO 3...) quando o trabalhador tem mais de uma ocorrência
+            for coluna in df_output_saldo_lote.columns.difference(df_output_saldo.columns):
+                df_output_saldo[coluna] = None
+            df_output_saldo.loc[lote, df_output_saldo_lote.columns] = df_output_saldo_lote
+
+    return dict(contadores_sessao)
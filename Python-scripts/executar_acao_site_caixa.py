@@ -1,24 +1,50 @@
+import functools
 import sys
 import pandas as pd
 from pathlib import Path
 
-from POM.pages.pagina_chave import PaginaChave
-from POM.pages.pagina_extrato_fgts import PaginaExtratoFgts
-from POM.pages.pagina_inicial import PaginaInicial
-from POM.pages.pagina_localizacao_trabalhador import PaginaLocalizacaoTrabalhador
-from POM.pages.pagina_selecao_servicos import PaginaSelecaoServicos
 from registrador_logs import ConfiguradorLog
 from registrador_logs import instancia_log
+from canal_eventos import (
+    CHAVE_EVENTO,
+    emitir_evento,
+    medir_etapa,
+    registrar_ouvinte_eventos,
+    remover_ouvinte_eventos,
+)
+from processador_linhas import ProcessadorLinhas, STATUS_PROCESSADOS
+from execucao_paralela import executar_em_paralelo
+from diario_execucao import DiarioExecucao
+from relatorio_incremental import RelatorioIncremental
 from auxiliar import (
-    instanciar_drive,
     upload_arquivo_drive,
-    escrever_no_excel,
     incluir_info_certificado
 )
 
 # Recupera a pasta em que o script está sendo executado
 SCRIPT_DIRECTORY = Path(__file__).resolve().parent
 
+# Colunas que não são escritas no relatório da execução
+COLUNAS_REMOVIDAS_RELATORIO_EXECUCAO = [
+    "STATUS CERTIFICADO",
+    "POSICAO DO CERTIFICADO",
+    "NOME DO CERTIFICADO",
+    "ID PASTA DRIVE SALDO",
+    "ID PASTA DRIVE EXTRATO",
+    "ID PASTA DRIVE CHAVE",
+]
+
+# Colunas que não são escritas no output do serviço SALDO
+COLUNAS_REMOVIDAS_EXTRATO_SALDO = [
+    "STATUS CERTIFICADO",
+    "ALERTA CERTIFICADO",
+    "POSICAO DO CERTIFICADO",
+    "NOME DO CERTIFICADO",
+    "ID PASTA DRIVE SALDO",
+    "ID PASTA DRIVE EXTRATO",
+    "ID PASTA DRIVE CHAVE",
+]
+
 
 def executar_acao(parametros: dict) -> None:
     """
@@ -36,18 +62,12 @@ def executar_acao(parametros: dict) -> None:
     # Incluir informações iniciais da execução no arquivo de log
     ConfiguradorLog.incluir_info_execucao(arquivo_log)
 
-    # Recupera parâmetros
-    url_site_caixa = parametros["url_site_caixa"]
+    # Recupera parâmetros (os parâmetros usados no site são lidos pelo ProcessadorLinhas)
     servico = parametros["servico"]
     caminho_arquivo_input = parametros["caminho_arquivo_input"]
-    ambiente_execucao = parametros["ambiente_execucao"]
-    caminho_service_account = parametros["caminho_service_account"]
-    email_usuario = parametros["email_usuario"]
     caminho_arquivo_dados_certificados = parametros[
         "caminho_arquivo_dados_certificados"
     ]
-    max_qtd_retry = parametros["max_qtd_retry"]
-    max_qtd_falhas_consecutivas = parametros["max_qtd_falhas_consecutivas"]
     caminho_relativo_output_scripts = parametros["caminho_relativo_output_scripts"]
     caminho_relativo_relatorio_execucao = parametros[
         "caminho_relativo_relatorio_execucao"
@@ -63,10 +83,11 @@ def executar_acao(parametros: dict) -> None:
     )
 
     # Ler dados de input
-    dados_para_processar = pd.read_excel(
-        caminho_arquivo_input, dtype={"CPF": str, "PIS": str, "DATA DE ADMISSAO": str}
-    )
-
+    with medir_etapa("leitura dos dados de input"):
+        dados_para_processar = pd.read_excel(
+            caminho_arquivo_input,
+            dtype={"CPF": str, "PIS": str, "DATA DE ADMISSAO": str},
+        )
 
     qtd_linhas_recebidas_para_processar = len(dados_para_processar)
     instancia_log.info("Dados de input lidos")
@@ -75,7 +96,8 @@ def executar_acao(parametros: dict) -> None:
     )
 
     # Ler dados de certificado
-    dados_certificados = pd.read_excel(caminho_arquivo_dados_certificados)
+    with medir_etapa("leitura dos dados de certificado"):
+        dados_certificados = pd.read_excel(caminho_arquivo_dados_certificados)
     instancia_log.info("Dados de certificado digital lidos")
 
     # Adiciona dados de certificado nos dados para processar
@@ -102,387 +124,234 @@ def executar_acao(parametros: dict) -> None:
         "Certificado digital para acesssar site da caixa invalido"
     )
 
-    # Cria instancia para o driver
-    driver = instanciar_drive()
-    instancia_log.info("Driver instanciado")
-
-    # Cria instancia para páginas
-    pagina_inicial = PaginaInicial(driver, url_site_caixa)
-    pagina_selecao_servicos = PaginaSelecaoServicos(driver, url_site_caixa)
-    pagina_localizacao_trabalhador = PaginaLocalizacaoTrabalhador(
-        driver, url_site_caixa
-    )
-    pagina_extrato_fgts = PaginaExtratoFgts(driver, url_site_caixa)
-    pagina_chave = PaginaChave(driver, url_site_caixa)
-
-    instancia_log.info("Paginas instanciadas")
-
-    reiniciar_navegador = False
     condicao_linhas_certificado_valido = (
         dados_para_processar["STATUS CERTIFICADO"] == "VALIDO"
     )
-    qtd_linhas_validas = len(dados_para_processar[condicao_linhas_certificado_valido])
+    dados_validos = dados_para_processar[condicao_linhas_certificado_valido]
+    qtd_linhas_validas = len(dados_validos)
     instancia_log.info(
         f"{qtd_linhas_validas} linha(s) com certificado valido para processar"
     )
-    index_linha_valida = 0
-    empresa_anterior = ""
-    contador_falhas_consecutivas = 0
-    condicao_para_executar = True
-    status_processamento = ""
+
+    # Diário onde o resultado de cada linha é gravado assim que a linha termina, para que a execução possa ser retomada
+    caminho_diario_execucao = parametros.get(
+        "caminho_diario_execucao",
+        pasta_armazenamento_relatorio_execucao
+        / f"diario_execucao_{Path(caminho_arquivo_input).stem}_{servico}.ndjson",
+    )
+    diario_execucao = DiarioExecucao(caminho_diario_execucao)
+
+    # Na retomada as linhas já finalizadas em uma execução anterior (sucesso ou erro previsto) não são processadas novamente
+    linhas_finalizadas = {}
+    if parametros.get("retomar_execucao", False):
+        linhas_finalizadas = diario_execucao.recuperar_linhas_finalizadas(
+            dados_validos, servico
+        )
+        for index, registro in linhas_finalizadas.items():
+            dados_para_processar.at[index, "STATUS"] = registro["status"]
+            dados_para_processar.at[index, "OBSERVAÇÃO"] = registro["observacao"]
+            if servico == "SALDO":
+                for coluna, valor in (registro.get("dados_saldo") or {}).items():
+                    if coluna not in df_output_saldo.columns:
+                        df_output_saldo[coluna] = None
+                    df_output_saldo.at[index, coluna] = valor
+        instancia_log.info(
+            f"Execução retomada: {len(linhas_finalizadas)} linha(s) já finalizadas não serão processadas novamente"
+        )
+    dados_pendentes = dados_validos.drop(index=list(linhas_finalizadas))
+
+    # Relatórios gravados linha a linha durante a execução e convertidos para excel no final
+    relatorio_execucao = RelatorioIncremental(
+        pasta_armazenamento_relatorio_execucao,
+        "relatorio_execucao",
+        COLUNAS_REMOVIDAS_RELATORIO_EXECUCAO,
+    )
+    relatorio_execucao.incluir_linhas(dados_para_processar)
+    relatorio_saldo = None
+    if servico == "SALDO":
+        relatorio_saldo = RelatorioIncremental(
+            pasta_armazenamento_output,
+            "extrato_fgts_saldo",
+            COLUNAS_REMOVIDAS_EXTRATO_SALDO,
+        )
+        relatorio_saldo.incluir_linhas(df_output_saldo)
+    ouvinte_relatorios = functools.partial(
+        atualizar_relatorios_linha_finalizada,
+        relatorio_execucao=relatorio_execucao,
+        relatorio_saldo=relatorio_saldo,
+    )
+    registrar_ouvinte_eventos(ouvinte_relatorios)
 
     try:
         # Percorrer cada linha que possua certificado valido e realizar as ações necessárias
-        for index, row in dados_para_processar[
-            condicao_linhas_certificado_valido
-        ].iterrows():
-            condicao_para_executar = True 
-            contador_retry = 0
-
-            while condicao_para_executar and (
-                contador_falhas_consecutivas < max_qtd_falhas_consecutivas
-            ):
-                try:
-                    # Identificando linha
-                    instancia_log.info("========================================")
-                    instancia_log.info(f"index linha válida: {index_linha_valida}")
-                    ultima_linha = (index_linha_valida + 1) == qtd_linhas_validas
-                    instancia_log.info(
-                        f"Processando linha {index + 1} /Última linha: {ultima_linha}"
-                    )
-                    instancia_log.info("========================================")
-
-                    # Recupera dados da linha que vão ser utilizados no processamento para acessar o site e localizar o colaborador
-                    nome_colaborador_original = str(row["NOME"]).strip() # Nome original do colaborador sem a remoção de preposições
-                    nome_colaborador = str(row["NOME"]).strip().replace(" DA ", " ").replace(" DE ", " ").replace(" DO ", " ").replace(" DOS ", " ").replace(" DAS ", " ").replace(" E ", " ")
-                    data_admissao = str(row["DATA DE ADMISSAO"]).strip()
-                    posicao_certificado = row["POSICAO DO CERTIFICADO"]
-                    empresa = str(row["EMPRESA"]).strip()
-                    id_pasta = str(row[f"ID PASTA DRIVE {servico}"])
-                    empresa_atual = empresa
-                    instancia_log.info(
-                        f"Dados da linha a serem utilizados no processamento recuperados/Posição do certificado: {posicao_certificado}"
-                    )
-
-                    reiniciar_navegador = (not empresa_atual == empresa_anterior) or (
-                        status_processamento == "ERRO PREVISTO"
-                        or status_processamento == "ERRO NÃO PREVISTO"
-                    )
-
-                    instancia_log.info(
-                        f"Empresa anterior: {empresa_anterior}/Empresa atual: {empresa_atual}/Reiniciar navegador: {reiniciar_navegador}"
-                    )
-
-                    # Se necessário abre browser e vai até a página inicial. Caso não precise abrir o navegador novamente apenas volta para a página de seleção do serviço
-                    if index_linha_valida == 0 and contador_retry == 0:
-                        instancia_log.info("É a primeira linha > acessar o site")
-                        pagina_inicial.acessar_site(posicao_certificado)
-                    elif reiniciar_navegador:
-                        instancia_log.info(
-                            "É preciso reiniciar o browser antes de acessar o site"
-                        )
-                        pagina_inicial.fecha_browser()
-                        driver = instanciar_drive()
-                        # Cria instancia das páginas diferentes
-                        pagina_inicial = PaginaInicial(driver, url_site_caixa)
-                        pagina_selecao_servicos = PaginaSelecaoServicos(
-                            driver, url_site_caixa
-                        )
-                        pagina_localizacao_trabalhador = PaginaLocalizacaoTrabalhador(
-                            driver, url_site_caixa
-                        )
-                        pagina_extrato_fgts = PaginaExtratoFgts(driver, url_site_caixa)
-                        pagina_chave = PaginaChave(driver, url_site_caixa)
-                        pagina_inicial.acessar_site(posicao_certificado)
-                    else:
-                        # Seleciona um serviço qualquer para indicar que saiu do serviço anterior e posteriormente o serviço correto será selecionado
-                        instancia_log.info(
-                            "Não é preciso reiniciar o browser, apenas retomar para a tela inicial do serviço para que o colaborador possa ser localizado"
-                        )
-                        pagina_selecao_servicos.retornar_menu_selecao_servico()
-                        instancia_log.info("Retorna ao menu dos serviços")
-
-                        # pagina_selecao_servicos.selecionar_servivo(servico)
-
-                    # Selecionar o serviço desejado
-                    pagina_selecao_servicos.selecionar_servico(servico)
-                    instancia_log.info(f"Serviço de {servico} selecionado")
-
-                    # Localizar o colaborador utilizando o nome
-                    pagina_localizacao_trabalhador.localizar_trabalhador(
-                        nome_colaborador, data_admissao, servico
-                    )
-                    
-                    
-                    # Utilizar o retorno da função verificar_trabalhador_localizado ( que é uma tupla com uma mensagem e uma lista de elementos) para verificar se o trabalhador foi localizado
-                    retorno, lista_indice_data = pagina_localizacao_trabalhador.localizacao_trabalhador.verificar_trabalhador_localizado(
-                        data_admissao, servico, timeout=5
-                    )
-                    instancia_log.info(f"Retorno da localização do trabalhador: {retorno}")
-                    instancia_log.info(f"Lista de indices de datas de admissão: {lista_indice_data}")
-
-                    # Executa a ação de acordo o serviço desejado
-                    if servico == "SALDO":
-                        df_output_saldo = pagina_extrato_fgts.extrair_saldo(
-                            df_output_saldo, index, lista_indice_data, retorno
-                        )
-                        # O output do processamento do saldo só é enviado no final
-                        instancia_log.info("Saldo extraido")
-                        obs_processamento = ""
-                    elif servico == "EXTRATO":
-                        caminho_local_pdf_gerado = (
-                            pagina_extrato_fgts.gerar_extrato_fgts(
-                                pasta_armazenamento_output, nome_colaborador, nome_colaborador_original, lista_indice_data
-                            )
-                        )
-                        if lista_indice_data:
-                            for i in range(len(lista_indice_data)):
-                                instancia_log.info(f"Caminhos: {caminho_local_pdf_gerado[i]}")
-                                obs_processamento = upload_arquivo_drive(
-                                    caminho_local_pdf_gerado[i],
-                                    caminho_service_account,
-                                    id_pasta,
-                                    email_usuario,
-                                )
-                        else:
-                            instancia_log.info(f"Caminho: {caminho_local_pdf_gerado[0]}")
-                            obs_processamento = upload_arquivo_drive(
-                                caminho_local_pdf_gerado[0],
-                                caminho_service_account,
-                                id_pasta,
-                                email_usuario,
-                            )
-                        instancia_log.info("Extrato gerado")
-                        
-                    elif servico == "CHAVE":
-                        # O código de movimento e de saque são recebidos na coluna CODIGO EXECUCAO nos seguintes formatos 'I1 - 01' ou 'I3 - 04'
-                        data_movimentacao = pd.to_datetime(row["DATA DE RECISÃO"]).strftime(r'%d/%m/%Y')
-                        codigo_movimentacao = (
-                            str(row["CODIGO EXECUCAO"]).strip().split(" - ")[0]
-                        )
-                        codigo_saque = (
-                            str(row["CODIGO EXECUCAO"]).strip().split(" - ")[1]
-                        )
-
-                        # Lista com os registros anteriores existentes ou não
-                        registro_anterior_existente = (
-                            pagina_chave.verificar_existencia_registro_anterior(nome_colaborador, data_admissao, lista_indice_data, retorno, driver, url_site_caixa)
-                        )
-                        instancia_log.info(
-                            f"Registro anterior existente: {registro_anterior_existente}"
-                        )
-
-                        caminho_local_pdf_gerado = pagina_chave.gerar_chave(
-                            pasta_armazenamento_output,
-                            nome_colaborador,
-                            nome_colaborador_original,
-                            data_movimentacao,
-                            codigo_movimentacao,
-                            codigo_saque,
-                            ambiente_execucao,
-                            registro_anterior_existente,
-                            lista_indice_data,
-                            retorno,
-                        )
-                        instancia_log.info(f"Caminho: {caminho_local_pdf_gerado}")
-                        if caminho_local_pdf_gerado:
-                            for caminho in caminho_local_pdf_gerado:
-                                output_arquivo_chave = upload_arquivo_drive(
-                                    caminho,
-                                    caminho_service_account,
-                                    id_pasta,
-                                    email_usuario,
-                                )
-                                obs_processamento = f"Registo anterior existente:{registro_anterior_existente}|{output_arquivo_chave}"
-                        else:
-                            obs_processamento = ""
-                        instancia_log.info("Extrato gerado")
-                        
-                    if retorno == "Não localizado":
-                        status_processamento = "ERRO PREVISTO"
-                    else:
-                        status_processamento = "SUCESSO"
-                    contador_falhas_consecutivas = 0
-                    instancia_log.info(
-                        f"Status do processamento: {status_processamento}"
-                    )
-
-                except Exception as e:
-                    excecao_linha = str(e)
-                    # Verifica se foi erro previsto ou não previsto e atribui o status do processamento (por meio da nomenclatura)
-                    if "Erro previsto" in excecao_linha:
-                        status_processamento = "ERRO PREVISTO"
-                    elif "Erro não previsto" in excecao_linha:
-                        status_processamento = "ERRO NÃO PREVISTO"
-                    else:
-                        status_processamento = "ERRO NÃO PREVISTO"
-
-                    instancia_log.info(
-                        f"Status do processamento: {status_processamento}"
-                    )
-                    instancia_log.info(f"Status do processamento: {excecao_linha}")
-
-                    obs_processamento = excecao_linha
-
-                    if status_processamento == "ERRO NÃO PREVISTO":
-                        contador_retry = contador_retry + 1
-                        instancia_log.info(f"Contador do retry: {contador_retry}")
-
-                        contador_falhas_consecutivas = contador_falhas_consecutivas + 1
-                        instancia_log.info(
-                            f"Contador de falhas consecutivas: {contador_falhas_consecutivas}"
-                        )
-
-                    if contador_falhas_consecutivas >= max_qtd_falhas_consecutivas:
-                        instancia_log.info(
-                            f"Excedido o número máximo de {max_qtd_falhas_consecutivas} falhas consecutivas."
-                        )
-
-                    continue
-
-                finally:
-                    # Atualiza o status da linha que esta sendo processada
-                    dados_para_processar.at[index, "STATUS"] = status_processamento
-                    dados_para_processar.at[index, "OBSERVAÇÃO"] = obs_processamento
-
-                    # No caso de o máximo de falhas consecutivas ter sido atingida informar a área que esse foi o motivo da linha não ter sido processad
-                    if contador_falhas_consecutivas >= max_qtd_falhas_consecutivas:
-                        condicao_linhas_nao_processadas_max_exc = (
-                            (dados_para_processar["STATUS"] != "ERRO PREVISTO")
-                            & (dados_para_processar["STATUS"] != "ERRO NÃO PREVISTO")
-                            & (dados_para_processar["STATUS"] != "SUCESSO")
-                        )
-                        instancia_log.info(
-                            f"Quantidade de linhas não processadas: {condicao_linhas_nao_processadas_max_exc.sum()}"
-                        )
-                        dados_para_processar.loc[
-                            condicao_linhas_nao_processadas_max_exc, "STATUS"
-                        ] = "LINHA NÃO PROCESSADA"
-                        dados_para_processar.loc[
-                            condicao_linhas_nao_processadas_max_exc, "OBSERVAÇÃO"
-                        ] = "Linha não foi processada, pois foi atingido um número máximo de exceções consecutivas, fazer uma nova solicitação"
-
-                    # Verifica se a linha vai ser reprocessada ou não
-                    condicao_para_retry = (
-                        contador_retry < max_qtd_retry
-                        and status_processamento == "ERRO NÃO PREVISTO"
-                        and (contador_falhas_consecutivas < max_qtd_falhas_consecutivas)
-                    )
-
-                    instancia_log.info(
-                        f"Condição para retry: Contador de retry < Qtd max de retries: {contador_retry < max_qtd_retry}/ Status do processamento é erro não previsto: {status_processamento == 'ERRO NÃO PREVISTO'}/ Qtd de falhas consecutivas não foi atingida: {contador_falhas_consecutivas < max_qtd_falhas_consecutivas}"
-                    )
-
-                    # Garante que o arquivo de output do saldo será enviado ao final da execução caso seja a última linha, idenpendente de erro ou não. Além disso faz o incremento do index da linha válida
-                    if (
-                        (ultima_linha and not condicao_para_retry)
-                        or (contador_falhas_consecutivas >= max_qtd_falhas_consecutivas)
-                    ) and servico == "SALDO":
-                        # Escreve output no excel
-                        colunas_para_remover = [
-                            "STATUS CERTIFICADO",
-                            "ALERTA CERTIFICADO",
-                            "POSICAO DO CERTIFICADO",
-                            "ID PASTA DRIVE SALDO",
-                            "ID PASTA DRIVE EXTRATO",
-                            "ID PASTA DRIVE CHAVE",
-                        ]
-                        nome_arquivo_excel = "extrato_fgts_saldo"
-                        caminho_local_planilha_com_saldo = escrever_no_excel(
-                            df_output_saldo,
-                            colunas_para_remover,
-                            nome_arquivo_excel,
-                            pasta_armazenamento_output,
-                        )
-
-                        # Insere arquivo no drive
-                        obs_processamento = upload_arquivo_drive(
-                            caminho_local_planilha_com_saldo,
-                            caminho_service_account,
-                            id_pasta,
-                            email_usuario,
-                        )
-
-                        # Preenche informações do output do processamento nas colunas com status de sucesso
-                        condicao_linhas_saldo_sucesso = (
-                            dados_para_processar["STATUS"] == "SUCESSO"
-                        )
-                        dados_para_processar.loc[
-                            condicao_linhas_saldo_sucesso, "OBSERVAÇÃO"
-                        ] = obs_processamento
-
-                        instancia_log.info(
-                            "Última linha e serviço de saldo > upload do output de saldo no drive"
-                        )
-
-                    if (ultima_linha and not condicao_para_retry) or (
-                        contador_falhas_consecutivas >= max_qtd_falhas_consecutivas
-                    ):
-                        # Escreve output no excel
-                        colunas_para_remover = [
-                            "STATUS CERTIFICADO",
-                            "POSICAO DO CERTIFICADO",
-                            "ID PASTA DRIVE SALDO",
-                            "ID PASTA DRIVE EXTRATO",
-                            "ID PASTA DRIVE CHAVE",
-                        ]
-                        nome_arquivo_excel = "relatorio_execucao"
-                        escrever_no_excel(
-                            dados_para_processar,
-                            colunas_para_remover,
-                            nome_arquivo_excel,
-                            pasta_armazenamento_relatorio_execucao,
-                        )
-
-                        qtd_linhas_sucesso = (
-                            dados_para_processar["STATUS"] == "SUCESSO"
-                        ).sum()
-                        qtd_linhas_erro_previsto = (
-                            dados_para_processar["STATUS"] == "ERRO PREVISTO"
-                        ).sum()
-                        qtd_linhas_erro_nao_previsto = (
-                            dados_para_processar["STATUS"] == "ERRO NÃO PREVISTO"
-                        ).sum()
-
-                        # A quantidade de linhas processadas é a quantidade de linhas que possui algum status
-                        qtd_linhas_processadas = (
-                            qtd_linhas_sucesso
-                            + qtd_linhas_erro_previsto
-                            + qtd_linhas_erro_nao_previsto
-                        )
-
-                        # Escreve no arquivo de retorno
-                        print(
-                            f"Quantidade de linhas recebidas:{qtd_linhas_recebidas_para_processar},Quantidade de linhas processadas:{qtd_linhas_processadas},Sucesso:{qtd_linhas_sucesso},Erro previsto:{qtd_linhas_erro_previsto},Erro não previsto:{qtd_linhas_erro_nao_previsto}"
-                        )
-                        instancia_log.info(
-                            "Última linha processada > Relatório da execução escrito"
-                        )
-                        instancia_log.info(
-                            f"Quantidade de linhas recebidas:{qtd_linhas_recebidas_para_processar}/Quantidade de linhas processadas:{qtd_linhas_processadas}/Sucesso:{qtd_linhas_sucesso}/Erro previsto:{qtd_linhas_erro_previsto}/Erro não previsto:{qtd_linhas_erro_nao_previsto}"
-                        )
-
-                        # Fecha instancia do driver:
-                        pagina_inicial.quit_driver()
-                    else:
-                        empresa_anterior = empresa
-
-                    if not condicao_para_retry and (
-                        contador_falhas_consecutivas >= max_qtd_falhas_consecutivas
-                    ):
-                        instancia_log.info(
-                            f"A execução será interrompida porque a quantidade máxima de falhas consecutivas foi atingida, Quantidade de linhas não processadas: {condicao_linhas_nao_processadas_max_exc.sum()}"
-                        )
-                    elif not condicao_para_retry:
-                        index_linha_valida = index_linha_valida + 1
-                        instancia_log.info(
-                            f"Se ainda existem linhas para processar > Ir para a próxima linha > index da próxima linha a ser processada: {index_linha_valida} "
-                        )
-                    else:
-                        instancia_log.info("A linha será reprocessada")
-
-                    condicao_para_executar = condicao_para_retry
+        qtd_navegadores_paralelos = int(parametros.get("qtd_navegadores_paralelos", 1))
+        if qtd_navegadores_paralelos > 1:
+            instancia_log.info(
+                f"Processamento paralelo com até {qtd_navegadores_paralelos} navegadores"
+            )
+            contadores_sessao = executar_em_paralelo(
+                parametros,
+                pasta_armazenamento_output,
+                dados_para_processar,
+                df_output_saldo if servico == "SALDO" else None,
+                dados_pendentes.index,
+                qtd_navegadores_paralelos,
+                diario_execucao,
+            )
+        else:
+            dados_pendentes = dados_pendentes.copy()
+            processador_linhas = ProcessadorLinhas(
+                parametros,
+                pasta_armazenamento_output,
+                diario_execucao=diario_execucao,
+            )
+            processador_linhas.processar(
+                dados_pendentes, df_output_saldo if servico == "SALDO" else None
+            )
+            dados_para_processar.loc[dados_pendentes.index, ["STATUS", "OBSERVAÇÃO"]] = (
+                dados_pendentes[["STATUS", "OBSERVAÇÃO"]]
+            )
+            if servico == "SALDO":
+                df_output_saldo = processador_linhas.df_output_saldo
+            contadores_sessao = processador_linhas.contadores_sessao()
+
+        finalizar_execucao(
+            parametros,
+            dados_para_processar,
+            df_output_saldo if servico == "SALDO" else None,
+            dados_validos.index,
+            qtd_linhas_recebidas_para_processar,
+            contadores_sessao,
+            relatorio_execucao,
+            relatorio_saldo,
+        )
 
     except Exception as e:
         instancia_log.error(str(e))
         sys.exit(1)
+    finally:
+        remover_ouvinte_eventos(ouvinte_relatorios)
+
+
+def atualizar_relatorios_linha_finalizada(
+    evento: dict,
+    relatorio_execucao: RelatorioIncremental,
+    relatorio_saldo: RelatorioIncremental,
+) -> None:
+    """
+    Grava nos relatórios incrementais o resultado de cada linha finalizada, inclusive as linhas dos navegadores paralelos
+
+    Ags:
+        evento (dict): evento escrito pelo canal de eventos
+        relatorio_execucao (RelatorioIncremental): relatório da execução
+        relatorio_saldo (RelatorioIncremental): output do serviço SALDO (None para os demais serviços)
+    """
+    if evento.get(CHAVE_EVENTO) != "linha_finalizada":
+        return
+    relatorio_execucao.atualizar_linha(
+        evento["index"],
+        {"STATUS": evento["status"], "OBSERVAÇÃO": evento["observacao"]},
+    )
+    if relatorio_saldo is not None and evento.get("dados_saldo"):
+        relatorio_saldo.atualizar_linha(evento["index"], evento["dados_saldo"])
+
+
+def finalizar_execucao(
+    parametros: dict,
+    dados_para_processar: pd.DataFrame,
+    df_output_saldo: pd.DataFrame,
+    indices_linhas_validas: pd.Index,
+    qtd_linhas_recebidas_para_processar: int,
+    contadores_sessao: dict,
+    relatorio_execucao: RelatorioIncremental,
+    relatorio_saldo: RelatorioIncremental,
+) -> None:
+    """
+    Converte os relatórios incrementais para excel (output do saldo e relatório da execução) e envia o resumo para o processo pai
+
+    Ags:
+        parametros (dict): dicionário de parâmetros recebido pelo `executar_acao`
+        dados_para_processar (pd.DataFrame): dados de input com as colunas de status e observação preenchidas
+        df_output_saldo (pd.DataFrame): dataframe de output do serviço SALDO (None para os demais serviços)
+        indices_linhas_validas (pd.Index): indices das linhas com certificado valido
+        qtd_linhas_recebidas_para_processar (int): quantidade de linhas recebidas no input
+        contadores_sessao (dict): quantidade de logins, reinícios do navegador e sessões retomadas durante o processamento
+        relatorio_execucao (RelatorioIncremental): relatório da execução, já com as linhas finalizadas
+        relatorio_saldo (RelatorioIncremental): output do serviço SALDO, já com as linhas finalizadas (None para os demais serviços)
+    """
+    servico = parametros["servico"]
+
+    # Garante que o arquivo de output do saldo será enviado ao final da execução, idenpendente de erro ou não
+    linhas_processadas = dados_para_processar.loc[indices_linhas_validas]
+    linhas_processadas = linhas_processadas[
+        linhas_processadas["STATUS"].isin(STATUS_PROCESSADOS)
+    ]
+    if servico == "SALDO" and not linhas_processadas.empty:
+        # O output vai para a pasta do drive da última linha processada
+        id_pasta = str(linhas_processadas[f"ID PASTA DRIVE {servico}"].iloc[-1])
+
+        # Escreve output no excel (as linhas que não vieram nos eventos, como as de um navegador paralelo encerrado com erro, são atualizadas antes)
+        colunas_saldo = [
+            coluna for coluna in df_output_saldo.columns if coluna.startswith("SALDO")
+        ]
+        relatorio_saldo.atualizar_linhas(df_output_saldo, colunas_saldo)
+        caminho_local_planilha_com_saldo = relatorio_saldo.finalizar()
+
+        # Insere arquivo no drive
+        obs_processamento = upload_arquivo_drive(
+            caminho_local_planilha_com_saldo,
+            parametros["caminho_service_account"],
+            id_pasta,
+            parametros["email_usuario"],
+        )
+
+        # Preenche informações do output do processamento nas colunas com status de sucesso
+        condicao_linhas_saldo_sucesso = dados_para_processar["STATUS"] == "SUCESSO"
+        dados_para_processar.loc[condicao_linhas_saldo_sucesso, "OBSERVAÇÃO"] = (
+            obs_processamento
+        )
+
+        instancia_log.info(
+            "Última linha e serviço de saldo > upload do output de saldo no drive"
+        )
+    elif relatorio_saldo is not None:
+        # Nenhuma linha processada, o output do saldo não é gerado
+        relatorio_saldo.descartar()
+
+    # Escreve output no excel. Apenas as linhas alteradas depois do último evento (linhas não processadas, observação do saldo) são gravadas novamente
+    with medir_etapa("escrita do relatório da execução"):
+        relatorio_execucao.atualizar_linhas(
+            dados_para_processar, ["STATUS", "OBSERVAÇÃO"]
+        )
+        relatorio_execucao.finalizar()
+
+    qtd_linhas_sucesso = (dados_para_processar["STATUS"] == "SUCESSO").sum()
+    qtd_linhas_erro_previsto = (dados_para_processar["STATUS"] == "ERRO PREVISTO").sum()
+    qtd_linhas_erro_nao_previsto = (
+        dados_para_processar["STATUS"] == "ERRO NÃO PREVISTO"
+    ).sum()
+
+    # A quantidade de linhas processadas é a quantidade de linhas que possui algum status
+    qtd_linhas_processadas = (
+        qtd_linhas_sucesso + qtd_linhas_erro_previsto + qtd_linhas_erro_nao_previsto
+    )
+
+    qtd_logins = contadores_sessao.get("qtd_logins", 0)
+    qtd_reinicios_navegador = contadores_sessao.get("qtd_reinicios_navegador", 0)
+
+    # Envia o resumo da execução para o processo pai. A mensagem mantém o formato lido pelo robô, os contadores de sessão vão
+    # apenas nos campos do evento
+    emitir_evento(
+        "resumo",
+        mensagem=f"Quantidade de linhas recebidas:{qtd_linhas_recebidas_para_processar},Quantidade de linhas processadas:{qtd_linhas_processadas},Sucesso:{qtd_linhas_sucesso},Erro previsto:{qtd_linhas_erro_previsto},Erro não previsto:{qtd_linhas_erro_nao_previsto}",
+        qtd_linhas_recebidas=int(qtd_linhas_recebidas_para_processar),
+        qtd_linhas_processadas=int(qtd_linhas_processadas),
+        qtd_linhas_sucesso=int(qtd_linhas_sucesso),
+        qtd_linhas_erro_previsto=int(qtd_linhas_erro_previsto),
+        qtd_linhas_erro_nao_previsto=int(qtd_linhas_erro_nao_previsto),
+        **contadores_sessao,
+    )
+    instancia_log.info("Última linha processada > Relatório da execução escrito")
+    instancia_log.info(
+        f"Quantidade de linhas recebidas:{qtd_linhas_recebidas_para_processar}/Quantidade de linhas processadas:{qtd_linhas_processadas}/Sucesso:{qtd_linhas_sucesso}/Erro previsto:{qtd_linhas_erro_previsto}/Erro não previsto:{qtd_linhas_erro_nao_previsto}/Logins:{qtd_logins}/Reinícios do navegador:{qtd_reinicios_navegador}"
+    )
@@ -0,0 +1,21 @@
+import importlib
+import json
+import sys
+
+
+def main() -> None:
+    """
+    Executa a função `nome_funcao` do módulo `nome_script` (recebidos como argumentos da linha de comando)
+    com os parâmetros lidos do stdin no formato JSON
+    """
+    nome_script, nome_funcao = sys.argv[1:3]
+
+    # Os parâmetros chegam pelo stdin para não depender do limite de tamanho da linha de comando
+    parametros = json.load(sys.stdin)
+
+    modulo = importlib.import_module(nome_script)
+    getattr(modulo, nome_funcao)(parametros)
+
+
+if __name__ == "__main__":
+    main()
@@ -7,25 +7,48 @@ from script_executor import ExecutorScript
 DIRETORIO_SCRIPT = Path(__file__).resolve().parent
 
 
-def main(nome_script: str, nome_funcao: str, parametros: str) -> str:
+def main(
+    nome_script: str,
+    nome_funcao: str,
+    parametros: str | dict,
+    forcar_instalacao: bool = False,
+) -> str:
     """
     Função que executa um determinado script dentro do ambiente virtual utilizando os parâmetros passados
 
     Args:
         nome_script (str): nome do script que vai ser executado em subprocess
         nome_funcao (str): nome da função a ser executada dentro do script fornecido em `nome_script`
-        parametros (str): dicionário serializado (formato de string) de parâmetros que vao ser utilizado na execução em subprocess
+        parametros (str | dict): dicionário de parâmetros que vão ser utilizados na execução em subprocess, serializado em JSON ou já como objeto
+        forcar_instalacao (bool): reinstala as dependências mesmo que o pyproject.toml e o poetry.lock não tenham mudado
     """
 
     # Instancia classe do script runner, reponsável por executar o script em subprocess
     executor_script = ExecutorScript(
-        DIRETORIO_SCRIPT, nome_script, nome_funcao, parametros
+        DIRETORIO_SCRIPT, nome_script, nome_funcao, parametros, forcar_instalacao
     )
 
     # Executa o script dentro do ambiente virtual
     return executor_script.executar_script()
 
 
+def iniciar_servidor_scripts() -> None:
+    """
+    Sobe o servidor de scripts, que mantém o ambiente virtual e os módulos carregados entre as chamadas da função `main`.
+    Enquanto o servidor estiver rodando as execuções são despachadas para ele, caso contrário são executadas em subprocess
+    """
+    executor_script = ExecutorScript(DIRETORIO_SCRIPT, "servidor_scripts", "", "")
+    executor_script.iniciar_servidor()
+
+
+def encerrar_servidor_scripts() -> None:
+    """
+    Encerra o servidor de scripts, caso esteja rodando
+    """
+    executor_script = ExecutorScript(DIRETORIO_SCRIPT, "servidor_scripts", "", "")
+    executor_script.encerrar_servidor()
+
+
 #main(
 #    "executar_acao_site_caixa",
 #    "executar_acao",
@@ -0,0 +1,182 @@
+import collections
+import contextlib
+import queue
+import threading
+import traceback
+
+from registrador_logs import instancia_log
+from auxiliar import instanciar_drive
+
+
+# Quantidade padrão de navegadores reserva mantidos abertos em segundo plano
+QTD_NAVEGADORES_RESERVA_PADRAO = 1
+
+
+class PoolNavegadores:
+    def __init__(
+        self,
+        perfil_navegador: dict,
+        qtd_navegadores_reserva: int = QTD_NAVEGADORES_RESERVA_PADRAO,
+        trava_login=None,
+    ) -> None:
+        """
+        Inicializa a classe PoolNavegadores, que mantém navegadores reserva abertos em segundo plano para que o reinício do
+        navegador não espere a abertura do chrome. O pool também é responsável por encerrar (quit) os navegadores aposentados.
+        Na seleção automática do certificado cada navegador é aberto para um certificado, por isso a reserva é separada por certificado
+
+        Args:
+            perfil_navegador (dict): opções do `instanciar_drive`, montadas pelo `montar_perfil_navegador`
+            qtd_navegadores_reserva (int): quantidade de navegadores reserva. Com 0 os navegadores são abertos apenas quando pedidos
+            trava_login: trava compartilhada da seleção do certificado. A abertura de um navegador reserva aguarda a trava, para que
+                a janela nova não tire o foco do navegador que está selecionando o certificado pelo teclado
+        """
+        self.perfil_navegador = perfil_navegador
+        self.qtd_navegadores_reserva = max(int(qtd_navegadores_reserva), 0)
+        self.trava_login = trava_login or contextlib.nullcontext()
+
+        # Navegadores prontos (ou None, quando a abertura em segundo plano falhou) e aberturas ainda não entregues, por certificado
+        self.navegadores_reserva = collections.defaultdict(queue.Queue)
+        self.qtd_aberturas_pendentes = collections.Counter()
+        self.trava = threading.Lock()
+        self.encerrado = False
+        self.threads = []
+
+    def obter_navegador(self, nome_certificado: str = None):
+        """
+        Retorna um navegador pronto. Usa o navegador reserva do certificado (aguardando caso a abertura já esteja em andamento) ou,
+        caso não exista reserva, abre o navegador na hora
+
+        Args:
+            nome_certificado (str): certificado selecionado automaticamente pelo navegador. None para a seleção pelo teclado
+        """
+        with self.trava:
+            existe_reserva = self.qtd_aberturas_pendentes[nome_certificado] > 0
+            if existe_reserva:
+                self.qtd_aberturas_pendentes[nome_certificado] -= 1
+
+        if existe_reserva:
+            driver = self.navegadores_reserva[nome_certificado].get()
+            if driver is not None:
+                instancia_log.info("Navegador reserva entregue pelo pool")
+                return driver
+            instancia_log.info("O navegador reserva não abriu, abrindo um novo navegador")
+
+        return instanciar_drive(**self.perfil_navegador, nome_certificado=nome_certificado)
+
+    def repor(self, nome_certificado: str = None) -> None:
+        """
+        Começa a abrir em segundo plano os navegadores que faltam para completar a reserva do certificado. As reservas de outros
+        certificados são aposentadas
+
+        Args:
+            nome_certificado (str): certificado selecionado automaticamente pelo navegador. None para a seleção pelo teclado
+        """
+        with self.trava:
+            if self.encerrado:
+                return
+            reservas_outros_certificados = {
+                certificado: qtd
+                for certificado, qtd in self.qtd_aberturas_pendentes.items()
+                if certificado != nome_certificado and qtd > 0
+            }
+            for certificado in reservas_outros_certificados:
+                self.qtd_aberturas_pendentes[certificado] = 0
+            # A fila do certificado é criada aqui, sob a trava, antes de qualquer thread usar a fila
+            self.navegadores_reserva[nome_certificado]
+            qtd_faltante = self.qtd_navegadores_reserva - self.qtd_aberturas_pendentes[nome_certificado]
+            self.qtd_aberturas_pendentes[nome_certificado] += max(qtd_faltante, 0)
+
+        for certificado, qtd in reservas_outros_certificados.items():
+            self.iniciar_thread(
+                lambda certificado=certificado, qtd=qtd: self.descartar_reserva(certificado, qtd),
+                "descarte_navegador_reserva",
+            )
+        for _ in range(qtd_faltante):
+            self.iniciar_thread(
+                lambda: self.abrir_navegador_reserva(nome_certificado), "abertura_navegador_reserva"
+            )
+
+    def abrir_navegador_reserva(self, nome_certificado: str = None) -> None:
+        """
+        Abre um navegador reserva. Caso o pool já tenha sido encerrado o navegador é fechado em seguida
+
+        Args:
+            nome_certificado (str): certificado selecionado automaticamente pelo navegador. None para a seleção pelo teclado
+        """
+        try:
+            with self.trava_login:
+                driver = instanciar_drive(**self.perfil_navegador, nome_certificado=nome_certificado)
+        except Exception:
+            instancia_log.error(f"Erro ao abrir o navegador reserva: {traceback.format_exc()}")
+            driver = None
+
+        with self.trava:
+            encerrado = self.encerrado
+        if encerrado:
+            self.fechar_navegador(driver)
+        else:
+            self.navegadores_reserva[nome_certificado].put(driver)
+
+    def descartar_reserva(self, nome_certificado: str, qtd: int) -> None:
+        """
+        Encerra os navegadores reserva de um certificado que não vai mais ser usado, aguardando as aberturas em andamento
+
+        Args:
+            nome_certificado (str): certificado dos navegadores reserva
+            qtd (int): quantidade de navegadores reserva do certificado
+        """
+        for _ in range(qtd):
+            self.fechar_navegador(self.navegadores_reserva[nome_certificado].get())
+
+    def aposentar(self, driver) -> None:
+        """
+        Encerra (quit) em segundo plano um navegador que não vai mais ser usado
+
+        Args:
+            driver: navegador que vai ser encerrado
+        """
+        self.iniciar_thread(lambda: self.fechar_navegador(driver), "encerramento_navegador")
+
+    def fechar_navegador(self, driver) -> None:
+        """
+        Encerra o navegador e o processo do chromedriver. Falhas no encerramento apenas são registradas
+
+        Args:
+            driver: navegador que vai ser encerrado
+        """
+        if driver is None:
+            return
+        try:
+            driver.quit()
+        except Exception as e:
+            instancia_log.error(f"Erro ao encerrar o navegador: {e}")
+
+    def iniciar_thread(self, funcao, nome: str) -> None:
+        """
+        Executa a função em uma thread do pool, que é aguardada no encerramento
+
+        Args:
+            funcao: função executada na thread
+            nome (str): nome da thread
+        """
+        thread = threading.Thread(target=funcao, name=nome)
+        with self.trava:
+            self.threads = [t for t in self.threads if t.is_alive()]
+            self.threads.append(thread)
+        thread.start()
+
+    def encerrar(self) -> None:
+        """
+        Aguarda as aberturas e encerramentos em andamento e encerra todos os navegadores reserva
+        """
+        with self.trava:
+            self.encerrado = True
+            threads = list(self.threads)
+        for thread in threads:
+            thread.join()
+
+        for navegadores_certificado in self.navegadores_reserva.values():
+            while not navegadores_certificado.empty():
+                self.fechar_navegador(navegadores_certificado.get_nowait())
+        with self.trava:
+            self.qtd_aberturas_pendentes.clear()
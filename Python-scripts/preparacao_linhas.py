@@ -0,0 +1,96 @@
+import re
+import pandas as pd
+
+
+# Preposições removidas do nome do colaborador antes da localização no site (" DA ", " DE ", " DO ", " DOS ", " DAS ", " E ")
+PADRAO_PREPOSICOES_NOME = re.compile(r" (?:DA|DE|DO|DOS|DAS|E)(?= )")
+
+# Formatos aceitos para a data de admissão, na ordem em que são testados
+FORMATOS_DATA_ADMISSAO = [r"%Y-%m-%d %H:%M:%S", r"%d/%m/%Y"]
+
+
+def converter_datas(datas: pd.Series, formatos: list[str]) -> pd.Series:
+    """
+    Converte as datas testando os formatos em ordem. As datas que não se encaixam em nenhum formato ficam como NaT
+
+    Args:
+        datas (pd.Series): datas em texto
+        formatos (list[str]): formatos aceitos
+    """
+    datas_convertidas = pd.Series(pd.NaT, index=datas.index, dtype="datetime64[ns]")
+    for formato in formatos:
+        datas_convertidas = datas_convertidas.fillna(
+            pd.to_datetime(datas, format=formato, errors="coerce")
+        )
+    return datas_convertidas
+
+
+def preparar_linhas(dados_para_processar: pd.DataFrame, servico: str) -> tuple[dict, dict]:
+    """
+    Calcula de uma vez, para todas as linhas, os dados usados no processamento de cada linha no site (nome sem preposições,
+    datas formatadas, códigos da chave...). Retorna os registros das linhas válidas e o motivo da rejeição das linhas malformadas,
+    ambos indexados pelo index da linha
+
+    Args:
+        dados_para_processar (pd.DataFrame): linhas que vão ser processadas
+        servico (str): serviço que vai ser executado
+    """
+    linhas_preparadas = pd.DataFrame(index=dados_para_processar.index)
+    motivos_rejeicao = pd.Series("", index=dados_para_processar.index)
+
+    nomes = dados_para_processar["NOME"].astype(str).str.strip()
+    linhas_preparadas["nome_colaborador_original"] = nomes
+    linhas_preparadas["nome_colaborador"] = nomes.str.replace(
+        PADRAO_PREPOSICOES_NOME, "", regex=True
+    )
+    linhas_preparadas["empresa"] = dados_para_processar["EMPRESA"].astype(str).str.strip()
+    linhas_preparadas["posicao_certificado"] = dados_para_processar["POSICAO DO CERTIFICADO"]
+    linhas_preparadas["nome_certificado"] = (
+        dados_para_processar["NOME DO CERTIFICADO"].fillna("").astype(str).str.strip()
+        if "NOME DO CERTIFICADO" in dados_para_processar.columns
+        else ""
+    )
+    linhas_preparadas["id_pasta"] = dados_para_processar[f"ID PASTA DRIVE {servico}"].astype(str)
+
+    # A data de admissão é comparada com a data mostrada no site, no formato DD/MM/AAAA
+    datas_admissao = converter_datas(
+        dados_para_processar["DATA DE ADMISSAO"].astype(str).str.strip(),
+        FORMATOS_DATA_ADMISSAO,
+    )
+    linhas_preparadas["data_admissao"] = datas_admissao.dt.strftime(r"%d/%m/%Y")
+    motivos_rejeicao = motivos_rejeicao.mask(
+        datas_admissao.isna() & (motivos_rejeicao == ""),
+        "Erro previsto na preparação da linha: data de admissão em formato inválido",
+    )
+
+    if servico == "CHAVE":
+        # O código de movimento e de saque são recebidos na coluna CODIGO EXECUCAO nos seguintes formatos 'I1 - 01' ou 'I3 - 04'
+        codigos_execucao = (
+            dados_para_processar["CODIGO EXECUCAO"].astype(str).str.strip().str.split(" - ", n=1, expand=True)
+            .reindex(columns=[0, 1])
+        )
+        linhas_preparadas["codigo_movimentacao"] = codigos_execucao[0]
+        linhas_preparadas["codigo_saque"] = codigos_execucao[1]
+        motivos_rejeicao = motivos_rejeicao.mask(
+            codigos_execucao[1].isna() & (motivos_rejeicao == ""),
+            "Erro previsto na preparação da linha: código de execução fora do formato 'I1 - 01'",
+        )
+
+        # Cada data é interpretada individualmente, como era feito linha a linha
+        datas_movimentacao = pd.to_datetime(
+            dados_para_processar["DATA DE RECISÃO"], format="mixed", errors="coerce"
+        )
+        linhas_preparadas["data_movimentacao"] = datas_movimentacao.dt.strftime(r"%d/%m/%Y")
+        motivos_rejeicao = motivos_rejeicao.mask(
+            datas_movimentacao.isna() & (motivos_rejeicao == ""),
+            "Erro previsto na preparação da linha: data de rescisão em formato inválido",
+        )
+
+    condicao_linhas_rejeitadas = motivos_rejeicao != ""
+    registros_linhas = dict(
+        zip(
+            linhas_preparadas.index[~condicao_linhas_rejeitadas],
+            linhas_preparadas[~condicao_linhas_rejeitadas].to_dict("records"),
+        )
+    )
+    return registros_linhas, motivos_rejeicao[condicao_linhas_rejeitadas].to_dict()
@@ -0,0 +1,626 @@
+import contextlib
+import pandas as pd
+from pathlib import Path
+
+from POM.pages.pagina_chave import PaginaChave
+from POM.pages.pagina_extrato_fgts import PaginaExtratoFgts
+from POM.pages.pagina_inicial import PaginaInicial
+from POM.pages.pagina_localizacao_trabalhador import PaginaLocalizacaoTrabalhador
+from POM.pages.pagina_selecao_servicos import PaginaSelecaoServicos
+from POM.page_objects.monitor_navegacao import MonitorNavegacao
+from registrador_logs import instancia_log
+from canal_eventos import emitir_evento, medir_etapa
+from agendador_linhas import AgendadorLinhas
+from diario_execucao import gerar_chaves_linhas
+from pool_navegadores import PoolNavegadores, QTD_NAVEGADORES_RESERVA_PADRAO
+from sessoes_empresas import CacheSessoesEmpresas, TEMPO_MAX_SESSAO_EMPRESA_PADRAO
+from preparacao_linhas import preparar_linhas
+from auxiliar import (
+    MODO_SELECAO_CERTIFICADO_POLITICA,
+    MODO_SELECAO_CERTIFICADO_TECLADO,
+    montar_perfil_navegador,
+    upload_arquivo_drive,
+)
+
+
+# Status que indicam que a linha já foi processada
+STATUS_PROCESSADOS = ["SUCESSO", "ERRO PREVISTO", "ERRO NÃO PREVISTO"]
+
+
+class ProcessadorLinhas:
+    def __init__(
+        self,
+        parametros: dict,
+        pasta_armazenamento_output: Path,
+        trava_login=None,
+        diario_execucao=None,
+    ) -> None:
+        """
+        Inicializa a classe ProcessadorLinhas, responsável por processar as linhas no site da caixa com um navegador
+
+        Args:
+            parametros (dict): dicionário de parâmetros recebido pelo `executar_acao`
+            pasta_armazenamento_output (Path): pasta onde os arquivos gerados pelo serviço são armazenados
+            trava_login: trava compartilhada entre navegadores para que apenas um faça a seleção do certificado por vez
+            diario_execucao (DiarioExecucao): diário onde o resultado de cada linha é gravado assim que a linha termina
+        """
+        self.url_site_caixa = parametros["url_site_caixa"]
+        self.servico = parametros["servico"]
+        self.ambiente_execucao = parametros["ambiente_execucao"]
+        self.caminho_service_account = parametros["caminho_service_account"]
+        self.email_usuario = parametros["email_usuario"]
+        self.max_qtd_retry = parametros["max_qtd_retry"]
+        self.max_qtd_falhas_consecutivas = parametros["max_qtd_falhas_consecutivas"]
+        self.perfil_navegador = montar_perfil_navegador(parametros)
+        self.aguardar_navegacao_por_eventos = parametros.get(
+            "aguardar_navegacao_por_eventos", False
+        )
+        # Na seleção automática o certificado é escolhido pelo próprio navegador, sem teclas, e os logins não precisam da trava
+        self.selecao_automatica_certificado = (
+            parametros.get("modo_selecao_certificado", MODO_SELECAO_CERTIFICADO_TECLADO)
+            == MODO_SELECAO_CERTIFICADO_POLITICA
+        )
+        if self.selecao_automatica_certificado:
+            trava_login = None
+        # Sessões logadas guardadas por empresa, restauradas no reinício do navegador. No modo TECLADO o site pediria o certificado
+        # novamente pela janela do chrome, por isso a restauração só é usada com a seleção automática do certificado
+        self.cache_sessoes_empresas = None
+        if parametros.get("reaproveitar_sessao_empresa", False):
+            if self.selecao_automatica_certificado:
+                self.cache_sessoes_empresas = CacheSessoesEmpresas(
+                    parametros.get("tempo_max_sessao_empresa", TEMPO_MAX_SESSAO_EMPRESA_PADRAO)
+                )
+            else:
+                instancia_log.info(
+                    "O reaproveitamento da sessão por empresa está disponível apenas no modo POLITICA de seleção do certificado"
+                )
+        self.pasta_armazenamento_output = pasta_armazenamento_output
+        self.trava_login = trava_login or contextlib.nullcontext()
+        self.diario_execucao = diario_execucao
+        # Navegadores reserva abertos em segundo plano, entregues no reinício do navegador
+        self.pool_navegadores = PoolNavegadores(
+            self.perfil_navegador,
+            parametros.get("qtd_navegadores_reserva", QTD_NAVEGADORES_RESERVA_PADRAO),
+            trava_login,
+        )
+
+        self.driver = None
+        self.empresa_anterior = ""
+        self.status_processamento = ""
+        self.contador_falhas_consecutivas = 0
+        self.qtd_logins = 0
+        self.qtd_reinicios_navegador = 0
+        self.qtd_sessoes_retomadas = 0
+        self.qtd_sessoes_restauradas = 0
+
+    def abrir_navegador(self, nome_certificado: str = None) -> None:
+        """
+        Recupera um driver do pool de navegadores e cria a instancia das páginas
+
+        Args:
+            nome_certificado (str): certificado selecionado automaticamente pelo navegador. None para a seleção pelo teclado
+        """
+        self.driver = self.pool_navegadores.obter_navegador(nome_certificado)
+        instancia_log.info("Driver instanciado")
+
+        # As esperas passam a aguardar o fim das navegações pelos eventos do DevTools, mantendo a consulta como fallback
+        if self.aguardar_navegacao_por_eventos:
+            self.driver.monitor_navegacao = MonitorNavegacao.iniciar(self.driver)
+
+        # Cria instancia para páginas
+        self.pagina_inicial = PaginaInicial(self.driver, self.url_site_caixa)
+        self.pagina_selecao_servicos = PaginaSelecaoServicos(
+            self.driver, self.url_site_caixa
+        )
+        self.pagina_localizacao_trabalhador = PaginaLocalizacaoTrabalhador(
+            self.driver, self.url_site_caixa
+        )
+        self.pagina_extrato_fgts = PaginaExtratoFgts(self.driver, self.url_site_caixa)
+        self.pagina_chave = PaginaChave(self.driver, self.url_site_caixa)
+        instancia_log.info("Paginas instanciadas")
+
+    def acessar_site(self, posicao_certificado: int, empresa: str, nome_certificado: str = None) -> None:
+        """
+        Acessa o site e seleciona o certificado. Apenas um navegador por vez seleciona o certificado pelo teclado. Caso exista
+        uma sessão guardada da empresa, a sessão é restaurada antes e o login completo só acontece se a sessão não for mais válida
+
+        Args:
+            posicao_certificado (int): posição do certificado que vai ser selecionado
+            empresa (str): empresa da linha, usada para guardar e restaurar a sessão logada
+            nome_certificado (str): certificado selecionado automaticamente pelo navegador. None para a seleção pelo teclado
+        """
+        if not self.restaurar_sessao_empresa(empresa):
+            self.qtd_logins = self.qtd_logins + 1
+            self.pagina_inicial.acessar_site(
+                posicao_certificado, self.selecao_automatica_certificado, self.trava_login
+            )
+            if self.cache_sessoes_empresas is not None:
+                self.cache_sessoes_empresas.guardar(empresa, *self.pagina_inicial.capturar_sessao())
+        # A reserva é reposta depois do login, para que a abertura do navegador reserva não atrase a seleção do certificado
+        self.pool_navegadores.repor(nome_certificado)
+
+    def restaurar_sessao_empresa(self, empresa: str) -> bool:
+        """
+        Restaura a sessão guardada da empresa, caso exista. Retorna False quando não existe sessão ou a sessão expirou no site,
+        nesse caso a sessão guardada é descartada
+
+        Args:
+            empresa (str): empresa da linha
+        """
+        if self.cache_sessoes_empresas is None:
+            return False
+        sessao = self.cache_sessoes_empresas.recuperar(empresa)
+        if sessao is None:
+            return False
+
+        if self.pagina_inicial.restaurar_sessao(sessao["cookies"], sessao["url_portal"]):
+            self.qtd_sessoes_restauradas = self.qtd_sessoes_restauradas + 1
+            instancia_log.info(f"Sessão da empresa {empresa} restaurada sem login")
+            return True
+
+        instancia_log.info(f"Sessão guardada da empresa {empresa} não é mais válida > fazer o login")
+        self.cache_sessoes_empresas.descartar(empresa)
+        return False
+
+    def reiniciar_navegador(
+        self, index, posicao_certificado: int, empresa: str, nome_certificado: str = None
+    ) -> None:
+        """
+        Aposenta o navegador atual, recebe um navegador do pool e faz o login novamente
+
+        Args:
+            index: index da linha que está sendo processada
+            posicao_certificado (int): posição do certificado que vai ser selecionado
+            empresa (str): empresa da linha
+            nome_certificado (str): certificado selecionado automaticamente pelo navegador. None para a seleção pelo teclado
+        """
+        self.qtd_reinicios_navegador = self.qtd_reinicios_navegador + 1
+        with medir_etapa("reinício do navegador", index=index):
+            self.aposentar_navegador()
+            self.abrir_navegador(nome_certificado)
+        with medir_etapa("acesso ao site", index=index):
+            self.acessar_site(posicao_certificado, empresa, nome_certificado)
+
+    def retomar_sessao(self) -> bool:
+        """
+        Volta para o menu de seleção de serviço aproveitando a sessão atual. Retorna False caso a sessão não esteja mais válida
+        """
+        try:
+            self.pagina_selecao_servicos.retornar_menu_selecao_servico()
+        except Exception as e:
+            instancia_log.info(f"Não foi possível retomar a sessão atual: {e}")
+            return False
+        return True
+
+    def contadores_sessao(self) -> dict:
+        """
+        Retorna a quantidade de logins, reinícios do navegador, sessões retomadas sem login e sessões de empresa restauradas
+        """
+        return {
+            "qtd_logins": self.qtd_logins,
+            "qtd_reinicios_navegador": self.qtd_reinicios_navegador,
+            "qtd_sessoes_retomadas": self.qtd_sessoes_retomadas,
+            "qtd_sessoes_restauradas": self.qtd_sessoes_restauradas,
+        }
+
+    def aposentar_navegador(self) -> None:
+        """
+        Entrega o driver atual, caso exista, para ser encerrado pelo pool em segundo plano
+        """
+        if self.driver is not None:
+            self.pool_navegadores.aposentar(self.driver)
+            self.driver = None
+
+    def encerrar(self) -> None:
+        """
+        Encerra o driver atual e os navegadores reserva do pool
+        """
+        if self.driver is not None:
+            self.pool_navegadores.fechar_navegador(self.driver)
+            self.driver = None
+        self.pool_navegadores.encerrar()
+
+    def executar_servico(
+        self,
+        index,
+        linha: dict,
+        resultado_localizacao,
+    ) -> str:
+        """
+        Executa a ação de acordo com o serviço desejado e retorna a observação do processamento
+
+        Args:
+            index: index da linha que está sendo processada
+            linha (dict): dados da linha preparados pelo `preparar_linhas`
+            resultado_localizacao (ResultadoLocalizacao): resultado da localização do trabalhador, calculado uma única vez por linha
+        """
+        lista_indice_data = resultado_localizacao.indices_ocorrencias
+        if self.servico == "SALDO":
+            self.df_output_saldo = self.pagina_extrato_fgts.extrair_saldo(
+                self.df_output_saldo, index, resultado_localizacao
+            )
+            # O output do processamento do saldo só é enviado no final
+            instancia_log.info("Saldo extraido")
+            obs_processamento = ""
+        elif self.servico == "EXTRATO":
+            caminho_local_pdf_gerado = self.pagina_extrato_fgts.gerar_extrato_fgts(
+                self.pasta_armazenamento_output,
+                linha["nome_colaborador"],
+                linha["nome_colaborador_original"],
+                resultado_localizacao,
+            )
+            if lista_indice_data:
+                for i in range(len(lista_indice_data)):
+                    instancia_log.info(f"Caminhos: {caminho_local_pdf_gerado[i]}")
+                    obs_processamento = upload_arquivo_drive(
+                        caminho_local_pdf_gerado[i],
+                        self.caminho_service_account,
+                        linha["id_pasta"],
+                        self.email_usuario,
+                    )
+            else:
+                instancia_log.info(f"Caminho: {caminho_local_pdf_gerado[0]}")
+                obs_processamento = upload_arquivo_drive(
+                    caminho_local_pdf_gerado[0],
+                    self.caminho_service_account,
+                    linha["id_pasta"],
+                    self.email_usuario,
+                )
+            instancia_log.info("Extrato gerado")
+
+        elif self.servico == "CHAVE":
+            # Lista com os registros anteriores existentes ou não
+            registro_anterior_existente = (
+                self.pagina_chave.verificar_existencia_registro_anterior(
+                    linha["nome_colaborador"],
+                    resultado_localizacao,
+                    self.driver,
+                    self.url_site_caixa,
+                )
+            )
+            instancia_log.info(
+                f"Registro anterior existente: {registro_anterior_existente}"
+            )
+
+            caminho_local_pdf_gerado = self.pagina_chave.gerar_chave(
+                self.pasta_armazenamento_output,
+                linha["nome_colaborador"],
+                linha["nome_colaborador_original"],
+                linha["data_movimentacao"],
+                linha["codigo_movimentacao"],
+                linha["codigo_saque"],
+                self.ambiente_execucao,
+                registro_anterior_existente,
+                resultado_localizacao,
+            )
+            instancia_log.info(f"Caminho: {caminho_local_pdf_gerado}")
+            if caminho_local_pdf_gerado:
+                for caminho in caminho_local_pdf_gerado:
+                    output_arquivo_chave = upload_arquivo_drive(
+                        caminho,
+                        self.caminho_service_account,
+                        linha["id_pasta"],
+                        self.email_usuario,
+                    )
+                    obs_processamento = f"Registo anterior existente:{registro_anterior_existente}|{output_arquivo_chave}"
+            else:
+                obs_processamento = ""
+            instancia_log.info("Extrato gerado")
+
+        return obs_processamento
+
+    def processar_linha(self, index, linha: dict, contador_retry: int) -> str:
+        """
+        Faz uma tentativa de processamento da linha: acessa o site (reiniciando o navegador se necessário), localiza o colaborador
+        e executa o serviço. Atualiza o status do processamento e retorna a observação
+
+        Args:
+            index: index da linha que está sendo processada
+            linha (dict): dados da linha preparados pelo `preparar_linhas`
+            contador_retry (int): quantidade de tentativas que já falharam para essa linha
+        """
+        # Recupera dados da linha que vão ser utilizados no processamento para acessar o site e localizar o colaborador
+        nome_colaborador = linha["nome_colaborador"]
+        data_admissao = linha["data_admissao"]
+        posicao_certificado = linha["posicao_certificado"]
+        empresa = linha["empresa"]
+        empresa_atual = empresa
+        instancia_log.info(
+            f"Dados da linha a serem utilizados no processamento recuperados/Posição do certificado: {posicao_certificado}"
+        )
+
+        # Após um erro previsto a sessão é reaproveitada, caso ainda esteja válida. Após um erro não previsto o estado do navegador é desconhecido
+        reiniciar_navegador = (not empresa_atual == self.empresa_anterior) or (
+            self.status_processamento == "ERRO NÃO PREVISTO"
+        )
+
+        instancia_log.info(
+            f"Empresa anterior: {self.empresa_anterior}/Empresa atual: {empresa_atual}/Reiniciar navegador: {reiniciar_navegador}"
+        )
+        emitir_evento(
+            "linha_iniciada",
+            index=index,
+            empresa=empresa,
+            tentativa=contador_retry + 1,
+        )
+        self.empresa_anterior = empresa
+
+        nome_certificado = None
+        if self.selecao_automatica_certificado:
+            nome_certificado = linha["nome_certificado"]
+            if not nome_certificado:
+                raise Exception(
+                    f"Erro previsto na etapa de seleção do certificado: NOME DO CERTIFICADO não informado para a empresa {empresa}"
+                )
+
+        # Se necessário abre browser e vai até a página inicial. Caso não precise abrir o navegador novamente apenas volta para a página de seleção do serviço
+        if self.driver is None:
+            instancia_log.info("É a primeira linha > acessar o site")
+            with medir_etapa("instanciação do driver", index=index):
+                self.abrir_navegador(nome_certificado)
+            with medir_etapa("acesso ao site", index=index):
+                self.acessar_site(posicao_certificado, empresa, nome_certificado)
+        elif reiniciar_navegador:
+            instancia_log.info("É preciso reiniciar o browser antes de acessar o site")
+            self.reiniciar_navegador(index, posicao_certificado, empresa, nome_certificado)
+        else:
+            # Seleciona um serviço qualquer para indicar que saiu do serviço anterior e posteriormente o serviço correto será selecionado
+            instancia_log.info(
+                "Não é preciso reiniciar o browser, apenas retomar para a tela inicial do serviço para que o colaborador possa ser localizado"
+            )
+            if self.retomar_sessao():
+                instancia_log.info("Retorna ao menu dos serviços")
+                if self.status_processamento == "ERRO PREVISTO":
+                    self.qtd_sessoes_retomadas = self.qtd_sessoes_retomadas + 1
+            else:
+                instancia_log.info("A sessão não é mais válida > reiniciar o browser")
+                self.reiniciar_navegador(index, posicao_certificado, empresa, nome_certificado)
+
+        with medir_etapa("localização do trabalhador", index=index):
+            # Selecionar o serviço desejado
+            self.pagina_selecao_servicos.selecionar_servico(self.servico)
+            instancia_log.info(f"Serviço de {self.servico} selecionado")
+
+            # Localizar o colaborador utilizando o nome. O resultado da localização é reaproveitado na execução do serviço
+            resultado_localizacao = self.pagina_localizacao_trabalhador.localizar_trabalhador(
+                nome_colaborador, data_admissao, self.servico
+            )
+        instancia_log.info(f"Retorno da localização do trabalhador: {resultado_localizacao.retorno}")
+        instancia_log.info(f"Lista de indices de datas de admissão: {resultado_localizacao.indices_ocorrencias}")
+
+        with medir_etapa(f"execução do serviço {self.servico}", index=index):
+            obs_processamento = self.executar_servico(
+                index, linha, resultado_localizacao
+            )
+
+        if not resultado_localizacao.localizado:
+            self.status_processamento = "ERRO PREVISTO"
+        else:
+            self.status_processamento = "SUCESSO"
+        self.contador_falhas_consecutivas = 0
+        instancia_log.info(f"Status do processamento: {self.status_processamento}")
+
+        return obs_processamento
+
+    def processar(
+        self, dados_para_processar: pd.DataFrame, df_output_saldo: pd.DataFrame = None
+    ) -> None:
+        """
+        Percorre as linhas recebidas na ordem definida pelo AgendadorLinhas, com retry por linha e interrupção ao atingir o máximo de
+        falhas consecutivas. As colunas STATUS e OBSERVAÇÃO (e o saldo, no serviço SALDO) são atualizadas nos próprios dataframes
+
+        Args:
+            dados_para_processar (pd.DataFrame): linhas com certificado válido que vão ser processadas
+            df_output_saldo (pd.DataFrame): dataframe de output do serviço SALDO
+        """
+        self.df_output_saldo = df_output_saldo
+
+        # Prepara os dados de todas as linhas antes de abrir o navegador. Linhas malformadas são rejeitadas sem tempo de navegador
+        registros_linhas, motivos_rejeicao = preparar_linhas(
+            dados_para_processar, self.servico
+        )
+        chaves_linhas = (
+            gerar_chaves_linhas(dados_para_processar)
+            if self.diario_execucao is not None
+            else None
+        )
+        for index, motivo_rejeicao in motivos_rejeicao.items():
+            instancia_log.info(f"Linha {index + 1} rejeitada: {motivo_rejeicao}")
+            self.finalizar_linha(
+                dados_para_processar,
+                chaves_linhas,
+                index,
+                "ERRO PREVISTO",
+                motivo_rejeicao,
+                reprocessar=False,
+            )
+
+        agendador_linhas = AgendadorLinhas(
+            dados_para_processar.loc[list(registros_linhas)]
+        )
+
+        try:
+            # Percorrer cada linha e realizar as ações necessárias. O reprocessamento de uma linha acontece no final das linhas da mesma empresa
+            for index, contador_retry in agendador_linhas:
+                linha = registros_linhas[index]
+                try:
+                    # Identificando linha
+                    instancia_log.info("========================================")
+                    instancia_log.info(
+                        f"Processando linha {index + 1} /Tentativa: {contador_retry + 1} /Processamentos pendentes: {agendador_linhas.qtd_linhas_pendentes()}"
+                    )
+                    instancia_log.info("========================================")
+
+                    obs_processamento = self.processar_linha(
+                        index, linha, contador_retry
+                    )
+
+                except Exception as e:
+                    excecao_linha = str(e)
+                    # Verifica se foi erro previsto ou não previsto e atribui o status do processamento (por meio da nomenclatura)
+                    if "Erro previsto" in excecao_linha:
+                        self.status_processamento = "ERRO PREVISTO"
+                    elif "Erro não previsto" in excecao_linha:
+                        self.status_processamento = "ERRO NÃO PREVISTO"
+                    else:
+                        self.status_processamento = "ERRO NÃO PREVISTO"
+
+                    instancia_log.info(
+                        f"Status do processamento: {self.status_processamento}"
+                    )
+                    instancia_log.info(f"Status do processamento: {excecao_linha}")
+
+                    obs_processamento = excecao_linha
+
+                    if self.status_processamento == "ERRO NÃO PREVISTO":
+                        contador_retry = contador_retry + 1
+                        instancia_log.info(f"Contador do retry: {contador_retry}")
+
+                        self.contador_falhas_consecutivas = (
+                            self.contador_falhas_consecutivas + 1
+                        )
+                        instancia_log.info(
+                            f"Contador de falhas consecutivas: {self.contador_falhas_consecutivas}"
+                        )
+
+                    if self.atingiu_max_falhas_consecutivas():
+                        instancia_log.info(
+                            f"Excedido o número máximo de {self.max_qtd_falhas_consecutivas} falhas consecutivas."
+                        )
+
+                # Verifica se a linha vai ser reprocessada ou não
+                condicao_para_retry = (
+                    contador_retry < self.max_qtd_retry
+                    and self.status_processamento == "ERRO NÃO PREVISTO"
+                    and not self.atingiu_max_falhas_consecutivas()
+                )
+
+                # Atualiza o status da linha que esta sendo processada
+                self.finalizar_linha(
+                    dados_para_processar,
+                    chaves_linhas,
+                    index,
+                    self.status_processamento,
+                    obs_processamento,
+                    condicao_para_retry,
+                )
+
+                instancia_log.info(
+                    f"Condição para retry: Contador de retry < Qtd max de retries: {contador_retry < self.max_qtd_retry}/ Status do processamento é erro não previsto: {self.status_processamento == 'ERRO NÃO PREVISTO'}/ Qtd de falhas consecutivas não foi atingida: {not self.atingiu_max_falhas_consecutivas()}"
+                )
+
+                if condicao_para_retry:
+                    agendador_linhas.reagendar(index, contador_retry)
+                    instancia_log.info(
+                        "A linha será reprocessada depois das demais linhas da empresa"
+                    )
+
+                # No caso de o máximo de falhas consecutivas ter sido atingida informar a área que esse foi o motivo da linha não ter sido processada
+                if self.atingiu_max_falhas_consecutivas():
+                    condicao_linhas_nao_processadas_max_exc = ~dados_para_processar[
+                        "STATUS"
+                    ].isin(STATUS_PROCESSADOS)
+                    instancia_log.info(
+                        f"A execução será interrompida porque a quantidade máxima de falhas consecutivas foi atingida, Quantidade de linhas não processadas: {condicao_linhas_nao_processadas_max_exc.sum()}"
+                    )
+                    dados_para_processar.loc[
+                        condicao_linhas_nao_processadas_max_exc, "STATUS"
+                    ] = "LINHA NÃO PROCESSADA"
+                    dados_para_processar.loc[
+                        condicao_linhas_nao_processadas_max_exc, "OBSERVAÇÃO"
+                    ] = "Linha não foi processada, pois foi atingido um número máximo de exceções consecutivas, fazer uma nova solicitação"
+                    break
+        finally:
+            # Fecha instancia do driver
+            self.encerrar()
+            instancia_log.info(
+                f"Logins: {self.qtd_logins}/Reinícios do navegador: {self.qtd_reinicios_navegador}/Sessões retomadas após erro previsto: {self.qtd_sessoes_retomadas}/Sessões de empresa restauradas: {self.qtd_sessoes_restauradas}"
+            )
+
+    def finalizar_linha(
+        self,
+        dados_para_processar: pd.DataFrame,
+        chaves_linhas: pd.Series,
+        index,
+        status: str,
+        obs_processamento: str,
+        reprocessar: bool,
+    ) -> None:
+        """
+        Atualiza o status da linha, grava o resultado no diário da execução e emite o evento de linha finalizada
+
+        Args:
+            dados_para_processar (pd.DataFrame): linhas que estão sendo processadas
+            chaves_linhas (pd.Series): chaves das linhas para o diário da execução (None quando não existe diário)
+            index: index da linha
+            status (str): status do processamento
+            obs_processamento (str): observação do processamento
+            reprocessar (bool): indica se a linha vai ser processada novamente
+        """
+        dados_para_processar.at[index, "STATUS"] = status
+        dados_para_processar.at[index, "OBSERVAÇÃO"] = obs_processamento
+        dados_saldo = self.recuperar_dados_saldo(index)
+        if chaves_linhas is not None:
+            self.registrar_no_diario(
+                chaves_linhas[index], index, status, obs_processamento, dados_saldo
+            )
+
+        emitir_evento(
+            "linha_finalizada",
+            index=index,
+            status=status,
+            observacao=obs_processamento,
+            reprocessar=reprocessar,
+            dados_saldo=dados_saldo,
+        )
+
+    def recuperar_dados_saldo(self, index) -> dict:
+        """
+        Retorna as colunas de saldo extraídas para a linha no serviço SALDO (None para os demais serviços)
+
+        Args:
+            index: index da linha processada
+        """
+        if self.servico != "SALDO":
+            return None
+        colunas_saldo = [
+            coluna for coluna in self.df_output_saldo.columns if coluna.startswith("SALDO")
+        ]
+        return self.df_output_saldo.loc[index, colunas_saldo].to_dict()
+
+    def registrar_no_diario(
+        self,
+        chave_linha: str,
+        index,
+        status: str,
+        obs_processamento: str,
+        dados_saldo: dict,
+    ) -> None:
+        """
+        Grava o resultado da linha no diário da execução
+
+        Args:
+            chave_linha (str): chave da linha no diário
+            index: index da linha processada
+            status (str): status do processamento
+            obs_processamento (str): observação do processamento
+            dados_saldo (dict): colunas de saldo extraídas para a linha (apenas no serviço SALDO)
+        """
+        try:
+            self.diario_execucao.registrar(
+                chave_linha,
+                index,
+                self.servico,
+                status,
+                obs_processamento,
+                dados_saldo,
+            )
+        except Exception as e:
+            # Uma falha na gravação do diário não interrompe o processamento das linhas
+            instancia_log.error(f"Erro ao gravar a linha {index + 1} no diário da execução: {e}")
+
+    def atingiu_max_falhas_consecutivas(self) -> bool:
+        """
+        Verifica se a quantidade máxima de falhas consecutivas foi atingida
+        """
+        return self.contador_falhas_consecutivas >= self.max_qtd_falhas_consecutivas
@@ -16,9 +16,12 @@ class ConfiguradorLog:
         self.script_directory = Path(script_directory)
         self.registrador_log = logging.getLogger(__name__)
 
-    def configurar_arquivo_log(self) -> None:
+    def configurar_arquivo_log(self, sufixo: str = "") -> None:
         """
         Configura arquivo de log
+
+        Args:
+            sufixo (str): sufixo do nome do arquivo, usado para separar o log de cada processo de navegador paralelo
         """
         try:
             # Formato da data
@@ -31,15 +34,16 @@ class ConfiguradorLog:
             caminho_pasta_log.mkdir(parents=True, exist_ok=True)
 
             caminho_arquivo_log = (
-                caminho_pasta_log / f"EvidencePython_{datetime_str}.log"
+                caminho_pasta_log / f"EvidencePython_{datetime_str}{sufixo}.log"
             )
             caminho_arquivo_log = caminho_arquivo_log.resolve()
 
-            # Configuração do arquivo de log
+            # Configuração do arquivo de log (force garante um arquivo novo a cada execução no servidor de scripts)
             logging.basicConfig(
                 filename=caminho_arquivo_log,
                 level=logging.INFO,
                 format="%(asctime)s - %(levelname)s: %(message)s",
+                force=True,
             )
         except (FileNotFoundError, PermissionError, OSError) as e:
             msg_erro = f"Erro ao configurar arquivo de log: {e}"
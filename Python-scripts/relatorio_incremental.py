@@ -0,0 +1,147 @@
+import datetime
+import pandas as pd
+from pathlib import Path
+
+from registrador_logs import instancia_log
+from auxiliar import acrescentar_linha_json, acrescentar_linhas_json
+
+
+# Tipos que o openpyxl escreve diretamente na planilha
+TIPOS_NATIVOS_EXCEL = (
+    str,
+    int,
+    float,
+    bool,
+    datetime.date,
+    datetime.time,
+    datetime.timedelta,
+)
+
+
+def converter_valor_excel(valor):
+    """
+    Converte o valor da célula para um tipo aceito pelo openpyxl. Valores vazios (None/NaN) ficam em branco, como no `to_excel`
+
+    Args:
+        valor: valor da célula
+    """
+    if pd.api.types.is_scalar(valor) and pd.isna(valor):
+        return None
+    if hasattr(valor, "item") and not isinstance(valor, TIPOS_NATIVOS_EXCEL):
+        # Tipos do numpy (int64, float64, datetime64...)
+        valor = valor.item()
+    if not isinstance(valor, TIPOS_NATIVOS_EXCEL):
+        return str(valor)
+    return valor
+
+
+class RelatorioIncremental:
+    def __init__(
+        self,
+        pasta_armazenamento: Path,
+        nome_arquivo_excel: str,
+        colunas_para_excluir: list,
+    ) -> None:
+        """
+        Inicializa a classe RelatorioIncremental, que grava cada linha do relatório em um arquivo NDJSON assim que a linha muda,
+        para que o resultado parcial exista durante toda a execução. No final o relatório é convertido para o arquivo excel
+
+        Args:
+            pasta_armazenamento (Path): pasta onde o relatório vai ser armazenado
+            nome_arquivo_excel (str): nome do arquivo excel que vai ser criado (sem a data e a extensão)
+            colunas_para_excluir (list): lista de colunas que não precisam ser escritas no relatório
+        """
+        nome_relatorio = f"{nome_arquivo_excel}_{datetime.datetime.now().strftime('%d%b%Y-%H.%M')}"
+        self.caminho_parcial = Path(pasta_armazenamento) / f"{nome_relatorio}.ndjson"
+        self.caminho_excel = Path(pasta_armazenamento) / f"{nome_relatorio}.xlsx"
+        self.colunas_para_excluir = set(colunas_para_excluir)
+
+        # Último conteúdo gravado de cada linha, na ordem em que as linhas foram incluídas no relatório
+        self.linhas = {}
+
+    def filtrar_colunas(self, linha: dict) -> dict:
+        """
+        Remove as colunas que não vão para o relatório. Valores vazios (NaN) viram None, para que a comparação entre versões da linha funcione
+
+        Args:
+            linha (dict): conteúdo da linha
+        """
+        return {
+            coluna: None if pd.api.types.is_scalar(valor) and pd.isna(valor) else valor
+            for coluna, valor in linha.items()
+            if coluna not in self.colunas_para_excluir
+        }
+
+    def incluir_linhas(self, dataframe: pd.DataFrame) -> None:
+        """
+        Inclui as linhas do dataframe no relatório, na ordem do dataframe, com uma única gravação no disco
+
+        Args:
+            dataframe (pd.DataFrame): linhas que vão ser incluídas
+        """
+        registros = []
+        for index, linha in zip(dataframe.index, dataframe.to_dict("records")):
+            linha = self.filtrar_colunas(linha)
+            self.linhas[index] = linha
+            registros.append({"index": index, "linha": linha})
+        acrescentar_linhas_json(self.caminho_parcial, registros)
+
+    def atualizar_linha(self, index, valores: dict) -> None:
+        """
+        Atualiza as colunas informadas de uma linha do relatório e grava a linha, caso algum valor tenha mudado
+
+        Args:
+            index: index da linha
+            valores (dict): colunas que vão ser atualizadas e os novos valores. Colunas novas vão para o final da linha
+        """
+        linha_atual = self.linhas.get(index, {})
+        linha = {**linha_atual, **self.filtrar_colunas(valores)}
+        if linha == linha_atual:
+            return
+        self.linhas[index] = linha
+        acrescentar_linha_json(self.caminho_parcial, {"index": index, "linha": linha})
+
+    def atualizar_linhas(self, dataframe: pd.DataFrame, colunas: list) -> None:
+        """
+        Atualiza as colunas informadas a partir do dataframe, gravando apenas as linhas que mudaram
+
+        Args:
+            dataframe (pd.DataFrame): dataframe com os valores finais
+            colunas (list): colunas que vão ser comparadas e atualizadas
+        """
+        for index, valores in zip(dataframe.index, dataframe[colunas].to_dict("records")):
+            self.atualizar_linha(index, valores)
+
+    def finalizar(self) -> Path | None:
+        """
+        Escreve o relatório no arquivo excel, linha a linha, remove o arquivo parcial e retorna o caminho do excel. Um relatório
+        vazio (input sem linhas) não gera o excel e retorna None, sem interromper a execução
+        """
+        from openpyxl import Workbook
+
+        if not self.linhas:
+            instancia_log.info("Relatório para ser escrito está vazio, o arquivo excel não vai ser gerado")
+            self.descartar()
+            return None
+
+        # As colunas ficam na ordem em que aparecem pela primeira vez (colunas novas, como SALDO 2, vão para o final)
+        colunas = list(dict.fromkeys(coluna for linha in self.linhas.values() for coluna in linha))
+
+        try:
+            wb = Workbook(write_only=True)
+            planilha = wb.create_sheet("Sheet1")
+            planilha.append(colunas)
+            for linha in self.linhas.values():
+                planilha.append([converter_valor_excel(linha.get(coluna)) for coluna in colunas])
+            wb.save(self.caminho_excel)
+        except Exception as e:
+            raise Exception(f"Erro ao escrever relatório do excel: {e}")
+
+        self.caminho_parcial.unlink(missing_ok=True)
+        return self.caminho_excel
+
+    def descartar(self) -> None:
+        """
+        Remove o arquivo parcial sem gerar o arquivo excel
+        """
+        self.caminho_parcial.unlink(missing_ok=True)
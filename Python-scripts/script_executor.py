@@ -1,5 +1,22 @@
+import ast
+import hashlib
+import json
+import logging
 import subprocess
 import os
+import sys
+import time
+from pathlib import Path
+from typing import Callable
+
+from canal_eventos import interpretar_linha
+from servidor_scripts import conectar_servidor
+
+
+# Arquivo, dentro do ambiente virtual, que guarda a impressão digital da última instalação bem sucedida
+NOME_ARQUIVO_IMPRESSAO_DIGITAL = ".impressao_digital_instalacao"
+
+registrador_log = logging.getLogger(__name__)
 
 
 class ExecutorScript:
@@ -8,7 +25,9 @@ class ExecutorScript:
         diretorio_script: str,
         nome_script: str,
         nome_funcao: str,
-        parametros: str,
+        parametros: str | dict,
+        forcar_instalacao: bool = False,
+        ao_receber_evento: Callable[[dict], None] | None = None,
     ) -> None:
         """
         Inicializa a classe ScriptRunner
@@ -17,13 +36,26 @@ class ExecutorScript:
             diretorio_script (str): diretorio do script executado
             nome_script (str): nome do script que vai ser executado em subprocess
             nome_funcao (str): nome da função a ser executada dentro do script fornecido em `nome_script`
-            parametros (str): dicionário serializado (formato de string) de parâmetros que vao ser utilizado na execução em subprocess
+            parametros (str | dict): dicionário de parâmetros que vão ser utilizados na execução em subprocess, serializado em JSON ou já como objeto
+            forcar_instalacao (bool): executa o `poetry install` mesmo que as dependências não tenham mudado desde a última instalação
+            ao_receber_evento (Callable): função chamada a cada evento recebido do script enquanto ele executa. Por padrão o andamento é registrado no log
         """
 
         self.diretorio_script = diretorio_script
         self.nome_script = nome_script
         self.nome_funcao = nome_funcao
         self.parametros = parametros
+        self.forcar_instalacao = forcar_instalacao
+        self.caminho_ambiente_virtual = Path(diretorio_script) / ".venv"
+        self.ao_receber_evento = ao_receber_evento or self.registrar_andamento
+
+        # Estado do canal de eventos da execução
+        self.eventos = []
+        self.resultado_final = None
+        self.output_sem_eventos = ""
+        self.qtd_linhas_finalizadas = 0
+        # Definido quando o script começa a executar, para que a vazão não inclua a instalação das dependências
+        self.inicio_execucao = None
 
         # Checa e configura POETRY_VIRTUALENVS_IN_PROJECT
         self.configura_criacao_ambiente_virtual_no_projeto()
@@ -36,55 +68,258 @@ class ExecutorScript:
         if env_variable is None or env_variable.lower() == "false":
             os.environ["POETRY_VIRTUALENVS_IN_PROJECT"] = "true"
 
+    def recuperar_versao_interpretador(self) -> str:
+        """
+        Recupera a versão do python do ambiente virtual a partir do arquivo pyvenv.cfg. Retorna vazio caso o ambiente não exista
+        """
+        caminho_configuracao = self.caminho_ambiente_virtual / "pyvenv.cfg"
+        if not caminho_configuracao.is_file():
+            return ""
+
+        for linha in caminho_configuracao.read_text().splitlines():
+            chave, _, valor = linha.partition("=")
+            if chave.strip() in ("version", "version_info"):
+                return valor.strip()
+        return ""
+
+    def calcular_impressao_digital_ambiente(self) -> str:
+        """
+        Calcula o hash do pyproject.toml, do poetry.lock e da versão do interpretador do ambiente virtual
+        """
+        impressao_digital = hashlib.sha256()
+        for nome_arquivo in ("pyproject.toml", "poetry.lock"):
+            caminho_arquivo = Path(self.diretorio_script) / nome_arquivo
+            if caminho_arquivo.is_file():
+                impressao_digital.update(caminho_arquivo.read_bytes())
+            impressao_digital.update(b"\0")
+        impressao_digital.update(self.recuperar_versao_interpretador().encode())
+        return impressao_digital.hexdigest()
+
+    def instalar_dependencias(self) -> None:
+        """
+        Executa o `poetry install` apenas quando as dependências ou o interpretador mudaram desde a última instalação bem sucedida
+        """
+        caminho_impressao_digital = (
+            self.caminho_ambiente_virtual / NOME_ARQUIVO_IMPRESSAO_DIGITAL
+        )
+        if not self.forcar_instalacao and caminho_impressao_digital.is_file():
+            if (
+                caminho_impressao_digital.read_text()
+                == self.calcular_impressao_digital_ambiente()
+            ):
+                return
+
+        resultado = subprocess.run(["poetry", "install"], cwd=self.diretorio_script)
+
+        # A impressão digital é calculada depois da instalação, pois o ambiente virtual pode ter acabado de ser criado
+        if resultado.returncode == 0 and self.caminho_ambiente_virtual.is_dir():
+            caminho_impressao_digital.write_text(
+                self.calcular_impressao_digital_ambiente()
+            )
+        else:
+            caminho_impressao_digital.unlink(missing_ok=True)
+
+    def carregar_parametros(self) -> dict:
+        """
+        Converte os parâmetros recebidos em objeto. Strings são lidas como JSON e, para manter compatibilidade,
+        como literal python (sem executar código) caso não sejam JSON válido
+        """
+        if not isinstance(self.parametros, str):
+            return self.parametros
+
+        try:
+            return json.loads(self.parametros)
+        except json.JSONDecodeError:
+            return ast.literal_eval(self.parametros)
+
+    def recuperar_executavel_python(self) -> list[str]:
+        """
+        Retorna o comando do python do ambiente virtual. Quando o ambiente já existe o executável é chamado diretamente, sem passar pelo poetry
+        """
+        if sys.platform == "win32":
+            caminho_executavel = self.caminho_ambiente_virtual / "Scripts" / "python.exe"
+        else:
+            caminho_executavel = self.caminho_ambiente_virtual / "bin" / "python"
+
+        if caminho_executavel.is_file():
+            return [str(caminho_executavel)]
+        return ["poetry", "run", "python"]
+
     def criar_comando_python(self) -> list[str]:
         """
         Cria comando (no formato de lista) para executar script python usando o subprocess.
+        Os parâmetros não fazem parte do comando, eles são enviados pelo stdin
         """
 
-        chamada_funcao = f"from {self.nome_script} import {self.nome_funcao}; {self.nome_funcao}({self.parametros});"
         comando = [
-            "poetry",
-            "run",
-            "python",
-            "-c",
-            chamada_funcao,
+            *self.recuperar_executavel_python(),
+            "lancador_script.py",
+            self.nome_script,
+            self.nome_funcao,
         ]
         return comando
 
+    def processar_linha_saida(self, linha: str) -> None:
+        """
+        Trata uma linha do stdout do script: eventos são repassados para `ao_receber_evento` e o restante é guardado como output
+
+        Args:
+            linha (str): linha lida do stdout do script
+        """
+        evento = interpretar_linha(linha)
+        if evento is None:
+            self.output_sem_eventos += linha
+            return
+
+        self.eventos.append(evento)
+        if evento["evento"] == "linha_finalizada":
+            self.qtd_linhas_finalizadas += 1
+        elif evento["evento"] == "resumo":
+            self.resultado_final = evento.get("mensagem", "")
+        self.ao_receber_evento(evento)
+
+    def registrar_andamento(self, evento: dict) -> None:
+        """
+        Registra no log cada linha finalizada junto com a vazão da execução até o momento
+
+        Args:
+            evento (dict): evento recebido do script
+        """
+        if evento["evento"] != "linha_finalizada":
+            return
+
+        minutos_decorridos = (time.perf_counter() - self.inicio_execucao) / 60
+        linhas_por_minuto = self.qtd_linhas_finalizadas / max(minutos_decorridos, 1e-6)
+        registrador_log.info(
+            f"Linha {evento.get('index')} finalizada com status {evento.get('status')}/Linhas finalizadas: {self.qtd_linhas_finalizadas}/Linhas por minuto: {linhas_por_minuto:.2f}"
+        )
+
+    def recuperar_output(self) -> str:
+        """
+        Retorna a mensagem do evento de resumo. Caso o script não emita o resumo, retorna o stdout que não era evento
+        """
+        if self.resultado_final is not None:
+            return self.resultado_final
+        return self.output_sem_eventos
+
+    def executar_no_servidor(self) -> str | None:
+        """
+        Envia a execução para o servidor de scripts, que já está com o ambiente virtual e os módulos carregados.
+        Retorna None caso o servidor não esteja rodando ou esteja ocupado com outra tarefa, para que a execução siga pelo subprocess
+        """
+        conexao = conectar_servidor(self.diretorio_script)
+        if conexao is None:
+            return None
+
+        with conexao:
+            parametros = self.carregar_parametros()
+            self.inicio_execucao = time.perf_counter()
+            conexao.send(("executar", self.nome_script, self.nome_funcao, parametros))
+
+            while True:
+                tipo_mensagem, conteudo = conexao.recv()
+                if tipo_mensagem == "ocupado":
+                    registrador_log.info("Servidor de scripts ocupado com outra tarefa, a execução segue pelo subprocess")
+                    return None
+                if tipo_mensagem == "fim":
+                    break
+                self.processar_linha_saida(conteudo)
+
+        if conteudo != 0:
+            return f"Erro ao executar o script: o servidor de scripts retornou o código de saída {conteudo}"
+        return self.recuperar_output()
+
+    def iniciar_servidor(self) -> None:
+        """
+        Sobe o servidor de scripts em segundo plano dentro do ambiente virtual, caso ainda não esteja rodando
+        """
+        conexao = conectar_servidor(self.diretorio_script)
+        if conexao is not None:
+            conexao.close()
+            return
+
+        self.instalar_dependencias()
+
+        # O servidor não pode ficar preso ao processo que fez a chamada
+        if sys.platform == "win32":
+            opcoes_processo = {
+                "creationflags": subprocess.DETACHED_PROCESS
+                | subprocess.CREATE_NEW_PROCESS_GROUP
+            }
+        else:
+            opcoes_processo = {"start_new_session": True}
+
+        subprocess.Popen(
+            ["poetry", "run", "python", "servidor_scripts.py"],
+            cwd=self.diretorio_script,
+            stdin=subprocess.DEVNULL,
+            stdout=subprocess.DEVNULL,
+            stderr=subprocess.DEVNULL,
+            **opcoes_processo,
+        )
+
+    def encerrar_servidor(self) -> None:
+        """
+        Pede para o servidor de scripts encerrar, caso esteja rodando
+        """
+        conexao = conectar_servidor(self.diretorio_script)
+        if conexao is None:
+            return
+
+        with conexao:
+            conexao.send(("encerrar",))
+            conexao.recv()
+
     def executar_script(self) -> str:
         """
-        Ativa ambiente virtual, executa script e desativa ambiente virtual
+        Ativa ambiente virtual, executa script e desativa ambiente virtual.
+        Caso o servidor de scripts esteja rodando a execução é feita nele, sem subir um novo interpretador
         """
 
         try:
+            # Tenta executar no servidor de scripts, que evita o custo de inicialização do interpretador
+            output = self.executar_no_servidor()
+            if output is not None:
+                return output
+
             # Ambiente virtual vai ser criado na mesma pasta em que os scripts estão localizados
             caminho_ambiente_virtual = self.diretorio_script
 
-            # Instala dependências listadas no arquivo pyproject.toml, cria e ativa o ambiente virtual
-            subprocess.run(["poetry", "install"], cwd=caminho_ambiente_virtual)
+            # Instala dependências listadas no arquivo pyproject.toml e cria o ambiente virtual, caso algo tenha mudado desde a última instalação
+            self.instalar_dependencias()
 
             # Cria comando para executar script
             comando_para_executar_script = self.criar_comando_python()
+            parametros = self.carregar_parametros()
 
-            # Executa script e salva output
-            with open("output.txt", "w+") as arquivo_output:
-                subprocess.run(
-                    comando_para_executar_script,
-                    cwd=caminho_ambiente_virtual,
-                    stdout=arquivo_output,
-                    text=True,
-                    check=True,
-                )
+            # Executa script, envia os parâmetros pelo stdin e lê os eventos do stdout enquanto o script executa
+            self.inicio_execucao = time.perf_counter()
+            with subprocess.Popen(
+                comando_para_executar_script,
+                cwd=caminho_ambiente_virtual,
+                stdin=subprocess.PIPE,
+                stdout=subprocess.PIPE,
+                text=True,
+            ) as processo:
+                json.dump(parametros, processo.stdin)
+                processo.stdin.close()
 
-                # Recupera o retorno do arquivo output.txt
-                arquivo_output.seek(0)
-                output = arquivo_output.read()
+                for linha in processo.stdout:
+                    self.processar_linha_saida(linha)
 
-            return output
+            if processo.returncode != 0:
+                raise subprocess.CalledProcessError(
+                    processo.returncode, comando_para_executar_script
+                )
+
+            return self.recuperar_output()
 
         except FileNotFoundError as e:
             return f"Algum arquivo/pasta necessário para a execução não foi encontrado: {e}"
 
+        except (EOFError, ConnectionError) as e:
+            return f"Erro de comunicação com o servidor de scripts: {e}"
+
         except subprocess.CalledProcessError as e:
             return f"Erro ao executar o script: {e}"
 
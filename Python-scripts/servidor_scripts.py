@@ -0,0 +1,252 @@
+import contextlib
+import importlib
+import io
+import json
+import logging
+import os
+import queue
+import secrets
+import sys
+import threading
+import traceback
+from multiprocessing import AuthenticationError
+from multiprocessing.connection import Client, Listener
+from pathlib import Path
+
+
+# Recupera a pasta em que o script está sendo executado
+DIRETORIO_SCRIPT = Path(__file__).resolve().parent
+
+# Arquivo onde o servidor publica o endereço e a chave de autenticação para os clientes
+NOME_ARQUIVO_CONEXAO = ".servidor_scripts.json"
+
+# Módulos que são importados quando o servidor sobe, para que as dependências pesadas já estejam carregadas
+MODULOS_PRE_CARREGADOS = ["executar_acao_site_caixa"]
+
+# Tempo máximo de espera pela mensagem do cliente depois da autenticação
+TIMEOUT_MENSAGEM_CLIENTE = 10
+
+
+class SaidaConexao(io.TextIOBase):
+    """
+    Substitui o stdout durante a execução de uma tarefa e envia cada linha completa para o cliente
+    """
+
+    def __init__(self, conexao) -> None:
+        """
+        Inicializa a classe SaidaConexao
+
+        Args:
+            conexao: conexão com o cliente que solicitou a tarefa
+        """
+        self.conexao = conexao
+        self.buffer_linha = ""
+
+    def writable(self) -> bool:
+        return True
+
+    def write(self, texto: str) -> int:
+        """
+        Acumula o texto recebido e envia para o cliente as linhas que já foram finalizadas
+        """
+        self.buffer_linha += texto
+        *linhas, self.buffer_linha = self.buffer_linha.split("\n")
+        for linha in linhas:
+            self.conexao.send(("saida", linha + "\n"))
+        return len(texto)
+
+    def flush(self) -> None:
+        """
+        Envia para o cliente o que ainda estiver no buffer
+        """
+        if self.buffer_linha:
+            self.conexao.send(("saida", self.buffer_linha))
+            self.buffer_linha = ""
+
+
+class ServidorScript:
+    def __init__(
+        self,
+        diretorio_script: Path,
+        modulos_pre_carregados: list[str] = MODULOS_PRE_CARREGADOS,
+    ) -> None:
+        """
+        Inicializa a classe ServidorScript, que mantém o interpretador do ambiente virtual carregado e executa tarefas enviadas por socket local
+
+        Args:
+            diretorio_script (Path): diretório onde estão os scripts que vão ser executados
+            modulos_pre_carregados (list[str]): módulos importados na inicialização do servidor
+        """
+        self.diretorio_script = Path(diretorio_script)
+        self.modulos_pre_carregados = modulos_pre_carregados
+        self.caminho_arquivo_conexao = self.diretorio_script / NOME_ARQUIVO_CONEXAO
+        self.chave_autenticacao = secrets.token_bytes(32)
+        self.listener = None
+        # Tarefas aceitas pela thread de conexões, executadas uma de cada vez pela thread principal
+        self.fila_tarefas = queue.Queue()
+        self.trava_ocupado = threading.Lock()
+        self.ocupado = False
+        self.encerrando = False
+
+    def pre_carregar_modulos(self) -> None:
+        """
+        Importa os módulos configurados para que as tarefas não paguem o custo de importação
+        """
+        for nome_modulo in self.modulos_pre_carregados:
+            importlib.import_module(nome_modulo)
+
+    def publicar_endereco(self) -> None:
+        """
+        Escreve o endereço e a chave de autenticação do servidor no arquivo de conexão
+        """
+        host, porta = self.listener.address
+        dados_conexao = {
+            "host": host,
+            "porta": porta,
+            "chave": self.chave_autenticacao.hex(),
+            "pid": os.getpid(),
+        }
+        self.caminho_arquivo_conexao.write_text(json.dumps(dados_conexao))
+
+    def executar_tarefa(
+        self, conexao, nome_script: str, nome_funcao: str, parametros
+    ) -> int:
+        """
+        Executa a função solicitada e retorna o código de saída, enviando o stdout da função para o cliente
+
+        Args:
+            conexao: conexão com o cliente que solicitou a tarefa
+            nome_script (str): nome do módulo que contém a função
+            nome_funcao (str): nome da função a ser executada
+            parametros: parâmetros que vão ser passados para a função
+        """
+        saida = SaidaConexao(conexao)
+        codigo_saida = 0
+        with contextlib.redirect_stdout(saida):
+            try:
+                modulo = importlib.import_module(nome_script)
+                getattr(modulo, nome_funcao)(parametros)
+            except SystemExit as e:
+                codigo_saida = e.code if isinstance(e.code, int) else 1
+            except Exception:
+                traceback.print_exc(file=sys.stderr)
+                codigo_saida = 1
+            finally:
+                saida.flush()
+                self.restaurar_estado_processo()
+        return codigo_saida
+
+    def restaurar_estado_processo(self) -> None:
+        """
+        Desfaz o estado global deixado pela tarefa, para que a próxima tarefa comece como em um interpretador novo: fecha o arquivo
+        de log configurado pela tarefa e limpa os ouvintes e a fila do canal de eventos. Os caches que valem para o processo (por
+        exemplo o caminho do chromedriver resolvido no `auxiliar`) são mantidos de propósito entre as tarefas
+        """
+        logger_raiz = logging.getLogger()
+        for handler in list(logger_raiz.handlers):
+            logger_raiz.removeHandler(handler)
+            handler.close()
+
+        canal_eventos = sys.modules.get("canal_eventos")
+        if canal_eventos is not None:
+            canal_eventos.ouvintes_eventos.clear()
+            canal_eventos.fila_eventos = None
+
+    def receber_conexoes(self) -> None:
+        """
+        Aceita as conexões dos clientes em uma thread própria. Enquanto uma tarefa está em execução, os pedidos de execução recebem
+        a resposta "ocupado", para que o cliente siga pelo subprocess em vez de ficar aguardando o fim da tarefa atual
+        """
+        while not self.encerrando:
+            try:
+                conexao = self.listener.accept()
+            except OSError:
+                # Listener fechado no encerramento do servidor
+                if self.encerrando:
+                    break
+                continue
+            except Exception:
+                # Clientes que não se autenticaram não derrubam o servidor
+                continue
+
+            try:
+                if not conexao.poll(TIMEOUT_MENSAGEM_CLIENTE):
+                    conexao.close()
+                    continue
+                mensagem = conexao.recv()
+            except (EOFError, OSError):
+                conexao.close()
+                continue
+
+            if mensagem[0] != "encerrar":
+                with self.trava_ocupado:
+                    ocupado = self.ocupado
+                    self.ocupado = True
+                if ocupado:
+                    try:
+                        conexao.send(("ocupado", None))
+                    except OSError:
+                        pass
+                    conexao.close()
+                    continue
+            self.fila_tarefas.put((conexao, mensagem))
+
+    def atender(self) -> None:
+        """
+        Sobe o servidor e atende as tarefas, uma de cada vez, até receber o pedido de encerramento
+        """
+        os.chdir(self.diretorio_script)
+        self.pre_carregar_modulos()
+
+        self.listener = Listener(("127.0.0.1", 0), authkey=self.chave_autenticacao)
+        self.publicar_endereco()
+        threading.Thread(
+            target=self.receber_conexoes, name="conexoes_servidor_scripts", daemon=True
+        ).start()
+
+        try:
+            while True:
+                conexao, mensagem = self.fila_tarefas.get()
+                with conexao:
+                    try:
+                        if mensagem[0] == "encerrar":
+                            conexao.send(("fim", 0))
+                            break
+
+                        _, nome_script, nome_funcao, parametros = mensagem
+                        codigo_saida = self.executar_tarefa(
+                            conexao, nome_script, nome_funcao, parametros
+                        )
+                        conexao.send(("fim", codigo_saida))
+                    except (EOFError, OSError):
+                        # O cliente desconectou antes do fim da tarefa
+                        continue
+                    finally:
+                        with self.trava_ocupado:
+                            self.ocupado = False
+        finally:
+            self.encerrando = True
+            self.listener.close()
+            self.caminho_arquivo_conexao.unlink(missing_ok=True)
+
+
+def conectar_servidor(diretorio_script: Path):
+    """
+    Abre uma conexão com o servidor de scripts. Retorna None caso o servidor não esteja rodando
+
+    Args:
+        diretorio_script (Path): diretório onde o servidor publica o arquivo de conexão
+    """
+    caminho_arquivo_conexao = Path(diretorio_script) / NOME_ARQUIVO_CONEXAO
+    try:
+        dados_conexao = json.loads(caminho_arquivo_conexao.read_text())
+        return Client(
+            (dados_conexao["host"], dados_conexao["porta"]),
+            authkey=bytes.fromhex(dados_conexao["chave"]),
+        )
+    except (OSError, ValueError, KeyError, AuthenticationError):
+        return None
+
+
+if __name__ == "__main__":
+    ServidorScript(DIRETORIO_SCRIPT).atender()
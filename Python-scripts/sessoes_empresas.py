@@ -0,0 +1,61 @@
+import time
+
+from registrador_logs import instancia_log
+
+
+# Tempo máximo (em segundos) em que a sessão guardada de uma empresa é reaproveitada sem um novo login
+TEMPO_MAX_SESSAO_EMPRESA_PADRAO = 900
+
+
+class CacheSessoesEmpresas:
+    def __init__(self, tempo_max_sessao: float = TEMPO_MAX_SESSAO_EMPRESA_PADRAO) -> None:
+        """
+        Inicializa a classe CacheSessoesEmpresas, que guarda por empresa os cookies da sessão logada no site da caixa, para que o
+        reinício do navegador restaure a sessão em vez de fazer o login completo. As sessões valem apenas para o processo atual
+
+        Args:
+            tempo_max_sessao (float): tempo máximo, em segundos, em que a sessão é reaproveitada depois do login
+        """
+        self.tempo_max_sessao = tempo_max_sessao
+        self.sessoes = {}
+
+    def guardar(self, empresa: str, cookies: list[dict], url_portal: str) -> None:
+        """
+        Guarda a sessão logada da empresa
+
+        Args:
+            empresa (str): empresa da sessão
+            cookies (list[dict]): cookies da sessão, no formato do DevTools (`Network.getAllCookies`), restaurados pelo
+                `Network.setCookies`. Não é o formato do `get_cookies` do selenium (que usa "expiry" em vez de "expires")
+            url_portal (str): url do portal logado, aberta na restauração da sessão
+        """
+        self.sessoes[empresa] = {
+            "cookies": cookies,
+            "url_portal": url_portal,
+            "momento_login": time.monotonic(),
+        }
+
+    def recuperar(self, empresa: str) -> dict:
+        """
+        Retorna a sessão guardada da empresa ou None, caso não exista sessão ou a sessão tenha expirado
+
+        Args:
+            empresa (str): empresa da sessão
+        """
+        sessao = self.sessoes.get(empresa)
+        if sessao is None:
+            return None
+        if time.monotonic() - sessao["momento_login"] > self.tempo_max_sessao:
+            instancia_log.info(f"Sessão guardada da empresa {empresa} expirou")
+            self.descartar(empresa)
+            return None
+        return sessao
+
+    def descartar(self, empresa: str) -> None:
+        """
+        Remove a sessão guardada da empresa
+
+        Args:
+            empresa (str): empresa da sessão
+        """
+        self.sessoes.pop(empresa, None)
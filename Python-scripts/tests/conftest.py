@@ -0,0 +1,6 @@
+import sys
+from pathlib import Path
+
+
+# Os scripts são importados como módulos de primeiro nível (mesmo layout usado pelo `ExecutorScript`)
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
@@ -0,0 +1,62 @@
+import pandas as pd
+
+from agendador_linhas import AgendadorLinhas, agrupar_linhas_por_empresa
+
+
+def montar_linhas(empresas: list[str]) -> pd.DataFrame:
+    """
+    Monta as linhas de input com o certificado de cada empresa na mesma posição da empresa
+
+    Args:
+        empresas (list[str]): empresa de cada linha, na ordem do input
+    """
+    posicoes = {empresa: posicao for posicao, empresa in enumerate(dict.fromkeys(empresas))}
+    return pd.DataFrame(
+        {
+            "EMPRESA": empresas,
+            "POSICAO DO CERTIFICADO": [posicoes[empresa] for empresa in empresas],
+        },
+        index=[10 + i for i in range(len(empresas))],
+    )
+
+
+def test_agrupar_linhas_por_empresa_mantem_ordem_do_input():
+    """
+    Os grupos seguem a ordem em que cada empresa aparece pela primeira vez e as linhas seguem a ordem do input
+    """
+    linhas = montar_linhas(["B", "A", "B", "C", "A"])
+    assert agrupar_linhas_por_empresa(linhas) == [[10, 12], [11, 14], [13]]
+
+
+def test_agendador_processa_empresa_por_empresa():
+    """
+    As linhas de uma empresa são processadas juntas, todas com o contador de retry zerado
+    """
+    agendador = AgendadorLinhas(montar_linhas(["A", "B", "A"]))
+    assert list(agendador) == [(10, 0), (12, 0), (11, 0)]
+
+
+def test_reagendar_vai_para_o_final_do_lote_da_empresa():
+    """
+    A linha reagendada é reprocessada depois das outras linhas da mesma empresa e antes das linhas da próxima empresa
+    """
+    agendador = AgendadorLinhas(montar_linhas(["A", "A", "B"]))
+    processadas = []
+    for index, contador_retry in agendador:
+        processadas.append((index, contador_retry))
+        if index == 10 and contador_retry == 0:
+            agendador.reagendar(index, contador_retry + 1)
+    assert processadas == [(10, 0), (11, 0), (10, 1), (12, 0)]
+
+
+def test_reagendar_na_ultima_linha_da_empresa():
+    """
+    O retry da última linha da empresa ainda acontece antes da próxima empresa, e as pendências contam o retry
+    """
+    agendador = AgendadorLinhas(montar_linhas(["A", "B"]))
+    iterador = iter(agendador)
+    assert next(iterador) == (10, 0)
+    agendador.reagendar(10, 1)
+    assert agendador.qtd_linhas_pendentes() == 2
+    assert list(iterador) == [(10, 1), (11, 0)]
+    assert agendador.qtd_linhas_pendentes() == 0
@@ -0,0 +1,28 @@
+import json
+
+from canal_eventos import CHAVE_EVENTO, interpretar_linha
+
+
+def test_interpretar_linha_evento():
+    """
+    Uma linha JSON com a chave do evento é interpretada, mesmo com espaços e quebra de linha no final
+    """
+    evento = {CHAVE_EVENTO: "linha_finalizada", "index": 3, "status": "SUCESSO"}
+    assert interpretar_linha(f"  {json.dumps(evento)}\n") == evento
+
+
+def test_interpretar_linha_texto_comum():
+    """
+    Linhas que não são eventos (prints e textos do script) não são interpretadas
+    """
+    assert interpretar_linha("Quantidade de linhas recebidas:2\n") is None
+    assert interpretar_linha("") is None
+
+
+def test_interpretar_linha_json_sem_chave_evento():
+    """
+    JSON sem a chave do evento, JSON que não é objeto e JSON incompleto não são eventos
+    """
+    assert interpretar_linha('{"index": 3}') is None
+    assert interpretar_linha("[1, 2]") is None
+    assert interpretar_linha('{"evento": "resumo", "mensagem": ') is None
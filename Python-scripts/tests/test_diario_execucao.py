@@ -0,0 +1,80 @@
+import pandas as pd
+
+from diario_execucao import DiarioExecucao, gerar_chaves_linhas
+
+
+def montar_input() -> pd.DataFrame:
+    """
+    Monta um input com três colaboradores
+    """
+    return pd.DataFrame(
+        {
+            "EMPRESA": ["EMPRESA A", "EMPRESA A", "EMPRESA B"],
+            "NOME": ["JOAO", "MARIA", "JOSE"],
+            "CPF": ["111", "222", "333"],
+            "PIS": ["1", "2", "3"],
+            "DATA DE ADMISSAO": ["01/02/2020", "03/04/2021", "05/06/2019"],
+        }
+    )
+
+
+def test_gerar_chaves_linhas_ignora_espacos_e_depende_da_posicao():
+    """
+    Espaços em volta dos dados não mudam a chave, mas a mesma pessoa em outra posição do input é outra linha
+    """
+    dados = montar_input()
+    chaves = gerar_chaves_linhas(dados)
+
+    dados_com_espacos = dados.copy()
+    dados_com_espacos["NOME"] = dados_com_espacos["NOME"] + "  "
+    assert gerar_chaves_linhas(dados_com_espacos).equals(chaves)
+
+    dados_reordenados = dados.iloc[[1, 0, 2]].reset_index(drop=True)
+    assert gerar_chaves_linhas(dados_reordenados)[0] != chaves[1]
+
+
+def test_retomada_apos_interrupcao(tmp_path):
+    """
+    Depois de uma execução interrompida no meio da escrita, a retomada recupera apenas as linhas finalizadas (sucesso ou erro
+    previsto) do serviço, com o último registro de cada linha, e ignora a linha incompleta
+    """
+    dados = montar_input()
+    chaves = gerar_chaves_linhas(dados)
+    diario = DiarioExecucao(tmp_path / "diario.ndjson")
+
+    diario.registrar(chaves[0], 0, "SALDO", "ERRO NÃO PREVISTO", "falha no site")
+    diario.registrar(
+        chaves[0], 0, "SALDO", "SUCESSO",
+        "Arquivo output:https://drive/arquivo | Chave para validação: abc123",
+        {"SALDO": "R$ 10,00"},
+    )
+    diario.registrar(chaves[1], 1, "SALDO", "ERRO NÃO PREVISTO", "falha no site")
+    diario.registrar(chaves[2], 2, "EXTRATO", "SUCESSO", "ok")
+    # Processo encerrado durante a gravação do próximo registro
+    with open(diario.caminho_diario, "a", encoding="utf-8") as arquivo:
+        arquivo.write('{"chave_linha": "' + chaves[2] + '", "servico": "SAL')
+
+    linhas_finalizadas = diario.recuperar_linhas_finalizadas(dados, "SALDO")
+
+    assert list(linhas_finalizadas) == [0]
+    assert linhas_finalizadas[0]["status"] == "SUCESSO"
+    assert linhas_finalizadas[0]["link_drive"] == "https://drive/arquivo"
+    assert linhas_finalizadas[0]["chave_md5"] == "abc123"
+    assert linhas_finalizadas[0]["dados_saldo"] == {"SALDO": "R$ 10,00"}
+
+
+def test_retomada_le_os_diarios_dos_navegadores_paralelos(tmp_path):
+    """
+    As linhas gravadas pelos navegadores paralelos, cada um no seu arquivo, também são recuperadas pelo diário principal
+    """
+    dados = montar_input()
+    chaves = gerar_chaves_linhas(dados)
+    diario = DiarioExecucao(tmp_path / "diario.ndjson")
+
+    diario.para_processo("_navegador_1").registrar(chaves[1], 1, "CHAVE", "ERRO PREVISTO", "Erro previsto: nome não localizado")
+    diario.para_processo("_navegador_2").registrar(chaves[2], 2, "CHAVE", "SUCESSO", "ok")
+
+    linhas_finalizadas = diario.recuperar_linhas_finalizadas(dados, "CHAVE")
+
+    assert sorted(linhas_finalizadas) == [1, 2]
+    assert linhas_finalizadas[1]["status"] == "ERRO PREVISTO"
@@ -0,0 +1,72 @@
+import pandas as pd
+
+from preparacao_linhas import preparar_linhas
+
+
+def montar_input(**colunas) -> pd.DataFrame:
+    """
+    Monta um input de duas linhas, com as colunas informadas substituindo as padrão
+
+    Args:
+        colunas: colunas que substituem as colunas padrão
+    """
+    dados = {
+        "NOME": [" JOAO DA SILVA DOS SANTOS ", "MARIA DE SOUZA E LIMA"],
+        "EMPRESA": ["EMPRESA A ", "EMPRESA B"],
+        "POSICAO DO CERTIFICADO": [1, 2],
+        "ID PASTA DRIVE SALDO": ["pasta1", "pasta2"],
+        "ID PASTA DRIVE CHAVE": ["pasta3", "pasta4"],
+        "DATA DE ADMISSAO": ["2020-02-01 00:00:00", "03/04/2021"],
+        "CODIGO EXECUCAO": ["I1 - 01", "I3 - 04"],
+        "DATA DE RECISÃO": ["2024-01-31", "15/02/2024"],
+    }
+    dados.update(colunas)
+    return pd.DataFrame(dados, index=[4, 7])
+
+
+def test_preparar_linhas_saldo():
+    """
+    O nome perde as preposições, a empresa os espaços e as datas de admissão nos dois formatos aceitos vão para DD/MM/AAAA
+    """
+    registros_linhas, motivos_rejeicao = preparar_linhas(montar_input(), "SALDO")
+
+    assert motivos_rejeicao == {}
+    assert registros_linhas[4]["nome_colaborador"] == "JOAO SILVA SANTOS"
+    assert registros_linhas[4]["nome_colaborador_original"] == "JOAO DA SILVA DOS SANTOS"
+    assert registros_linhas[7]["nome_colaborador"] == "MARIA SOUZA LIMA"
+    assert registros_linhas[4]["empresa"] == "EMPRESA A"
+    assert registros_linhas[4]["data_admissao"] == "01/02/2020"
+    assert registros_linhas[7]["data_admissao"] == "03/04/2021"
+    assert registros_linhas[7]["id_pasta"] == "pasta2"
+    assert registros_linhas[4]["nome_certificado"] == ""
+
+
+def test_preparar_linhas_chave():
+    """
+    No serviço CHAVE o código de execução é separado em código de movimentação e de saque e a data de rescisão é formatada
+    """
+    registros_linhas, motivos_rejeicao = preparar_linhas(montar_input(), "CHAVE")
+
+    assert motivos_rejeicao == {}
+    assert registros_linhas[4]["codigo_movimentacao"] == "I1"
+    assert registros_linhas[4]["codigo_saque"] == "01"
+    assert registros_linhas[4]["data_movimentacao"] == "31/01/2024"
+    assert registros_linhas[7]["data_movimentacao"] == "15/02/2024"
+
+
+def test_preparar_linhas_rejeita_apenas_as_linhas_malformadas():
+    """
+    Uma linha malformada recebe o motivo da rejeição (o primeiro problema encontrado) e não impede a preparação das outras
+    """
+    dados = montar_input(
+        **{
+            "DATA DE ADMISSAO": ["31/31/2020", "03/04/2021"],
+            "CODIGO EXECUCAO": ["I1", "I3 - 04"],
+        }
+    )
+    registros_linhas, motivos_rejeicao = preparar_linhas(dados, "CHAVE")
+
+    assert list(registros_linhas) == [7]
+    assert motivos_rejeicao == {
+        4: "Erro previsto na preparação da linha: data de admissão em formato inválido"
+    }
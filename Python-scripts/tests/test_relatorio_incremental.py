@@ -0,0 +1,72 @@
+import numpy as np
+import pandas as pd
+from openpyxl import load_workbook
+
+from auxiliar import ler_linhas_json
+from relatorio_incremental import RelatorioIncremental
+
+
+def ler_excel(caminho_excel) -> list[tuple]:
+    """
+    Retorna as linhas da planilha gerada, a primeira é o cabeçalho
+
+    Args:
+        caminho_excel (Path): caminho do arquivo excel
+    """
+    return list(load_workbook(caminho_excel).active.iter_rows(values_only=True))
+
+
+def test_finalizar_mantem_ordem_das_colunas_e_das_linhas(tmp_path):
+    """
+    O excel tem as colunas na ordem em que aparecem pela primeira vez (colunas novas, como SALDO 2, no final), sem as colunas
+    excluídas, e as linhas na ordem em que foram incluídas
+    """
+    dados = pd.DataFrame(
+        {
+            "NOME": ["JOAO", "MARIA"],
+            "POSICAO DO CERTIFICADO": [1, 2],
+            "SALDO": [None, np.nan],
+            "CODIGO": [np.int64(7), np.int64(8)],
+        },
+        index=[5, 3],
+    )
+    relatorio = RelatorioIncremental(tmp_path, "relatorio", ["POSICAO DO CERTIFICADO"])
+    relatorio.incluir_linhas(dados)
+    relatorio.atualizar_linha(3, {"SALDO": "R$ 1,00", "SALDO 2": "R$ 2,00"})
+    relatorio.atualizar_linha(5, {"SALDO": "R$ 3,00"})
+
+    caminho_excel = relatorio.finalizar()
+
+    assert ler_excel(caminho_excel) == [
+        ("NOME", "SALDO", "CODIGO", "SALDO 2"),
+        ("JOAO", "R$ 3,00", 7, None),
+        ("MARIA", "R$ 1,00", 8, "R$ 2,00"),
+    ]
+    assert not relatorio.caminho_parcial.exists()
+
+
+def test_atualizar_linha_grava_apenas_mudancas(tmp_path):
+    """
+    O arquivo parcial recebe um registro por linha incluída e um registro a cada mudança, e uma atualização sem mudança não grava
+    """
+    relatorio = RelatorioIncremental(tmp_path, "relatorio", [])
+    relatorio.incluir_linhas(pd.DataFrame({"STATUS": [None, None]}))
+    relatorio.atualizar_linha(0, {"STATUS": "SUCESSO"})
+    relatorio.atualizar_linha(0, {"STATUS": "SUCESSO"})
+    relatorio.atualizar_linhas(pd.DataFrame({"STATUS": ["SUCESSO", np.nan]}), ["STATUS"])
+
+    registros = ler_linhas_json(relatorio.caminho_parcial)
+    assert [registro["index"] for registro in registros] == [0, 1, 0]
+    assert registros[-1]["linha"] == {"STATUS": "SUCESSO"}
+
+
+def test_finalizar_relatorio_vazio(tmp_path):
+    """
+    Um relatório sem linhas não gera o excel nem interrompe a execução
+    """
+    relatorio = RelatorioIncremental(tmp_path, "relatorio", [])
+    relatorio.incluir_linhas(pd.DataFrame({"STATUS": []}))
+
+    assert relatorio.finalizar() is None
+    assert not relatorio.caminho_excel.exists()
+    assert not relatorio.caminho_parcial.exists()